@@ -0,0 +1,175 @@
+"""End-to-end crawl benchmark against a local GitHub stand-in.
+
+Starts benchmarks.github_stub in a separate process serving the recorded
+fixtures, runs GitHubCrawler against it and reports pages/sec, request
+latency percentiles, CPU time and peak RSS of the crawling process.
+
+Usage: python -m benchmarks.crawl_benchmark --pages 20 --latency 0.05 --enrich_workers 5 10 20
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.github_stub import FixtureGitHubStandIn
+from src.async_github_client import AsyncGitHubClient
+from src.enums import SearchType
+from src.github_client import GitHubClient
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+
+
+def _serve(options: Dict[str, Any], ready: multiprocessing.Queue) -> None:
+    stand_in = FixtureGitHubStandIn(**options)
+    ready.put(stand_in.base_url)
+    stand_in.server.serve_forever()
+
+
+class StandInProcess:
+    """Runs a FixtureGitHubStandIn in a child process so it does not skew the measurements"""
+
+    def __init__(self, **options):
+        self._ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(options, self._ready), daemon=True)
+        self.base_url: Optional[str] = None
+
+    def __enter__(self) -> 'StandInProcess':
+        self._process.start()
+        self.base_url = self._ready.get(timeout=10)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._process.terminate()
+        self._process.join()
+
+
+class LatencyRecorder:
+    """Times every request the clients send and counts the body bytes read while installed"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.body_bytes = 0
+
+    def __enter__(self) -> 'LatencyRecorder':
+        recorder = self
+        self._originals = (GitHubClient._send, AsyncGitHubClient._send)
+        send, send_async = self._originals
+
+        def timed_send(client, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                response = send(client, *args, **kwargs)
+                recorder.body_bytes += len(response.content)
+                return response
+            finally:
+                recorder.latencies.append(time.perf_counter() - started)
+
+        async def timed_send_async(client, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                response = await send_async(client, *args, **kwargs)
+                recorder.body_bytes += len(response.content)
+                return response
+            finally:
+                recorder.latencies.append(time.perf_counter() - started)
+
+        GitHubClient._send = timed_send
+        AsyncGitHubClient._send = timed_send_async
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        GitHubClient._send, AsyncGitHubClient._send = self._originals
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_crawl(base_url: str, engine: str, pages: int, **crawler_options) -> Dict[str, Any]:
+    """Run one crawl against the stand-in and measure it"""
+    crawler = GitHubCrawler(
+        proxies=[],
+        keywords=['drf'],
+        search_type=SearchType.REPOSITORIES.value,
+        include_extra_info=True,
+        max_pages=pages + 1,
+        scheduler=RequestScheduler(rate=10000, burst=10000, backoff_base=0.05),
+        base_url=base_url,
+        **crawler_options
+    )
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    with LatencyRecorder() as recorder:
+        if engine == 'async':
+            results = asyncio.run(crawler.execute_search_async())
+        else:
+            results = crawler.execute_search()
+    elapsed = time.perf_counter() - started
+    return {
+        'engine': engine,
+        'results': len(results),
+        'enriched': sum(1 for result in results if 'extra' in result),
+        'requests': len(recorder.latencies),
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(len(recorder.latencies) / elapsed, 1),
+        'p50_ms': round(percentile(recorder.latencies, 0.50) * 1000, 1),
+        'p99_ms': round(percentile(recorder.latencies, 0.99) * 1000, 1),
+        'body_mb': round(recorder.body_bytes / 1e6, 2),
+        'cpu_seconds': round(time.process_time() - cpu_started, 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        **crawler_options,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a crawl against a local GitHub stand-in')
+    parser.add_argument('--pages', type=int, default=10, help='Search pages served by the stand-in')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--latency_jitter', type=float, default=0.0)
+    parser.add_argument('--error_rate', type=float, default=0.0)
+    parser.add_argument('--rate_limit_rate', type=float, default=0.0)
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads')
+    parser.add_argument('--enrich_workers', type=int, nargs='+', default=[5], help='Enrichment thread counts to compare')
+    parser.add_argument('--page_workers', type=int, default=4)
+    parser.add_argument('--parser', default='auto')
+    parser.add_argument('--partial_reads', action='store_true', help='Stop reading result pages after the parsed section')
+    parser.add_argument('--json', action='store_true', help='Print the reports as JSON')
+    args = parser.parse_args()
+
+    reports = []
+    with StandInProcess(
+        pages=args.pages,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    ) as stand_in:
+        for enrich_workers in args.enrich_workers:
+            reports.append(run_crawl(
+                stand_in.base_url,
+                args.engine,
+                args.pages,
+                enrich_workers=enrich_workers,
+                page_workers=args.page_workers,
+                concurrency=enrich_workers,
+                parser_backend=args.parser,
+                partial_reads=args.partial_reads,
+            ))
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    columns = ['engine', 'enrich_workers', 'results', 'requests', 'seconds', 'pages_per_sec', 'p50_ms', 'p99_ms', 'body_mb', 'cpu_seconds', 'peak_rss_mb']
+    print(''.join(f'{column:>15}' for column in columns))
+    for report in reports:
+        print(''.join(f'{str(report[column]):>15}' for column in columns))
+
+
+if __name__ == '__main__':
+    main()
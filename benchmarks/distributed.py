@@ -0,0 +1,85 @@
+"""Measure how distributed crawl throughput scales with the number of worker processes.
+
+For every worker count, a coordinator queues a fresh job on a new SQLite
+work queue and that many worker processes crawl it against the local
+stand-in, which adds ``--latency`` to every response like a remote server.
+Reports work items (search and repository pages) per second.
+
+Usage: python -m benchmarks.distributed [--pages 20] [--latency 0.05] [--workers 1 2 4 8] [--threads 4]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.crawl_benchmark import StandInProcess
+from src.distributed import Coordinator, CrawlWorker
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from src.work_queue import WorkQueue
+
+INPUT_DATA = {'keywords': ['python'], 'proxies': [], 'type': 'repositories'}
+
+
+def _work(queue_path: str, base_url: str, threads: int) -> None:
+    queue = WorkQueue(queue_path)
+
+    def create_crawler(spec):
+        return GitHubCrawler(
+            proxies=spec['proxies'],
+            keywords=spec['keywords'],
+            search_type=spec['type'],
+            include_extra_info=spec['include_extra_info'],
+            requests_per_proxy=threads,
+            scheduler=RequestScheduler(rate=10000, burst=10000),
+            base_url=base_url
+        )
+
+    CrawlWorker(queue, create_crawler, batch_size=threads, threads=threads, poll_interval=0.05, exit_when_idle=True).run()
+    queue.close()
+
+
+def crawl(base_url: str, pages: int, workers: int, threads: int) -> float:
+    """Return the work items per second ``workers`` processes complete"""
+    with tempfile.TemporaryDirectory() as directory:
+        queue_path = os.path.join(directory, 'queue.sqlite')
+        queue = WorkQueue(queue_path)
+        coordinator = Coordinator(queue, poll_interval=0.05)
+        job = coordinator.submit(INPUT_DATA, max_pages=pages, include_extra_info=True)
+        started = time.perf_counter()
+        processes = [
+            multiprocessing.Process(target=_work, args=(queue_path, base_url, threads)) for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        stats = coordinator.wait(job)
+        elapsed = time.perf_counter() - started
+        for process in processes:
+            process.join()
+        queue.close()
+    return stats['done'] / elapsed
+
+
+def run(pages: int, latency: float, workers, threads: int):
+    print(f'{"workers":<10}{"items/s":>10}{"speedup":>10}')
+    with StandInProcess(pages=pages, latency=latency) as stand_in:
+        baseline = None
+        for count in workers:
+            throughput = crawl(stand_in.base_url, pages, count, threads)
+            baseline = baseline or throughput
+            print(f'{count:<10}{throughput:>10.1f}{throughput / baseline:>10.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark distributed crawl scaling')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+    run(args.pages, args.latency, args.workers, args.threads)
+
+
+if __name__ == '__main__':
+    main()
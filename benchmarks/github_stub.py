@@ -0,0 +1,225 @@
+"""Local stand-in for github.com used by the benchmarks and tests.
+
+Usage: python -m benchmarks.github_stub [--port 8000] [--pages 50] [--latency 0.05] [--error_rate 0.01] [--rate_limit_rate 0.02]
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+
+
+class GitHubStandIn:
+    """HTTP server standing in for github.com, with injectable latency and failures.
+
+    Subclasses provide the pages through ``search_html`` and ``repository_html``
+    (None answers 404). Every response is delayed by ``latency`` plus up to
+    ``latency_jitter`` seconds; a fraction ``error_rate`` of requests fails with
+    a 500 and a fraction ``rate_limit_rate`` with a 429 carrying ``Retry-After``.
+    Responses carry an ETag and answer matching conditional requests with 304,
+    and are gzipped for clients accepting it. POST requests go to ``route_post``.
+    """
+
+    CHUNK_SIZE = 16 * 1024
+    CONTENT_TYPE = 'text/html; charset=utf-8'
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0,
+                 retry_after: int = 1,
+                 seed: int = 0,
+                 host: str = '127.0.0.1',
+                 port: int = 0):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.requests: List[str] = []
+        self.authorizations: List[Optional[str]] = []
+        self.status_counts: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def search_html(self, params: Dict[str, str]) -> Optional[str]:
+        raise NotImplementedError
+
+    def repository_html(self, path: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def route(self, path: str, params: Dict[str, str]) -> Tuple[int, str]:
+        """Return the status and body for a GET request"""
+        body = self.search_html(params) if path == '/search' else self.repository_html(path)
+        if body is None:
+            return 404, 'Not Found'
+        return 200, body
+
+    def route_post(self, path: str, body: bytes) -> Tuple[int, str]:
+        """Return the status and body for a POST request"""
+        return 404, 'Not Found'
+
+    def _fault(self) -> Tuple[float, Optional[int]]:
+        with self._lock:
+            delay = self.latency + self._random.random() * self.latency_jitter
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return delay, 500
+        if roll < self.error_rate + self.rate_limit_rate:
+            return delay, 429
+        return delay, None
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._handle(None)
+
+            def do_POST(self):
+                self._handle(self.rfile.read(int(self.headers.get('Content-Length', '0'))))
+
+            def _handle(self, body: Optional[bytes]):
+                url = urlparse(self.path)
+                with stand_in._lock:
+                    stand_in.requests.append(self.path)
+                    stand_in.authorizations.append(self.headers.get('Authorization'))
+                delay, fault = stand_in._fault()
+                if delay:
+                    time.sleep(delay)
+                if fault == 429:
+                    self._send(429, 'Too Many Requests', {'Retry-After': str(stand_in.retry_after)})
+                elif fault is not None:
+                    self._send(fault, 'Internal Server Error')
+                elif body is not None:
+                    self._send(*stand_in.route_post(url.path, body))
+                else:
+                    params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                    self._send(*stand_in.route(url.path, params))
+
+            def _send(self, status: int, body: str, headers: Optional[Dict[str, str]] = None):
+                payload = body.encode('utf-8')
+                etag = f'"{hashlib.md5(payload).hexdigest()}"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    status, payload = 304, b''
+                gzipped = bool(payload) and 'gzip' in self.headers.get('Accept-Encoding', '')
+                if gzipped:
+                    payload = gzip.compress(payload, compresslevel=5)
+                with stand_in._lock:
+                    stand_in.status_counts[status] += 1
+                self.send_response(status)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', stand_in.CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(payload)))
+                if gzipped:
+                    self.send_header('Content-Encoding', 'gzip')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    for start in range(0, len(payload), stand_in.CHUNK_SIZE):
+                        self.wfile.write(payload[start:start + stand_in.CHUNK_SIZE])
+                except (BrokenPipeError, ConnectionResetError):
+                    # Clients reading only part of a page hang up early
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FixtureGitHubStandIn(GitHubStandIn):
+    """Serves the recorded search and repository pages from ``tests/fixtures``.
+
+    Search page ``p`` replays recorded search page ``(p - 1) % n + 1`` with its
+    links made unique per page, so a crawl of ``pages`` pages finds distinct
+    repositories. Pages past ``pages`` have no results.
+    """
+
+    LINK = re.compile(r'(class="[^"]*search-title[^"]*"><a [^>]*?href=")(/[^"]+)(")')
+    PAGE_SUFFIX = re.compile(r'--p\d+$')
+
+    def __init__(self, pages: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+        self.search_pages = [
+            open(path, encoding='utf-8').read()
+            for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'search_*.html')))
+        ]
+        self.repository_pages = {}
+        for path in glob.glob(os.path.join(FIXTURES_DIR, 'repositories', '*.html')):
+            owner, name = os.path.basename(path)[:-len('.html')].split('__')
+            self.repository_pages[f'/{owner}/{name}'] = open(path, encoding='utf-8').read()
+        self.empty_search_page = self.LINK.sub('', re.sub(r'search-title', 'search-result', self.search_pages[0]))
+
+    def search_html(self, params: Dict[str, str]) -> Optional[str]:
+        page = int(params.get('p', '1'))
+        if page > self.pages:
+            return self.empty_search_page
+        html = self.search_pages[(page - 1) % len(self.search_pages)]
+        return self.LINK.sub(lambda match: f'{match.group(1)}{self.base_url}{match.group(2)}--p{page}{match.group(3)}', html)
+
+    def repository_html(self, path: str) -> Optional[str]:
+        return self.repository_pages.get(self.PAGE_SUFFIX.sub('', path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded GitHub pages locally')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--latency_jitter', type=float, default=0.0)
+    parser.add_argument('--error_rate', type=float, default=0.0)
+    parser.add_argument('--rate_limit_rate', type=float, default=0.0)
+    parser.add_argument('--retry_after', type=int, default=1)
+    args = parser.parse_args()
+    stand_in = FixtureGitHubStandIn(
+        pages=args.pages,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        host=args.host,
+        port=args.port,
+    )
+    print(f'Serving {args.pages} search pages at {stand_in.base_url}', flush=True)
+    try:
+        stand_in.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
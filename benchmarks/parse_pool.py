@@ -0,0 +1,74 @@
+"""Measure how parse throughput scales with the number of ParsePool processes.
+
+Every round parses the whole fixture corpus, submitted at once so all
+workers stay busy. The first row parses in this process for reference.
+
+Usage: python -m benchmarks.parse_pool [--rounds N] [--workers 1 2 4 8] [--parser NAME]
+"""
+import argparse
+import multiprocessing
+import time
+
+from benchmarks.parser_backends import load_corpus
+from src.enums import SearchType
+from src.parse_pool import ParsePool
+from src.parser import ResultParser
+
+
+def encode_corpus():
+    search_pages, repository_pages = load_corpus()
+    return (
+        [html.encode('utf-8') for html in search_pages],
+        [(repo_url, html.encode('utf-8')) for repo_url, html in repository_pages],
+    )
+
+
+def parse_in_process(backend: str, rounds: int, search_pages, repository_pages) -> float:
+    parser = ResultParser(backend=backend)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for html in search_pages:
+            parser.parse_search_results(html.decode('utf-8'), SearchType.REPOSITORIES)
+        for repo_url, html in repository_pages:
+            parser.parse_repository_info(html.decode('utf-8'), repo_url)
+    return time.perf_counter() - started
+
+
+def parse_in_pool(pool: ParsePool, rounds: int, search_pages, repository_pages) -> float:
+    started = time.perf_counter()
+    futures = []
+    for _ in range(rounds):
+        futures.extend(pool.submit_search_results(html, SearchType.REPOSITORIES) for html in search_pages)
+        futures.extend(pool.submit_extra_info(html, repo_url, SearchType.REPOSITORIES) for repo_url, html in repository_pages)
+    for future in futures:
+        future.result()
+    return time.perf_counter() - started
+
+
+def run(rounds: int, workers, backend: str):
+    search_pages, repository_pages = encode_corpus()
+    pages = rounds * (len(search_pages) + len(repository_pages))
+    elapsed = parse_in_process(backend, rounds, search_pages, repository_pages)
+    baseline = pages / elapsed
+    print(f'{"workers":<14}{"pages/s":>10}{"speedup":>10}')
+    print(f'{"in-process":<14}{baseline:>10.1f}{1.0:>10.2f}')
+    for count in workers:
+        with ParsePool(count, backend=backend) as pool:
+            # Start every worker before timing
+            parse_in_pool(pool, 1, search_pages, repository_pages * count)
+            elapsed = parse_in_pool(pool, rounds, search_pages, repository_pages)
+        print(f'{count:<14}{pages / elapsed:>10.1f}{pages / elapsed / baseline:>10.2f}')
+
+
+def main():
+    cpus = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(description='Benchmark process-pool parsing')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, cpus}))
+    parser.add_argument('--parser', default='auto')
+    args = parser.parse_args()
+    run(args.rounds, args.workers, args.parser)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Compare ResultParser backends on the HTML fixture corpus.
+
+Usage: python -m benchmarks.parser_backends [--rounds N]
+"""
+import argparse
+import glob
+import os
+import time
+
+from src.enums import SearchType
+from src.parser import ResultParser
+from src.parser_backends import available_backends
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+
+
+def load_corpus():
+    search_pages = [open(path, encoding='utf-8').read() for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'search_*.html')))]
+    repository_pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'repositories', '*.html'))):
+        owner, name = os.path.basename(path)[:-len('.html')].split('__')
+        repository_pages.append((f'https://github.com/{owner}/{name}', open(path, encoding='utf-8').read()))
+    return search_pages, repository_pages
+
+
+def run(rounds: int):
+    search_pages, repository_pages = load_corpus()
+    corpus_bytes = sum(len(html) for html in search_pages) + sum(len(html) for _, html in repository_pages)
+    print(f'{"backend":<14}{"pages/s":>10}{"MB/s":>10}{"ms/page":>10}')
+    for name in available_backends():
+        parser = ResultParser(backend=name)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for html in search_pages:
+                parser.parse_search_results(html, SearchType.REPOSITORIES)
+            for repo_url, html in repository_pages:
+                parser.parse_repository_info(html, repo_url)
+        elapsed = time.perf_counter() - started
+        pages = rounds * (len(search_pages) + len(repository_pages))
+        print(f'{name:<14}{pages / elapsed:>10.1f}{rounds * corpus_bytes / elapsed / 1e6:>10.1f}{elapsed / pages * 1000:>10.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parser backends')
+    parser.add_argument('--rounds', type=int, default=20)
+    run(parser.parse_args().rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Compare the memory and output size of result dicts against compact records.
+
+Synthetic repository results are generated with owners and languages
+drawn from small pools, as in real crawls. Memory is what tracemalloc
+sees allocated while holding every result, as dicts or as records from
+``src.records``. Output sizes are those of the JSON, NDJSON and CSV
+formats and of the language matrix with its labels.
+
+Usage: python -m benchmarks.result_records [--repositories N] [--languages N] [--owners N]
+"""
+import argparse
+import gc
+import io
+import os
+import random
+import tempfile
+import tracemalloc
+
+from src.output import LanguageMatrix, matrix_labels_file, write_results
+from src.records import compact
+
+LANGUAGES = [
+    'Python', 'JavaScript', 'TypeScript', 'HTML', 'CSS', 'Shell', 'Go', 'Rust', 'C', 'C++',
+    'Java', 'Kotlin', 'Ruby', 'PHP', 'Dockerfile', 'Makefile', 'Jupyter Notebook', 'Swift',
+]
+
+
+def generate_results(repositories: int, languages: int, owners: int, seed: int = 0):
+    """Results as the parsers build them: every name is a new string, as after parsing a page"""
+    generator = random.Random(seed)
+    names = (LANGUAGES * (languages // len(LANGUAGES) + 1))[:languages]
+    names = [name if index < len(LANGUAGES) else f'{name}{index}' for index, name in enumerate(names)]
+    results = []
+    for index in range(repositories):
+        owner = f'user{generator.randrange(owners)}'
+        picked = generator.sample(names, generator.randint(1, min(6, len(names))))
+        shares = [generator.random() for _ in picked]
+        total = sum(shares)
+        results.append({
+            'url': f'https://github.com/{owner}/repo{index}',
+            'extra': {
+                'owner': owner,
+                'language_stats': {''.join(name): round(share * 100 / total, 1) for name, share in zip(picked, shares)},
+            },
+        })
+    return results
+
+
+def measure(build) -> int:
+    """Bytes allocated by ``build()`` and still held by what it returns"""
+    gc.collect()
+    tracemalloc.start()
+    held = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def output_sizes(results):
+    sizes = {}
+    for output_format in ('json', 'ndjson', 'csv'):
+        f = io.StringIO()
+        write_results(results, f, output_format)
+        sizes[output_format] = len(f.getvalue().encode('utf-8'))
+    matrix = LanguageMatrix()
+    for result in results:
+        matrix.add(result)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'languages.npy')
+        matrix.write(path)
+        sizes['matrix (.npy)'] = os.path.getsize(path)
+        sizes['matrix labels'] = os.path.getsize(matrix_labels_file(path))
+    return sizes
+
+
+def run(repositories: int, languages: int, owners: int):
+    args = (repositories, languages, owners)
+    dicts = measure(lambda: generate_results(*args))
+    records = measure(lambda: [compact(result) for result in generate_results(*args)])
+    print(f'{repositories} repositories, {languages} languages, {owners} owners')
+    print(f'{"in memory":<16}{"MB":>10}{"B/result":>10}')
+    for name, size in (('dicts', dicts), ('records', records)):
+        print(f'{name:<16}{size / 1024 / 1024:>10.1f}{size / repositories:>10.0f}')
+    print(f'records use {records / dicts:.0%} of the memory of dicts')
+    print()
+    print(f'{"output":<16}{"MB":>10}{"B/result":>10}')
+    for name, size in output_sizes(generate_results(*args)).items():
+        print(f'{name:<16}{size / 1024 / 1024:>10.1f}{size / repositories:>10.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compact result records and columnar output')
+    parser.add_argument('--repositories', type=int, default=100000)
+    parser.add_argument('--languages', type=int, default=len(LANGUAGES))
+    parser.add_argument('--owners', type=int, default=20000)
+    args = parser.parse_args()
+    run(args.repositories, args.languages, args.owners)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,48 +1,492 @@
 import argparse
+import asyncio
 import json
 import logging
-from src.github_crawler import GitHubCrawler
-from src.validators import validate_input_data
+import os
+import sys
+import threading
+from src import metrics, profiling
+from src.api_client import GitHubApiClient
+from src.batch import BatchRunner, batch_jobs
+from src.checkpoint import CheckpointJournal
+from src.concurrency import AdaptiveLimiter
+from src.distributed import Coordinator, CrawlWorker
+from src.github_client import GitHubClient
+from src.github_crawler import CRAWL_BACKENDS, GitHubCrawler
+from src.hedging import HedgePolicy
+from src.http_cache import HttpCache
+from src.lru_cache import LruCache
+from src.output import OUTPUT_FORMATS, LanguageMatrix, matrix_labels_file, write_results
+from src.parse_pool import ParsePool
+from src.parser_backends import BACKENDS
+from src.rate_limiter import RequestScheduler
+from src.service import CrawlServer, CrawlService
+from src.single_flight import SingleFlight
+from src.url_index import UrlIndex
+from src.validators import validate_batch_input, validate_input_data
+from src.work_queue import WorkQueue
 
 
-def parse_arguments():
-    parser = argparse.ArgumentParser(description='GitHub Crawler')
+COMMANDS = ('coordinate', 'worker', 'serve')
+
+
+def add_request_arguments(parser):
+    parser.add_argument('--requests_per_proxy', help='Maximum concurrent requests per proxy', type=int, default=4)
+    parser.add_argument('--min_in_flight', help='Lowest limit of requests in flight the adaptive limit backs off to', type=int, default=1)
+    parser.add_argument('--max_in_flight', help='Highest limit of requests in flight the adaptive limit grows to', type=int, default=64)
+    parser.add_argument('--fixed_concurrency', help='Disable the adaptive limit, sending as many requests as there are workers', action='store_true')
+    parser.add_argument('--rate_limit', help='Maximum requests per second per host', type=float, default=10.0)
+    parser.add_argument('--max_retries', help='Maximum retries of a failed request', type=int, default=5)
+    parser.add_argument('--request_deadline', help='Seconds after which a request is no longer retried', type=float, default=120.0)
+    parser.add_argument('--request_timeout', help='Seconds to wait for a single response', type=float, default=10.0)
+    parser.add_argument('--hedge', help='Send a duplicate of slow requests through another proxy and use the first response', action='store_true')
+    parser.add_argument('--hedge_percentile', help='Latency percentile after which a request is hedged', type=float, default=95.0)
+    parser.add_argument('--cache_file', help='SQLite file caching responses between runs', default=None)
+    parser.add_argument('--cache_ttl', help='Seconds a cached response or parsed page is served without revalidation', type=float, default=3600.0)
+    parser.add_argument('--cache_size_mb', help='Maximum size of the response cache in MB', type=int, default=256)
+    parser.add_argument('--result_cache_size', help='Parsed pages kept in memory to skip repeated fetches (0 disables it)', type=int, default=10000)
+    parser.add_argument('--token', help='GitHub API token for --backend api (default: $GITHUB_TOKEN)', default=os.environ.get('GITHUB_TOKEN'))
+    parser.add_argument('--parser', help='HTML parser backend', choices=['auto'] + list(BACKENDS), default='auto')
+    parser.add_argument('--partial_reads', help='Stop reading result pages once the parsed section is complete', action='store_true')
+    parser.add_argument('--max_body_kb', help='Maximum KB read of a result page with --partial_reads', type=int, default=5 * 1024)
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics_file', help='Write metrics in the Prometheus text format to this file', default=None)
+    parser.add_argument('--metrics_summary', help='Write a JSON summary of the run metrics to this file', default=None)
+    parser.add_argument('--metrics_port', help='Serve live metrics at /metrics on this port', type=int, default=None)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', help='Profile the run: cpu (cProfile), memory (tracemalloc) or sampling (cheap stack sampling)', choices=profiling.PROFILE_MODES, default=None)
+    parser.add_argument('--profile_output', help='Profile output file (default: data/profile.<mode>.pstats|txt|collapsed)', default=None)
+    parser.add_argument('--profile_top', help='Number of entries in the profile summary', type=int, default=20)
+    parser.add_argument('--profile_interval', help='Seconds between stack samples of --profile sampling', type=float, default=0.01)
+
+
+def parse_arguments(argv=None):
+    """Arguments of a crawl, or of the command named by the first argument"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return parse_command_arguments(argv)
+    parser = argparse.ArgumentParser(description='GitHub Crawler', epilog=f'Commands: {", ".join(COMMANDS)} (see <command> --help)')
     parser.add_argument('input_file', help='JSON input file path')
     parser.add_argument('--output_file', help='Output file path', default='data/results.json')
+    parser.add_argument('--output_format', help='Output file format', choices=OUTPUT_FORMATS, default='json')
+    parser.add_argument('--matrix_file', help='Also save repository language percentages as a languages x repositories .npy matrix', default=None)
     parser.add_argument('--extra_info', help='Include extra info', action='store_true')
-    return parser.parse_args()
+    parser.add_argument('--max_pages', help='Number of search result pages to crawl', type=int, default=1)
+    parser.add_argument('--max_results', help='Maximum number of results to return', type=int, default=None)
+    parser.add_argument('--deadline', help='Seconds after which the crawl stops and saves the results found so far', type=float, default=None)
+    parser.add_argument('--max_jobs', help='Number of jobs of a batch input file crawled at the same time', type=int, default=4)
+    parser.add_argument('--summary_file', help='Where a batch crawl reports each job (default: <output_file>.summary.json)', default=None)
+    parser.add_argument('--shard', help='Split searches over GitHub\'s 1000 result cap into shards crawled side by side', action='store_true')
+    parser.add_argument('--page_workers', help='Number of search pages fetched concurrently', type=int, default=4)
+    parser.add_argument('--enrich_workers', help='Number of result pages fetched concurrently for extra info (default: --max_in_flight, or 4 per proxy and at least 5 with --fixed_concurrency)', type=int, default=None)
+    parser.add_argument('--parse_workers', help='Number of threads parsing each kind of page', type=int, default=1)
+    parser.add_argument('--queue_size', help='Maximum items waiting between two pipeline stages', type=int, default=16)
+    parser.add_argument('--engine', help='Crawl engine', choices=['threads', 'async'], default='threads')
+    parser.add_argument('--concurrency', help='Maximum requests in flight for the async engine', type=int, default=100)
+    parser.add_argument('--backend', help='Crawl the HTML pages or the JSON API', choices=CRAWL_BACKENDS, default='html')
+    add_request_arguments(parser)
+    parser.add_argument('--parse_processes', help='Parse pages in this many worker processes (0 parses in the crawler process)', type=int, default=0)
+    parser.add_argument('--checkpoint_file', help='Record finished work to this checkpoint journal (default: <output_file>.checkpoint with --resume, otherwise none)', default=None)
+    parser.add_argument('--resume', help='Resume from the checkpoint journal, skipping completed work', action='store_true')
+    parser.add_argument('--index_file', help='SQLite index of enriched repositories kept between runs', default=None)
+    parser.add_argument('--incremental', help='Only fetch extra info for new or stale repositories', action='store_true')
+    parser.add_argument('--index_max_age', help='Seconds after which an indexed repository is refetched', type=float, default=6 * 3600.0)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    args.command = 'crawl'
+    return args
+
+
+def parse_command_arguments(argv):
+    parser = argparse.ArgumentParser(description='GitHub Crawler')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    coordinate = commands.add_parser('coordinate', help='Queue a crawl for workers, wait for it and save its results')
+    coordinate.add_argument('input_file', help='JSON input file path')
+    coordinate.add_argument('--queue_file', help='SQLite work queue shared with the workers', default='data/queue.sqlite')
+    coordinate.add_argument('--output_file', help='Output file path', default='data/results.json')
+    coordinate.add_argument('--output_format', help='Output file format', choices=OUTPUT_FORMATS, default='json')
+    coordinate.add_argument('--matrix_file', help='Also save repository language percentages as a languages x repositories .npy matrix', default=None)
+    coordinate.add_argument('--extra_info', help='Include extra info', action='store_true')
+    coordinate.add_argument('--max_pages', help='Number of search result pages to crawl', type=int, default=1)
+    coordinate.add_argument('--max_results', help='Maximum number of results to return', type=int, default=None)
+    coordinate.add_argument('--backend', help='Crawl the HTML pages or the JSON API', choices=CRAWL_BACKENDS, default='html')
+    coordinate.add_argument('--poll_interval', help='Seconds between checks of the job progress', type=float, default=1.0)
+    coordinate.add_argument('--fresh', help='Crawl the job anew even if an unfinished run of it is queued', action='store_true')
+    add_metrics_arguments(coordinate)
+    add_profile_arguments(coordinate)
+    
+    worker = commands.add_parser('worker', help='Crawl work items from the queue')
+    worker.add_argument('--queue_file', help='SQLite work queue shared with the coordinator', default='data/queue.sqlite')
+    worker.add_argument('--worker_id', help='Name of this worker in the queue (default: <host>-<pid>)', default=None)
+    worker.add_argument('--batch_size', help='Number of items leased at a time', type=int, default=10)
+    worker.add_argument('--threads', help='Number of leased items crawled concurrently', type=int, default=4)
+    worker.add_argument('--lease_seconds', help='Seconds after which an unfinished item is handed to another worker', type=float, default=60.0)
+    worker.add_argument('--max_attempts', help='Leases of an item before it is marked failed', type=int, default=5)
+    worker.add_argument('--poll_interval', help='Seconds between polls of an empty queue', type=float, default=1.0)
+    worker.add_argument('--exit_when_idle', help='Exit once no item is pending or leased', action='store_true')
+    add_request_arguments(worker)
+    add_metrics_arguments(worker)
+    add_profile_arguments(worker)
+    
+    serve = commands.add_parser('serve', help='Run crawl jobs submitted over a local HTTP/JSON API')
+    serve.add_argument('--host', help='Address to listen on', default='127.0.0.1')
+    serve.add_argument('--port', help='Port to listen on', type=int, default=8080)
+    serve.add_argument('--max_jobs', help='Number of jobs crawled at the same time', type=int, default=2)
+    serve.add_argument('--max_queued_jobs', help='Number of jobs waiting to run before new ones are refused', type=int, default=100)
+    serve.add_argument('--job_history', help='Number of finished jobs kept with their results', type=int, default=100)
+    add_request_arguments(serve)
+    add_metrics_arguments(serve)
+    add_profile_arguments(serve)
+    return parser.parse_args(argv)
 
 
 class GitHubCrawlerApp:
-    def __init__(self):
-        self.args = parse_arguments()
+    def __init__(self, argv=None):
+        self.args = parse_arguments(argv)
         self.logger = logging.getLogger(__name__)
         
-    def load_input_data(self):
+    def load_input_data(self, batch=False):
         with open(self.args.input_file, 'r') as f:
             input_data = json.load(f)
-        validate_input_data(input_data)
+        if batch and isinstance(input_data, dict) and 'jobs' in input_data:
+            validate_batch_input(input_data)
+        else:
+            validate_input_data(input_data)
         self.logger.info(f'Input data: {input_data}')
         return input_data
         
     def save_output(self, results):
-        with open(self.args.output_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        self.logger.info(f'Results: {json.dumps(results, indent=2)}')
+        matrix = LanguageMatrix() if self.args.matrix_file else None
+        if matrix is not None:
+            results = matrix.collect(results)
+        with open(self.args.output_file, 'w', newline='' if self.args.output_format == 'csv' else None) as f:
+            count = write_results(results, f, self.args.output_format)
+        metrics.inc('results_written_total', count)
+        self.logger.info(f'Saved {count} results to {self.args.output_file}')
+        if matrix is not None:
+            languages, repositories = matrix.write(self.args.matrix_file)
+            self.logger.info(
+                f'Saved a {languages} x {repositories} language matrix to {self.args.matrix_file} '
+                f'with labels in {matrix_labels_file(self.args.matrix_file)}'
+            )
+        
+    def create_cache(self):
+        if not self.args.cache_file:
+            return None
+        return HttpCache(
+            self.args.cache_file,
+            ttl=self.args.cache_ttl,
+            max_bytes=self.args.cache_size_mb * 1024 * 1024,
+        )
+        
+    def create_result_cache(self):
+        # Parsed pages skip the HTTP cache's revalidation, so they must not outlive its freshness
+        return LruCache(self.args.result_cache_size, ttl=self.args.cache_ttl)
+        
+    def create_limiter(self, ceiling=None):
+        if self.args.fixed_concurrency:
+            return None
+        max_limit = self.args.max_in_flight
+        if ceiling is not None:
+            max_limit = max(self.args.min_in_flight, min(max_limit, ceiling))
+        return AdaptiveLimiter(min_limit=self.args.min_in_flight, max_limit=max_limit)
+        
+    def create_hedge(self):
+        if not self.args.hedge:
+            return None
+        return HedgePolicy(percentile=self.args.hedge_percentile)
+        
+    def create_index(self):
+        if not self.args.index_file:
+            return None
+        return UrlIndex(self.args.index_file, max_age=self.args.index_max_age)
+        
+    def create_parse_pool(self):
+        if self.args.parse_processes <= 0:
+            return None
+        return ParsePool(self.args.parse_processes, backend=self.args.parser)
+        
+    def create_metrics_sinks(self):
+        sinks = []
+        if self.args.metrics_file:
+            sinks.append(metrics.PrometheusFileSink(self.args.metrics_file))
+        if self.args.metrics_summary:
+            sinks.append(metrics.JsonSummarySink(self.args.metrics_summary))
+        if sinks or self.args.metrics_port is not None:
+            registry = metrics.enable()
+            if self.args.metrics_port is not None:
+                sinks.append(metrics.PrometheusHttpSink(registry, self.args.metrics_port))
+        return sinks
+        
+    def create_scheduler(self, crawl_deadline=None):
+        # No request is waited for past the deadline of its crawl
+        deadline = self.args.request_deadline if crawl_deadline is None else min(self.args.request_deadline, crawl_deadline)
+        return RequestScheduler(
+            rate=self.args.rate_limit,
+            burst=self.args.rate_limit,
+            max_retries=self.args.max_retries,
+            deadline=deadline,
+        )
+        
+    def create_checkpoint(self, input_data):
+        if not (self.args.checkpoint_file or self.args.resume):
+            return None
+        path = self.args.checkpoint_file or f'{self.args.output_file}.checkpoint'
+        job = {'keywords': input_data['keywords'], 'type': input_data['type']}
+        return CheckpointJournal(path, job, resume=self.args.resume)
         
     def run(self):
+        commands = {'crawl': self.crawl, 'coordinate': self.coordinate, 'worker': self.work, 'serve': self.serve}
+        if self.args.profile:
+            try:
+                profiling.start(
+                    self.args.profile,
+                    output=self.args.profile_output,
+                    top=self.args.profile_top,
+                    interval=self.args.profile_interval
+                )
+            except ValueError as e:
+                self.logger.error(f'Error: {str(e)}')
+                return
+        sinks = self.create_metrics_sinks()
         try:
-            input_data = self.load_input_data()
+            commands[self.args.command]()
+        finally:
+            summary = profiling.stop()
+            if summary:
+                self.logger.info(summary)
+            metrics.write_sinks(sinks)
+            for sink in sinks:
+                sink.close()
+        
+    def crawl(self):
+        parse_pool = self.create_parse_pool()
+        checkpoint = None
+        try:
+            input_data = self.load_input_data(batch=True)
+            if 'jobs' in input_data:
+                self.crawl_batch(input_data, parse_pool)
+                return
+            checkpoint = self.create_checkpoint(input_data)
             crawler = GitHubCrawler(
                 proxies=input_data['proxies'], 
                 search_type=input_data['type'], 
                 keywords=input_data['keywords'],
                 include_extra_info=self.args.extra_info,
+                max_pages=self.args.max_pages,
+                max_results=self.args.max_results,
+                page_workers=self.args.page_workers,
+                enrich_workers=self.args.enrich_workers,
+                parse_workers=self.args.parse_workers,
+                queue_size=self.args.queue_size,
+                concurrency=self.args.concurrency,
+                requests_per_proxy=self.args.requests_per_proxy,
+                scheduler=self.create_scheduler(self.args.deadline),
+                cache=self.create_cache(),
+                result_cache=self.create_result_cache(),
+                limiter=self.create_limiter(self.args.concurrency if self.args.engine == 'async' else None),
+                hedge=self.create_hedge(),
+                request_timeout=self.args.request_timeout,
+                deadline=self.args.deadline,
+                parser_backend=self.args.parser,
+                parse_pool=parse_pool,
+                checkpoint=checkpoint,
+                index=self.create_index(),
+                incremental=self.args.incremental,
+                partial_reads=self.args.partial_reads,
+                max_body_bytes=self.args.max_body_kb * 1024,
+                backend=self.args.backend,
+                token=self.args.token,
+                shard=self.args.shard,
             )
-            results = crawler.execute_search()
+            if self.args.engine == 'async':
+                results = asyncio.run(crawler.execute_search_async())
+            else:
+                results = crawler.iter_search()
             self.save_output(results)
+            if not crawler.complete:
+                self.logger.warning(f'The crawl was cut short by --deadline, {self.args.output_file} holds partial results')
+            elif checkpoint is not None:
+                checkpoint.complete()
+                checkpoint = None
         except Exception as e:
             self.logger.error(f'Error: {str(e)}')
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+            if parse_pool is not None:
+                parse_pool.close()
+        
+    def crawl_batch(self, input_data, parse_pool):
+        factory = self.create_shared_crawler_factory(
+            page_workers=self.args.page_workers,
+            enrich_workers=self.args.enrich_workers,
+            parse_workers=self.args.parse_workers,
+            queue_size=self.args.queue_size,
+            parse_pool=parse_pool,
+            index=self.create_index(),
+            incremental=self.args.incremental,
+        )
+        # Options a job does not set itself
+        defaults = {
+            'extra_info': self.args.extra_info,
+            'max_pages': self.args.max_pages,
+            'max_results': self.args.max_results,
+            'backend': self.args.backend,
+            'shard': self.args.shard,
+            'deadline': self.args.deadline,
+        }
+        runner = BatchRunner(factory, max_jobs=self.args.max_jobs, output_format=self.args.output_format, defaults=defaults)
+        jobs = runner.run(batch_jobs(input_data, self.args.output_file))
+        summary_file = self.args.summary_file or f'{os.path.splitext(self.args.output_file)[0]}.summary.json'
+        with open(summary_file, 'w') as f:
+            json.dump([job.to_dict() for job in jobs], f, indent=2)
+        self.logger.info(f'Saved the batch summary to {summary_file}')
+        
+    def coordinate(self):
+        queue = WorkQueue(self.args.queue_file)
+        try:
+            coordinator = Coordinator(queue, poll_interval=self.args.poll_interval)
+            job = coordinator.submit(
+                self.load_input_data(),
+                max_pages=self.args.max_pages,
+                include_extra_info=self.args.extra_info,
+                backend=self.args.backend,
+                fresh=self.args.fresh
+            )
+            stats = coordinator.wait(job)
+            if stats['failed']:
+                self.logger.warning(f'{stats["failed"]} work item(s) of job {job} failed')
+            self.save_output(coordinator.collect(job, max_results=self.args.max_results))
+        except Exception as e:
+            self.logger.error(f'Error: {str(e)}')
+        finally:
+            queue.close()
+        
+    def work(self):
+        queue = WorkQueue(self.args.queue_file, lease_seconds=self.args.lease_seconds, max_attempts=self.args.max_attempts)
+        scheduler = self.create_scheduler()
+        cache = self.create_cache()
+        # Shared by the crawlers of every job this worker crawls
+        result_cache = self.create_result_cache()
+        single_flight = SingleFlight()
+        limiter = self.create_limiter()
+        hedge = self.create_hedge()
+        
+        def create_crawler(spec):
+            return GitHubCrawler(
+                proxies=spec['proxies'],
+                search_type=spec['type'],
+                keywords=spec['keywords'],
+                include_extra_info=spec['include_extra_info'],
+                requests_per_proxy=self.args.requests_per_proxy,
+                scheduler=scheduler,
+                cache=cache,
+                result_cache=result_cache,
+                single_flight=single_flight,
+                limiter=limiter,
+                hedge=hedge,
+                request_timeout=self.args.request_timeout,
+                parser_backend=self.args.parser,
+                partial_reads=self.args.partial_reads,
+                max_body_bytes=self.args.max_body_kb * 1024,
+                backend=spec['backend'],
+                token=self.args.token,
+            )
+        
+        worker = CrawlWorker(
+            queue,
+            create_crawler,
+            worker_id=self.args.worker_id,
+            batch_size=self.args.batch_size,
+            threads=self.args.threads,
+            poll_interval=self.args.poll_interval,
+            exit_when_idle=self.args.exit_when_idle
+        )
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            self.logger.info('Worker interrupted, its leased items will be retried by other workers')
+        finally:
+            queue.close()
+        
+    def create_shared_crawler_factory(self, **crawler_options):
+        """Build crawlers sharing one scheduler, limiter and set of caches, and one client per backend and proxy list"""
+        scheduler = self.create_scheduler()
+        cache = self.create_cache()
+        # Shared by every job, so sessions, proxy health and parsed pages stay warm between them
+        result_cache = self.create_result_cache()
+        single_flight = SingleFlight()
+        limiter = self.create_limiter()
+        hedge = self.create_hedge()
+        clients = {}
+        clients_lock = threading.Lock()
+        
+        def create_client(backend, proxies):
+            key = (backend, tuple(proxies))
+            with clients_lock:
+                if key in clients:
+                    return clients[key]
+                client_class = GitHubApiClient if backend == 'api' else GitHubClient
+                options = {'token': self.args.token} if backend == 'api' else {'max_body_bytes': self.args.max_body_kb * 1024}
+                clients[key] = client_class(
+                    proxies,
+                    requests_per_proxy=self.args.requests_per_proxy,
+                    scheduler=scheduler,
+                    cache=cache,
+                    single_flight=single_flight,
+                    limiter=limiter,
+                    hedge=hedge,
+                    timeout=self.args.request_timeout,
+                    **options
+                )
+                return clients[key]
+        
+        def create_crawler(input_data, options):
+            return GitHubCrawler(
+                proxies=input_data['proxies'],
+                search_type=input_data['type'],
+                keywords=input_data['keywords'],
+                include_extra_info=options['extra_info'],
+                max_pages=options['max_pages'],
+                max_results=options['max_results'],
+                shard=options['shard'],
+                deadline=options['deadline'],
+                backend=options['backend'],
+                requests_per_proxy=self.args.requests_per_proxy,
+                scheduler=scheduler,
+                cache=cache,
+                result_cache=result_cache,
+                limiter=limiter,
+                parser_backend=self.args.parser,
+                partial_reads=self.args.partial_reads,
+                client=create_client(options['backend'], input_data['proxies']),
+                **crawler_options
+            )
+        
+        return create_crawler
+        
+    def serve(self):
+        service = CrawlService(
+            self.create_shared_crawler_factory(),
+            max_jobs=self.args.max_jobs,
+            max_queued=self.args.max_queued_jobs,
+            history=self.args.job_history
+        )
+        server = CrawlServer(service, port=self.args.port, host=self.args.host)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.logger.info('Service interrupted, waiting for the running jobs')
+        finally:
+            server.close()
+            service.close()
 
 
 def main():
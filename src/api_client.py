@@ -0,0 +1,135 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from src.concurrency import AdaptiveLimiter
+from src.enums import SearchType
+from src.exceptions import GitHubCrawlerException
+from src.hedging import HedgePolicy
+from src.github_client import GitHubClient
+from src.http_cache import HttpCache
+from src.rate_limiter import RequestScheduler
+from src.single_flight import SingleFlight
+
+REPOSITORY_FIELDS = (
+    'owner { login } '
+    'languages(first: 100, orderBy: {field: SIZE, direction: DESC}) { totalSize edges { size node { name } } }'
+)
+ISSUE_FIELDS = 'owner { login } name issue(number: $number%d) { number title }'
+
+
+class GitHubApiClient(GitHubClient):
+    """Responsible for making requests to GitHub's REST and GraphQL APIs.
+
+    Shares the proxy pool, scheduler and cache of GitHubClient. Search goes
+    through the REST search endpoints, extra info through GraphQL queries
+    covering up to ``BATCH_SIZE`` results each.
+    """
+
+    BASE_URL = 'https://api.github.com'
+    HEADERS = {
+        'User-Agent': 'github-crawler',
+        'Accept': 'application/vnd.github+json',
+        'X-GitHub-Api-Version': '2022-11-28'
+    }
+    SEARCH_PATHS = {
+        SearchType.REPOSITORIES: ('repositories', ''),
+        SearchType.ISSUES: ('issues', ' is:issue'),
+    }
+    BATCH_SIZE = 100
+    PER_PAGE = 100
+    # The search API lists the first 1000 matches only and answers 422 for pages past them
+    MAX_PAGES = 1000 // PER_PAGE
+
+    def __init__(self,
+                 proxies: List[str],
+                 token: Optional[str] = None,
+                 logger: logging.Logger = None,
+                 base_url: str = BASE_URL,
+                 requests_per_proxy: int = 4,
+                 scheduler: Optional[RequestScheduler] = None,
+                 cache: Optional[HttpCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 limiter: Optional[AdaptiveLimiter] = None,
+                 hedge: Optional[HedgePolicy] = None,
+                 timeout: float = 10.0):
+        super().__init__(
+            proxies,
+            logger=logger,
+            base_url=base_url,
+            requests_per_proxy=requests_per_proxy,
+            scheduler=scheduler,
+            cache=cache,
+            single_flight=single_flight,
+            limiter=limiter,
+            hedge=hedge,
+            timeout=timeout
+        )
+        if token:
+            self.HEADERS = {**self.HEADERS, 'Authorization': f'Bearer {token}'}
+        else:
+            self.logger.warning('No API token given, GitHub allows 10 search requests per minute without one')
+
+    def search(self, keywords: List[str], search_type: SearchType, page: int = 1) -> requests.Response:
+        """Search for repositories or issues, ``PER_PAGE`` results per page"""
+        if search_type not in self.SEARCH_PATHS:
+            raise GitHubCrawlerException(f'The API backend cannot search {search_type.value}')
+        self.logger.info(f'Searching for {search_type.value} with keywords: {keywords} (page {page})')
+        path, qualifier = self.SEARCH_PATHS[search_type]
+        params = {
+            'q': ' '.join(keywords) + qualifier,
+            'per_page': str(self.PER_PAGE),
+            'page': str(page)
+        }
+        return self.make_request(f'{self.base_url}/search/{path}', params)
+
+    def graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a GraphQL query and return its data, including partial data next to errors"""
+        url = f'{self.base_url}/graphql'
+        try:
+            response = self.scheduler.run(url, lambda: self._send(url, json_body={'query': query, 'variables': variables}))
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.logger.error(f'Error during request: {str(e)}')
+            raise GitHubCrawlerException(f'Error during request: {str(e)}')
+        for error in payload.get('errors') or []:
+            self.logger.warning(f'GraphQL error: {error.get("message")}')
+        if payload.get('data') is None:
+            raise GitHubCrawlerException('Error during request: GraphQL query returned no data')
+        return payload['data']
+
+    def get_extra_info_batch(self, urls: List[str], search_type: SearchType) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch the GraphQL node of every result URL, at most ``BATCH_SIZE`` per query"""
+        nodes = {}
+        for start in range(0, len(urls), self.BATCH_SIZE):
+            batch = urls[start:start + self.BATCH_SIZE]
+            self.logger.info(f'Getting extra info for {len(batch)} {search_type.value}')
+            query, variables = build_batch_query(batch, search_type)
+            data = self.graphql(query, variables)
+            for position, url in enumerate(batch):
+                nodes[url] = data.get(f'r{position}')
+        return nodes
+
+
+def build_batch_query(urls: List[str], search_type: SearchType) -> Tuple[str, Dict[str, Any]]:
+    """One aliased ``repository`` field per URL, ``r0`` to ``rN``, with its arguments as variables"""
+    declarations = []
+    fields = []
+    variables = {}
+    for position, url in enumerate(urls):
+        parts = url.rstrip('/').split('/')
+        owner, name = parts[3], parts[4]
+        variables[f'owner{position}'] = owner
+        variables[f'name{position}'] = name
+        declarations += [f'$owner{position}: String!', f'$name{position}: String!']
+        if search_type == SearchType.REPOSITORIES:
+            selection = REPOSITORY_FIELDS
+        else:
+            variables[f'number{position}'] = int(parts[6])
+            declarations.append(f'$number{position}: Int!')
+            selection = ISSUE_FIELDS % position
+        fields.append(f'r{position}: repository(owner: $owner{position}, name: $name{position}) {{ {selection} }}')
+    query = f'query({", ".join(declarations)}) {{ {" ".join(fields)} }}'
+    return query, variables
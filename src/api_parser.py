@@ -0,0 +1,56 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.enums import SearchType
+
+
+class ApiResultParser:
+    """Responsible for mapping API responses onto the output of ResultParser"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def parse_search_results(self, body: str, search_type: SearchType) -> List[Dict[str, Any]]:
+        self.logger.info(f'Parsing results of {search_type.value} search')
+        items = json.loads(body).get('items', [])
+        self.logger.info(f'Found {len(items)} results')
+        return [{'url': item['html_url']} for item in items]
+
+    def parse_result_count(self, body: str) -> Optional[int]:
+        return json.loads(body).get('total_count')
+
+    def parse_repository_info(self, node: Optional[Dict[str, Any]], repo_url: str) -> Dict[str, Any]:
+        """Language sizes become percentages with one decimal, as github.com shows them"""
+        owner = repo_url.split('/')[-2]
+        if node is None:
+            self.logger.error(f'Error parsing info for {repo_url}: repository not found')
+            return {
+                'owner': owner,
+                'language_stats': {}
+            }
+        languages = node['languages']
+        total = languages['totalSize'] or 1
+        return {
+            'owner': node['owner']['login'],
+            'language_stats': {
+                edge['node']['name']: round(edge['size'] * 100 / total, 1) for edge in languages['edges']
+            }
+        }
+
+    def parse_thread_info(self, node: Optional[Dict[str, Any]], url: str) -> Dict[str, Any]:
+        parts = url.rstrip('/').split('/')
+        issue = node.get('issue') if node is not None else None
+        if issue is None:
+            self.logger.error(f'Error parsing info for {url}: issue not found')
+        return {
+            'owner': node['owner']['login'] if node is not None else parts[3],
+            'repository': node['name'] if node is not None else parts[4],
+            'number': issue['number'] if issue is not None else int(parts[6]),
+            'title': issue['title'] if issue is not None else None
+        }
+
+    def parse_extra_info(self, node: Optional[Dict[str, Any]], url: str, search_type: SearchType) -> Dict[str, Any]:
+        if search_type == SearchType.REPOSITORIES:
+            return self.parse_repository_info(node, url)
+        return self.parse_thread_info(node, url)
@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Mapping, Optional
+
+import aiohttp
+from multidict import CIMultiDict
+
+from src.body_reader import BodyReader, BodyScanner
+from src.concurrency import OVERLOAD_STATUS_CODES, AdaptiveLimiter
+from src.enums import SearchType
+from src.exceptions import GitHubCrawlerException
+from src.hedging import HedgePolicy
+from src import metrics
+from src.github_client import GitHubClient
+from src.http_cache import CacheEntry, HttpCache
+from src.proxy_pool import ProxyPool, ProxyState
+from src.rate_limiter import RequestScheduler
+from src.single_flight import AsyncSingleFlight
+
+
+class AsyncResponse:
+    """Body and metadata of a response read by AsyncGitHubClient"""
+
+    def __init__(self, url: str, status_code: int, headers: Mapping[str, str], content: bytes, encoding: str):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors='replace')
+
+
+class AsyncGitHubClient:
+    """Responsible for making HTTP requests to GitHub on an asyncio event loop"""
+
+    BASE_URL = GitHubClient.BASE_URL
+
+    def __init__(self,
+                 proxies: List[str],
+                 logger: logging.Logger = None,
+                 base_url: str = BASE_URL,
+                 concurrency: int = 100,
+                 requests_per_proxy: int = 4,
+                 scheduler: Optional[RequestScheduler] = None,
+                 cache: Optional[HttpCache] = None,
+                 max_body_bytes: int = 5 * 1024 * 1024,
+                 limiter: Optional[AdaptiveLimiter] = None,
+                 hedge: Optional[HedgePolicy] = None,
+                 timeout: float = 10.0):
+        self.logger = logger or logging.getLogger(__name__)
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.proxy_pool = ProxyPool(proxies, max_in_flight=requests_per_proxy)
+        self.scheduler = scheduler or RequestScheduler()
+        self.cache = cache
+        self.max_body_bytes = max_body_bytes
+        self.single_flight = AsyncSingleFlight()
+        self.limiter = limiter
+        self.hedge = hedge
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._proxy_released: Optional[asyncio.Condition] = None
+        self._slot_released: Optional[asyncio.Condition] = None
+        self.logger.info(f'Using {len(self.proxy_pool)} proxy route(s)')
+
+    async def __aenter__(self) -> 'AsyncGitHubClient':
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, headers=GitHubClient.HEADERS)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._proxy_released = asyncio.Condition()
+        self._slot_released = asyncio.Condition()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _acquire_proxy(self, exclude: Optional[ProxyState] = None) -> ProxyState:
+        async with self._proxy_released:
+            while True:
+                proxy = self.proxy_pool.try_acquire(exclude)
+                if proxy is not None:
+                    return proxy
+                try:
+                    await asyncio.wait_for(self._proxy_released.wait(), self.proxy_pool.next_available_in())
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release_proxy(self, proxy: ProxyState, latency: float, failed: bool) -> None:
+        self.proxy_pool.release(proxy, latency, failed)
+        async with self._proxy_released:
+            self._proxy_released.notify_all()
+
+    async def _cancel_proxy(self, proxy: ProxyState) -> None:
+        self.proxy_pool.cancel(proxy)
+        async with self._proxy_released:
+            self._proxy_released.notify_all()
+
+    async def _acquire_slot(self) -> Optional[float]:
+        """Wait for a slot under the adaptive limit, return its start time or None without a limiter"""
+        if self.limiter is None:
+            return None
+        async with self._slot_released:
+            while True:
+                slot = self.limiter.try_acquire()
+                if slot is not None:
+                    return slot
+                await self._slot_released.wait()
+
+    async def _release_slot(self, slot: Optional[float], latency: float, overloaded: bool) -> None:
+        if slot is None:
+            return
+        self.limiter.release(slot, latency, overloaded)
+        async with self._slot_released:
+            self._slot_released.notify_all()
+
+    async def _cancel_slot(self, slot: Optional[float]) -> None:
+        if slot is None:
+            return
+        self.limiter.cancel()
+        async with self._slot_released:
+            self._slot_released.notify_all()
+
+    async def make_request(self,
+                           url: str,
+                           params: Optional[Dict[str, str]] = None,
+                           scanner: Optional[Callable[[], BodyScanner]] = None) -> AsyncResponse:
+        """Make a request to GitHub, pacing and retrying it through the scheduler.
+
+        Identical requests made while one is in flight share its response.
+        """
+        if self.session is None:
+            raise GitHubCrawlerException('AsyncGitHubClient must be used as an async context manager')
+        key = (url, tuple(sorted((params or {}).items())), scanner)
+        return await self.single_flight.do(key, lambda: self._make_request(url, params, scanner))
+
+    async def _make_request(self,
+                            url: str,
+                            params: Optional[Dict[str, str]] = None,
+                            scanner: Optional[Callable[[], BodyScanner]] = None) -> AsyncResponse:
+        entry = self.cache.lookup(url, params) if self.cache else None
+        if entry is not None and entry.is_fresh(self.cache.ttl):
+            self.logger.info(f'Cache hit for {entry.key}')
+            return self._cached_response(entry)
+        headers = entry.conditional_headers() if entry is not None else None
+        try:
+            response = await self.scheduler.run_async(
+                url,
+                lambda: self._hedged_send(url, params, headers, scanner),
+                retry_on=(aiohttp.ClientError, asyncio.TimeoutError)
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f'Error during request: {str(e)}')
+            raise GitHubCrawlerException(f'Error during request: {str(e)}')
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(entry)
+            return self._cached_response(entry)
+        if response.status_code >= 400:
+            self.logger.error(f'Error during request: {response.status_code} for url: {response.url}')
+            raise GitHubCrawlerException(f'Error during request: {response.status_code} for url: {response.url}')
+        if self.cache:
+            self.cache.store(url, params, response)
+        return response
+
+    def _cached_response(self, entry: CacheEntry) -> AsyncResponse:
+        return AsyncResponse(entry.url, 200, CIMultiDict(entry.headers), entry.body, entry.encoding or 'utf-8')
+
+    async def _hedged_send(self,
+                           url: str,
+                           params: Optional[Dict[str, str]] = None,
+                           headers: Optional[Dict[str, str]] = None,
+                           scanner: Optional[Callable[[], BodyScanner]] = None) -> AsyncResponse:
+        """Send a request and, if it outlasts the hedge delay, a duplicate through another proxy; the loser is cancelled"""
+        delay = self.hedge.delay() if self.hedge is not None else None
+        if delay is None:
+            return await self._send(url, params, headers, scanner)
+        leased: List[ProxyState] = []
+        first = asyncio.ensure_future(self._send(url, params, headers, scanner, leased=leased))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return await first
+        # Hedge only through a proxy that is free right now, waiting for one would only add load
+        proxy = self.proxy_pool.try_acquire(exclude=leased[0] if leased else None)
+        if proxy is None:
+            return await first
+        if not self.hedge.try_hedge():
+            await self._cancel_proxy(proxy)
+            return await first
+        self.logger.info(f'Hedging {url} after {delay:.2f}s')
+        second = asyncio.ensure_future(self._send(url, params, headers, scanner, proxy=proxy))
+        pending = {first, second}
+        winner = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # A failed request only loses if the other one answers
+                winner = next((task for task in done if task.exception() is None), None)
+        finally:
+            for task in pending:
+                task.cancel()
+        if winner is None:
+            return first.result()
+        self.hedge.record(won=winner is second)
+        return winner.result()
+
+    async def _send(self,
+                    url: str,
+                    params: Optional[Dict[str, str]] = None,
+                    headers: Optional[Dict[str, str]] = None,
+                    scanner: Optional[Callable[[], BodyScanner]] = None,
+                    leased: Optional[List[ProxyState]] = None,
+                    proxy: Optional[ProxyState] = None) -> AsyncResponse:
+        """Send a single request, bounded by the client's concurrency limit.
+
+        ``proxy`` is an already leased proxy to send through and the proxy used is appended to ``leased``.
+        The proxy is leased before a concurrency or limiter slot is taken, so no slot is held while waiting for one.
+        """
+        if proxy is None:
+            proxy = await self._acquire_proxy()
+        if leased is not None:
+            leased.append(proxy)
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            await self._cancel_proxy(proxy)
+            raise
+        try:
+            try:
+                slot = await self._acquire_slot()
+            except asyncio.CancelledError:
+                await self._cancel_proxy(proxy)
+                raise
+            started = time.monotonic()
+            failed = True
+            status = 'error'
+            try:
+                async with self.session.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    proxy=proxy.url,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                ) as response:
+                    self.logger.info(f'Response status: {response.status} via {proxy.address or "direct"}')
+                    failed = response.status == 429 or response.status >= 500
+                    if scanner is not None and response.status == 200:
+                        content = await self._read_partial_body(response, scanner())
+                        encoding = response.charset or 'utf-8'
+                    else:
+                        content = await response.read()
+                        encoding = response.get_encoding()
+                    status = response.status
+                    metrics.inc('response_bytes_total', len(content))
+                    return AsyncResponse(
+                        str(response.url),
+                        response.status,
+                        CIMultiDict(response.headers),
+                        content,
+                        encoding
+                    )
+            except asyncio.TimeoutError:
+                status = 'timeout'
+                raise
+            finally:
+                latency = time.monotonic() - started
+                await self._release_proxy(proxy, latency, failed)
+                await self._release_slot(slot, latency, status == 'timeout' or status in OVERLOAD_STATUS_CODES)
+                if self.hedge is not None:
+                    self.hedge.observe(latency)
+                metrics.inc('requests_total', proxy=proxy.address or 'direct', status=status)
+                metrics.observe('request_seconds', latency, proxy=proxy.address or 'direct')
+        finally:
+            self._semaphore.release()
+
+    async def _read_partial_body(self, response: aiohttp.ClientResponse, scanner: BodyScanner) -> bytes:
+        """Read the streamed body until the scanner is satisfied, then drop the connection"""
+        reader = BodyReader(scanner, self.max_body_bytes)
+        async for chunk in response.content.iter_chunked(BodyReader.CHUNK_SIZE):
+            if reader.feed(chunk):
+                response.close()
+                metrics.inc('partial_reads_total', reason=reader.stopped)
+                self.logger.debug(f'Stopped reading {response.url} at {len(reader.body)} bytes ({reader.stopped})')
+                break
+        return bytes(reader.body)
+
+    async def get_repository(self, repo_url: str, scanner: Optional[Callable[[], BodyScanner]] = None) -> AsyncResponse:
+        """Get extra information for a repository, reading only as far as ``scanner`` needs"""
+        self.logger.info(f'Getting info for {repo_url}')
+        return await self.make_request(repo_url, scanner=scanner)
+
+    async def search(self, keywords: List[str], search_type: SearchType, page: int = 1) -> AsyncResponse:
+        """Search for repositories, issues, or discussions"""
+        self.logger.info(f'Searching for {search_type.value} with keywords: {keywords} (page {page})')
+        params = {
+            'q': ' '.join(keywords),
+            'type': search_type.value
+        }
+        if page > 1:
+            params['p'] = str(page)
+        url = f'{self.base_url}/search'
+        return await self.make_request(url, params)
@@ -0,0 +1,106 @@
+import concurrent.futures
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src import metrics
+from src.concurrency import TENANT
+from src.github_crawler import GitHubCrawler
+from src.output import write_results
+from src.service import parse_job_request
+
+
+class BatchJob:
+    """A job of a batch input file and how its crawl went"""
+
+    def __init__(self, index: int, request: Any, output_file: str):
+        self.index = index
+        self.request = request
+        self.output_file = output_file
+        self.status = 'pending'
+        self.results = 0
+        self.complete: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job': self.index,
+            'keywords': self.request.get('keywords') if isinstance(self.request, dict) else None,
+            'output_file': self.output_file,
+            'status': self.status,
+            'results': self.results,
+            'complete': self.complete,
+            'error': self.error,
+            'seconds': self.seconds,
+        }
+
+
+def batch_jobs(input_data: Dict[str, Any], output_file: str) -> List[BatchJob]:
+    """The jobs of a batch input file.
+
+    Jobs inherit the file's proxies unless they list their own. A job
+    without an ``output_file`` writes to ``output_file`` numbered after its
+    position, ``data/results.3.json`` for the third job.
+    """
+    root, extension = os.path.splitext(output_file)
+    jobs = []
+    for index, entry in enumerate(input_data['jobs'], start=1):
+        request = entry
+        job_output = f'{root}.{index}{extension}'
+        if isinstance(entry, dict):
+            request = {'proxies': input_data.get('proxies', []), **entry}
+            job_output = request.pop('output_file', job_output)
+        jobs.append(BatchJob(index, request, job_output))
+    return jobs
+
+
+class BatchRunner:
+    """Crawls the jobs of a batch input file in one process.
+
+    Up to ``max_jobs`` jobs run side by side on crawlers from
+    ``crawler_factory``, which share its scheduler, clients and caches. Each
+    job runs as its own tenant of the adaptive limiter, so request slots are
+    handed out to the running jobs in turn. Every job writes its own output
+    file and a job that fails is reported without stopping the others.
+    """
+
+    def __init__(self,
+                 crawler_factory: Callable[[Dict[str, Any], Dict[str, Any]], GitHubCrawler],
+                 max_jobs: int = 4,
+                 output_format: str = 'json',
+                 defaults: Optional[Dict[str, Any]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.crawler_factory = crawler_factory
+        self.max_jobs = max(1, max_jobs)
+        self.output_format = output_format
+        self.defaults = defaults or {}
+
+    def run(self, jobs: List[BatchJob]) -> List[BatchJob]:
+        with concurrent.futures.ThreadPoolExecutor(self.max_jobs, thread_name_prefix='batch-job') as executor:
+            list(executor.map(self._run, jobs))
+        failed = sum(job.status == 'failed' for job in jobs)
+        self.logger.info(f'Batch finished: {len(jobs) - failed} of {len(jobs)} jobs done, {failed} failed')
+        return jobs
+
+    def _run(self, job: BatchJob) -> None:
+        TENANT.set(f'job-{job.index}')
+        started = time.monotonic()
+        try:
+            input_data, options = parse_job_request(job.request, self.defaults)
+            self.logger.info(f'Job {job.index} started: {input_data["keywords"]}')
+            crawler = self.crawler_factory(input_data, options)
+            with open(job.output_file, 'w') as f:
+                job.results = write_results(crawler.iter_search(), f, self.output_format)
+            job.complete = crawler.complete
+            job.status = 'done'
+        except Exception as exc:
+            self.logger.error(f'Job {job.index} failed: {exc}')
+            job.status = 'failed'
+            job.error = str(exc)
+        job.seconds = round(time.monotonic() - started, 3)
+        metrics.inc('jobs_total', status=job.status)
+        if job.status == 'done':
+            metrics.inc('results_written_total', job.results)
+            self.logger.info(f'Job {job.index} saved {job.results} results to {job.output_file}')
@@ -0,0 +1,104 @@
+import re
+from typing import Callable, Dict, Optional
+
+from src.enums import SearchType
+
+
+class BodyScanner:
+    """Finds where a streamed HTML page has everything ResultParser reads.
+
+    ``complete`` is called with the whole body read so far after every chunk
+    and returns True once the rest of the page can be skipped, with ``end``
+    set to the offset just past the section. Scanners keep their position
+    between calls, so every response needs a new one.
+    """
+
+    end: Optional[int] = None
+
+    def complete(self, body: bytes) -> bool:
+        raise NotImplementedError
+
+
+class SectionScanner(BodyScanner):
+    """Complete once the first div with the class ``class_name`` is closed"""
+
+    # Rescanned tail of the body, long enough for an opening tag split across chunks
+    OVERLAP = 1024
+    DIV_TAG = re.compile(rb'<(/?)div[\s/>]', re.IGNORECASE)
+
+    def __init__(self, class_name: str = 'Layout-sidebar'):
+        self.start_tag = re.compile(
+            rb'<div\b[^>]*\bclass=["\'](?:[^"\']*\s)?' + re.escape(class_name.encode('utf-8')) + rb'["\'\s]',
+            re.IGNORECASE
+        )
+        self.position = 0
+        self.depth: Optional[int] = None
+
+    def complete(self, body: bytes) -> bool:
+        if self.depth is None:
+            match = self.start_tag.search(body, max(0, self.position - self.OVERLAP))
+            if match is None:
+                self.position = len(body)
+                return False
+            self.depth = 1
+            self.position = match.end()
+        for match in self.DIV_TAG.finditer(body, self.position):
+            self.depth += -1 if match.group(1) else 1
+            self.position = match.end()
+            if self.depth == 0:
+                self.end = match.end()
+                return True
+        return False
+
+
+class TitleScanner(BodyScanner):
+    """Complete once the page title is closed"""
+
+    END_TAG = re.compile(rb'</title\s*>', re.IGNORECASE)
+
+    def __init__(self):
+        self.position = 0
+
+    def complete(self, body: bytes) -> bool:
+        match = self.END_TAG.search(body, max(0, self.position - 16))
+        if match is not None:
+            self.end = match.end()
+            return True
+        self.position = len(body)
+        return False
+
+
+# The part of a result page each search type's extra info is parsed from
+SCANNERS: Dict[SearchType, Callable[[], BodyScanner]] = {
+    SearchType.REPOSITORIES: SectionScanner,
+    SearchType.ISSUES: TitleScanner,
+    SearchType.DISCUSSIONS: TitleScanner,
+}
+
+
+class BodyReader:
+    """Collects a streamed body until the scanner is satisfied or ``max_bytes`` is reached.
+
+    Everything after the scanned section is dropped, so it is not parsed either.
+    ``stopped`` tells why reading ended early: ``section_end`` or ``max_bytes``,
+    or None when the whole body was read.
+    """
+
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, scanner: Optional[BodyScanner] = None, max_bytes: int = 5 * 1024 * 1024):
+        self.scanner = scanner
+        self.max_bytes = max_bytes
+        self.body = bytearray()
+        self.stopped: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a decoded chunk, return True once the rest of the body can be skipped"""
+        self.body += chunk
+        if self.scanner is not None and self.scanner.complete(self.body) and self.scanner.end <= self.max_bytes:
+            del self.body[self.scanner.end:]
+            self.stopped = 'section_end'
+        elif len(self.body) >= self.max_bytes:
+            del self.body[self.max_bytes:]
+            self.stopped = 'max_bytes'
+        return self.stopped is not None
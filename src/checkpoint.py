@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from src.exceptions import GitHubCrawlerException
+
+
+class CheckpointJournal:
+    """Append-only journal of completed crawl work.
+
+    The first line identifies the job; every following line records a
+    finished search page with its parsed results or a finished repository
+    with its extra info. Pages are keyed by their number or, in a sharded
+    crawl, by their shard's qualifiers and number. Each record is written with a single append and
+    flushed under a lock, so concurrent workers never interleave lines. A
+    line cut short by a crash is ignored when the journal is loaded.
+
+    Only the work loaded on resume is kept in memory; records written by
+    this run go to the file alone. ``complete`` removes the journal once
+    the crawl has finished.
+    """
+
+    def __init__(self, path: str, job: Dict[str, Any], resume: bool = False, logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.path = path
+        self.job = job
+        self.pages: Dict[Union[int, str], List[Dict[str, Any]]] = {}
+        self.repositories: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._load()
+            self._file = open(path, 'a', encoding='utf-8')
+            self.logger.info(
+                f'Resuming from {path}: {len(self.pages)} page(s) and {len(self.repositories)} repositories done'
+            )
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+            self._append(json.dumps({'type': 'job', 'job': job}))
+
+    def completed_page(self, page: Union[int, str]) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the results recorded for a search page, None if it is not done"""
+        with self._lock:
+            results = self.pages.get(page)
+        return [dict(result) for result in results] if results is not None else None
+
+    def completed_repository(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.repositories.get(url)
+
+    def record_page(self, page: Union[int, str], results: List[Dict[str, Any]]) -> None:
+        record = json.dumps({'type': 'page', 'page': page, 'results': results})
+        with self._lock:
+            self._append(record)
+
+    def record_repository(self, url: str, extra: Dict[str, Any]) -> None:
+        record = json.dumps({'type': 'repository', 'url': url, 'extra': extra})
+        with self._lock:
+            self._append(record)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def complete(self) -> None:
+        """Close and delete the journal of a crawl that finished, there is nothing left to resume"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _append(self, record: str) -> None:
+        self._file.write(record + '\n')
+        self._file.flush()
+
+    def _load(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        if not records or records[0].get('type') != 'job':
+            raise GitHubCrawlerException(f'Checkpoint {self.path} has no job header')
+        if records[0]['job'] != self.job:
+            raise GitHubCrawlerException(f'Checkpoint {self.path} belongs to a different job: {records[0]["job"]}')
+        for record in records[1:]:
+            if record.get('type') == 'page':
+                self.pages[record['page']] = record['results']
+            elif record.get('type') == 'repository':
+                self.repositories[record['url']] = record['extra']
+        if lines[-1]:
+            # Terminate a line cut short by a crash so the next record starts on its own line
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n')
@@ -0,0 +1,158 @@
+import collections
+import contextvars
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from src import metrics
+
+# Responses telling the client to back off: rate limited, or GitHub shedding load
+OVERLOAD_STATUS_CODES = {429, 502, 503, 504}
+
+# The job a request is made for; jobs sharing a limiter get its slots in turn
+TENANT: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('tenant', default=None)
+
+
+class AdaptiveLimiter:
+    """Limits the requests in flight, adapting the limit with AIMD.
+
+    A request completing while every slot was taken raises the limit by
+    ``1 / limit``, about one slot per round of requests. An overloaded
+    response (429, 502-504) or a timeout multiplies it by ``backoff``. A
+    smoothed latency over ``latency_tolerance`` times the baseline, the
+    lowest latency seen recently, multiplies it by the gentler
+    ``latency_backoff``. Requests sent before the last decrease do not
+    decrease it again, so a burst of errors counts once. The limit stays
+    between ``min_limit`` and ``max_limit``.
+
+    When jobs share the limiter, a freed slot goes to a waiting job with the
+    fewest requests in flight, so a job with many threads cannot starve the
+    others. The job is read from ``TENANT``.
+    """
+
+    # Latency rises smaller than this are noise, not congestion
+    LATENCY_SLACK = 0.05
+    SMOOTHING = 0.2
+    # How fast the baseline forgets its minimum, so it follows a slower network
+    BASELINE_DRIFT = 0.01
+
+    def __init__(self,
+                 initial: int = 5,
+                 min_limit: int = 1,
+                 max_limit: int = 64,
+                 backoff: float = 0.5,
+                 latency_backoff: float = 0.9,
+                 latency_tolerance: float = 2.0,
+                 logger: logging.Logger = None):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f'Invalid concurrency bounds: {min_limit}..{max_limit}')
+        self.logger = logger or logging.getLogger(__name__)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._last_decrease = 0.0
+        self._waiting: collections.Counter = collections.Counter()
+        self._tenant_in_flight: collections.Counter = collections.Counter()
+        self._condition = threading.Condition()
+        metrics.set_gauge('concurrency_limit', self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> Optional[float]:
+        """Take a slot and return its start time, or None if every slot is taken"""
+        tenant = TENANT.get()
+        with self._condition:
+            if self.in_flight >= self.limit or not self._turn(tenant):
+                return None
+            return self._take(tenant)
+
+    def acquire(self) -> float:
+        """Take a slot, waiting for one to free up and for this job's turn, and return its start time"""
+        tenant = TENANT.get()
+        with self._condition:
+            self._waiting[tenant] += 1
+            try:
+                while self.in_flight >= self.limit or not self._turn(tenant):
+                    self._condition.wait()
+            finally:
+                self._waiting[tenant] -= 1
+                if not self._waiting[tenant]:
+                    del self._waiting[tenant]
+            return self._take(tenant)
+
+    def release(self, started: float, latency: float, overloaded: bool = False) -> None:
+        """Free a slot and adapt the limit to how its request went"""
+        with self._condition:
+            saturated = self.in_flight >= self.limit
+            self._give_back(TENANT.get())
+            congested = False
+            if not overloaded:
+                self.latency = latency if self.latency is None else self.latency + self.SMOOTHING * (latency - self.latency)
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    self.baseline += self.BASELINE_DRIFT * (latency - self.baseline)
+                congested = (
+                    self.latency > self.baseline * self.latency_tolerance
+                    and self.latency - self.baseline > self.LATENCY_SLACK
+                )
+            if (overloaded or congested) and started >= self._last_decrease:
+                self._set_limit(self._limit * (self.backoff if overloaded else self.latency_backoff))
+                self._last_decrease = time.monotonic()
+                reason = 'overloaded responses' if overloaded else f'latency {self.latency:.2f}s over baseline {self.baseline:.2f}s'
+                self.logger.info(f'Concurrency limit lowered to {self.limit} after {reason}')
+            elif not overloaded and not congested and saturated and self._limit < self.max_limit:
+                previous = self.limit
+                self._set_limit(self._limit + 1 / self._limit)
+                if self.limit != previous:
+                    self.logger.info(f'Concurrency limit raised to {self.limit}')
+            metrics.set_gauge('in_flight', self.in_flight)
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """Free a slot whose request was never sent, leaving the limit as it is"""
+        with self._condition:
+            self._give_back(TENANT.get())
+            metrics.set_gauge('in_flight', self.in_flight)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'latency': self.latency,
+                'baseline': self.baseline,
+            }
+
+    def _turn(self, tenant: Optional[str]) -> bool:
+        """Whether no other waiting job has fewer requests in flight than ``tenant``"""
+        if len(self._waiting) <= 1:
+            return True
+        in_flight = self._tenant_in_flight[tenant]
+        return all(self._tenant_in_flight[other] >= in_flight for other in self._waiting)
+
+    def _take(self, tenant: Optional[str]) -> float:
+        self.in_flight += 1
+        self._tenant_in_flight[tenant] += 1
+        metrics.set_gauge('in_flight', self.in_flight)
+        return time.monotonic()
+
+    def _give_back(self, tenant: Optional[str]) -> None:
+        self.in_flight -= 1
+        self._tenant_in_flight[tenant] -= 1
+        if not self._tenant_in_flight[tenant]:
+            del self._tenant_in_flight[tenant]
+
+    def _set_limit(self, limit: float) -> None:
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+        metrics.set_gauge('concurrency_limit', self.limit)
@@ -0,0 +1,206 @@
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src import metrics
+from src.api_client import GitHubApiClient
+from src.github_crawler import GitHubCrawler
+from src.work_queue import WorkItem, WorkQueue
+
+SEARCH_PAGE = 'search_page'
+EXTRA_INFO = 'extra_info'
+
+
+def job_id(spec: Dict[str, Any]) -> str:
+    """Id of a job, the same for the same input and options"""
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class Coordinator:
+    """Breaks crawl jobs into work items on a WorkQueue and assembles their results.
+
+    The search pages of a job are queued when it is submitted; the worker
+    crawling a search page queues the extra info of every result it finds.
+    Job ids are derived from the job, so submitting an unfinished job again,
+    after the coordinator died for instance, picks up its queued and
+    finished items and retries the failed ones. A job submitted again after
+    it finished, or with ``fresh``, is crawled anew.
+    """
+
+    def __init__(self, queue: WorkQueue, poll_interval: float = 1.0, logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.queue = queue
+        self.poll_interval = poll_interval
+
+    def submit(self,
+               input_data: Dict[str, Any],
+               max_pages: int = 1,
+               include_extra_info: bool = False,
+               backend: str = 'html',
+               fresh: bool = False) -> str:
+        if backend == 'api':
+            max_pages = min(max_pages, GitHubApiClient.MAX_PAGES)
+        spec = {
+            'keywords': input_data['keywords'],
+            'proxies': input_data['proxies'],
+            'type': input_data['type'],
+            'include_extra_info': include_extra_info,
+            'backend': backend,
+            'max_pages': max_pages,
+        }
+        job = job_id(spec)
+        self.queue.add_job(job, spec)
+        stats = self.queue.stats(job)
+        if fresh or (sum(stats.values()) and stats['pending'] + stats['leased'] == 0):
+            cleared = self.queue.clear_job(job)
+            if cleared:
+                self.logger.info(f'Job {job}: cleared {cleared} items of an earlier run')
+        else:
+            retried = self.queue.retry_failed(job)
+            if retried:
+                self.logger.info(f'Job {job}: retrying {retried} failed items')
+        added = self.queue.put(job, SEARCH_PAGE, [(str(page), page, {'page': page}) for page in range(1, max_pages + 1)])
+        self.logger.info(f'Job {job}: queued {added} of {max_pages} search pages')
+        return job
+
+    def wait(self, job: str, timeout: Optional[float] = None) -> Dict[str, int]:
+        """Block until no item of the job is pending or leased, return its item counts"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_stats = None
+        while True:
+            stats = self.queue.stats(job)
+            if stats != last_stats:
+                self.logger.info(f'Job {job}: {stats}')
+                last_stats = stats
+            if stats['pending'] + stats['leased'] == 0:
+                return stats
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f'Job {job} is not finished after {timeout} seconds')
+            time.sleep(self.poll_interval)
+
+    def collect(self, job: str, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Results of the job in search order, without duplicates, up to the first empty page"""
+        extra_infos = dict(self.queue.results(job, EXTRA_INFO))
+        results = []
+        seen = set()
+        for _, urls in self.queue.results(job, SEARCH_PAGE):
+            if not urls:
+                break
+            for url in urls:
+                if url in seen:
+                    continue
+                seen.add(url)
+                result = {'url': url}
+                if extra_infos.get(url):
+                    result['extra'] = extra_infos[url]
+                results.append(result)
+                if max_results is not None and len(results) >= max_results:
+                    return results
+        return results
+
+
+class CrawlWorker:
+    """Leases work items, crawls them and acks them.
+
+    ``crawler_factory`` builds the GitHubCrawler of a job from its spec and
+    one crawler is kept per job. Each lease of up to ``batch_size`` items is
+    crawled by ``threads`` threads; the extra info items of an API job are
+    enriched together, with one GraphQL query. A failed item goes back to
+    the queue. The worker runs until ``stop`` is called or, with
+    ``exit_when_idle``, until no item is pending or leased.
+    """
+
+    def __init__(self,
+                 queue: WorkQueue,
+                 crawler_factory: Callable[[Dict[str, Any]], GitHubCrawler],
+                 worker_id: Optional[str] = None,
+                 batch_size: int = 10,
+                 threads: int = 4,
+                 poll_interval: float = 1.0,
+                 exit_when_idle: bool = False,
+                 logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.queue = queue
+        self.crawler_factory = crawler_factory
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.batch_size = max(1, batch_size)
+        self.threads = max(1, threads)
+        self.poll_interval = poll_interval
+        self.exit_when_idle = exit_when_idle
+        self._crawlers: Dict[str, GitHubCrawler] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> int:
+        """Crawl items until stopped, return how many were completed"""
+        self.logger.info(f'Worker {self.worker_id} started')
+        completed = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.threads) as executor:
+            while not self._stopped.is_set():
+                items = self.queue.lease(self.worker_id, self.batch_size)
+                if not items:
+                    if self.exit_when_idle and self._idle():
+                        break
+                    self._stopped.wait(self.poll_interval)
+                    continue
+                completed += sum(executor.map(self._crawl, self._group(items)))
+        self.logger.info(f'Worker {self.worker_id} stopped after {completed} items')
+        return completed
+
+    def _idle(self) -> bool:
+        stats = self.queue.stats()
+        return stats['pending'] + stats['leased'] == 0
+
+    def _crawler(self, job: str) -> GitHubCrawler:
+        with self._lock:
+            if job not in self._crawlers:
+                self._crawlers[job] = self.crawler_factory(self.queue.job_spec(job))
+            return self._crawlers[job]
+
+    def _group(self, items: List[WorkItem]) -> List[List[WorkItem]]:
+        """Split a lease into the groups crawled together"""
+        groups = []
+        batches: Dict[str, List[WorkItem]] = {}
+        for item in items:
+            if item.kind == EXTRA_INFO and self._crawler(item.job).backend == 'api':
+                batches.setdefault(item.job, []).append(item)
+            else:
+                groups.append([item])
+        return groups + list(batches.values())
+
+    def _crawl(self, items: List[WorkItem]) -> int:
+        kind = items[0].kind
+        try:
+            crawler = self._crawler(items[0].job)
+            if kind == SEARCH_PAGE:
+                outputs = [self._crawl_search_page(crawler, items[0])]
+            else:
+                results = crawler.crawl_extra_info([{'url': item.payload['url']} for item in items], raise_errors=True)
+                outputs = [result.get('extra') for result in results]
+        except Exception as exc:
+            self.logger.error(f'Error processing {kind} {[item.key for item in items]}: {exc}')
+            for item in items:
+                self.queue.fail(item, self.worker_id, str(exc))
+                metrics.inc('work_items_total', kind=kind, status='failed')
+            return 0
+        for item, output in zip(items, outputs):
+            if not self.queue.ack(item, self.worker_id, output):
+                self.logger.warning(f'Lease of {kind} {item.key} expired before it was completed')
+            metrics.inc('work_items_total', kind=kind, status='done')
+        return len(items)
+
+    def _crawl_search_page(self, crawler: GitHubCrawler, item: WorkItem) -> List[str]:
+        page = item.payload['page']
+        results = crawler.crawl_search_page(page)
+        if crawler.include_extra_info:
+            self.queue.put(item.job, EXTRA_INFO, [(result['url'], page, {'url': result['url']}) for result in results])
+        return [result['url'] for result in results]
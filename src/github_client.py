@@ -1,67 +1,232 @@
+import concurrent.futures
+import contextvars
 import logging
-import random
-from typing import Dict, List, Optional
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
 
 import requests
 
+from src.body_reader import BodyReader, BodyScanner
+from src.concurrency import OVERLOAD_STATUS_CODES, AdaptiveLimiter
 from src.enums import SearchType
 from src.exceptions import GitHubCrawlerException
+from src.hedging import HedgePolicy
+from src import metrics
+from src.http_cache import HttpCache
+from src.proxy_pool import ProxyPool, ProxyState
+from src.rate_limiter import RequestScheduler
+from src.single_flight import SingleFlight
 
 
 class GitHubClient:
     """Responsible for making HTTP requests to GitHub"""
 
     BASE_URL = 'https://github.com'
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+    }
+    # Threads sending hedged requests; they are started on demand
+    HEDGE_THREADS = 128
     
-    def __init__(self, proxies: List[str], logger: logging.Logger = None):
+    def __init__(self, 
+                 proxies: List[str], 
+                 logger: logging.Logger = None, 
+                 base_url: str = BASE_URL,
+                 requests_per_proxy: int = 4,
+                 scheduler: Optional[RequestScheduler] = None,
+                 cache: Optional[HttpCache] = None,
+                 max_body_bytes: int = 5 * 1024 * 1024,
+                 single_flight: Optional[SingleFlight] = None,
+                 limiter: Optional[AdaptiveLimiter] = None,
+                 hedge: Optional[HedgePolicy] = None,
+                 timeout: float = 10.0):
         self.logger = logger or logging.getLogger(__name__)
-        self.session = requests.Session()
-        self.proxy = self._select_random_proxy(proxies)
-        self.logger.info(f'Selected proxy: {self.proxy}')
+        self.base_url = base_url
+        self.proxy_pool = ProxyPool(proxies, max_in_flight=requests_per_proxy)
+        self.scheduler = scheduler or RequestScheduler()
+        self.cache = cache
+        self.max_body_bytes = max_body_bytes
+        self.single_flight = single_flight or SingleFlight()
+        self.limiter = limiter
+        self.hedge = hedge
+        self.timeout = timeout
+        self._hedge_executor = None
+        if hedge is not None:
+            self._hedge_executor = concurrent.futures.ThreadPoolExecutor(self.HEDGE_THREADS, thread_name_prefix='hedge')
+        self.logger.info(f'Using {len(self.proxy_pool)} proxy route(s)')
     
-    def _select_random_proxy(self, proxies: List[str]) -> Dict[str, str]:
-        if not proxies:
-            return {}
-        proxy = random.choice(proxies)
-        return {
-            'http': f'http://{proxy}',
-            'https': f'http://{proxy}'
-        }
+    def close(self) -> None:
+        """Wait for the requests that lost a hedge and stop the hedge threads"""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=True)
     
-    def make_request(self, url: str, params: Optional[Dict[str, str]] = None) -> requests.Response:
-        """Make a request to the GitHub API"""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-        }
+    def make_request(self, 
+                     url: str, 
+                     params: Optional[Dict[str, str]] = None,
+                     scanner: Optional[Callable[[], BodyScanner]] = None) -> requests.Response:
+        """Make a request to the GitHub API, pacing and retrying it through the scheduler.
+
+        With a cache configured, fresh entries are served without a request and
+        stale ones are revalidated with a conditional request. With a ``scanner``,
+        the body is streamed and only read up to the section the scanner looks for.
+        Identical requests made while one is in flight share its response. With a
+        hedge policy, a request still running after the hedge delay is sent again
+        through another proxy and the first response wins.
+        """
+        key = (url, tuple(sorted((params or {}).items())), scanner)
+        return self.single_flight.do(key, lambda: self._make_request(url, params, scanner))
+    
+    def _make_request(self, 
+                      url: str, 
+                      params: Optional[Dict[str, str]] = None,
+                      scanner: Optional[Callable[[], BodyScanner]] = None) -> requests.Response:
+        entry = self.cache.lookup(url, params) if self.cache else None
+        if entry is not None and entry.is_fresh(self.cache.ttl):
+            self.logger.info(f'Cache hit for {entry.key}')
+            return entry.to_response()
+        headers = entry.conditional_headers() if entry is not None else None
         try:
-            response = self.session.get(
-                url, 
-                params=params,
-                proxies=self.proxy,
-                headers=headers, 
-                timeout=10
-            )
-            self.logger.info(f'Response status: {response.status_code}')
+            response = self.scheduler.run(url, lambda: self._hedged_send(url, params, headers, scanner))
+            if response.status_code == 304 and entry is not None:
+                self.cache.refresh(entry)
+                return entry.to_response()
             response.raise_for_status()
-            return response
         except requests.RequestException as e:
             self.logger.error(f'Error during request: {str(e)}')
             raise GitHubCrawlerException(f'Error during request: {str(e)}')
+        if self.cache:
+            self.cache.store(url, params, response)
+        return response
+    
+    def _hedged_send(self, 
+                     url: str, 
+                     params: Optional[Dict[str, str]] = None, 
+                     headers: Optional[Dict[str, str]] = None,
+                     scanner: Optional[Callable[[], BodyScanner]] = None) -> requests.Response:
+        """Send a request and, if it outlasts the hedge delay, a duplicate through another proxy; return the first response"""
+        delay = self.hedge.delay() if self.hedge is not None else None
+        if delay is None:
+            return self._send(url, params, headers, scanner)
+        leased: List[ProxyState] = []
+        # The hedge threads send on behalf of the caller, so they take on its context
+        first = self._hedge_executor.submit(contextvars.copy_context().run, self._send, url, params, headers, scanner, leased=leased)
+        try:
+            return first.result(timeout=delay)
+        except concurrent.futures.TimeoutError:
+            pass
+        # Only hedge through a proxy that is free right now, waiting for one would only add to the delay
+        proxy = self.proxy_pool.try_acquire(exclude=leased[0] if leased else None)
+        if proxy is None:
+            return first.result()
+        if not self.hedge.try_hedge():
+            self.proxy_pool.cancel(proxy)
+            return first.result()
+        self.logger.info(f'Hedging {url} after {delay:.2f}s')
+        second = self._hedge_executor.submit(
+            contextvars.copy_context().run, self._send, url, params, headers, scanner, proxy=proxy
+        )
+        futures = [first, second]
+        for winner in concurrent.futures.as_completed(futures):
+            # A failed request only loses if the other one answers
+            if winner.exception() is None or all(future.done() for future in futures):
+                break
+        loser = second if winner is first else first
+        loser.add_done_callback(self._discard)
+        self.hedge.record(won=winner is second)
+        return winner.result()
+    
+    @staticmethod
+    def _discard(future: concurrent.futures.Future) -> None:
+        """Close the response of a request that lost its hedge"""
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+    
+    def _send(self, 
+              url: str, 
+              params: Optional[Dict[str, str]] = None, 
+              headers: Optional[Dict[str, str]] = None,
+              scanner: Optional[Callable[[], BodyScanner]] = None,
+              json_body: Optional[Dict[str, Any]] = None,
+              leased: Optional[List[ProxyState]] = None,
+              proxy: Optional[ProxyState] = None) -> requests.Response:
+        """Send a single request through the healthiest available proxy, a POST when there is a JSON body.
+
+        ``proxy`` is a proxy already leased for the request and the proxy used
+        is appended to ``leased``. The limiter slot is taken once a proxy is
+        leased, so no slot is held while waiting for a proxy.
+        """
+        if proxy is None:
+            proxy = self.proxy_pool.acquire()
+        if leased is not None:
+            leased.append(proxy)
+        slot = self.limiter.acquire() if self.limiter is not None else None
+        started = time.monotonic()
+        failed = True
+        status = 'error'
+        send = proxy.session.get if json_body is None else partial(proxy.session.post, json=json_body)
+        try:
+            response = send(
+                url, 
+                params=params,
+                proxies=proxy.proxies,
+                headers={**self.HEADERS, **(headers or {})}, 
+                timeout=self.timeout,
+                stream=scanner is not None
+            )
+            self.logger.info(f'Response status: {response.status_code} via {proxy.address or "direct"}')
+            failed = response.status_code == 429 or response.status_code >= 500
+            status = response.status_code
+            if scanner is not None and response.status_code == 200:
+                self._read_partial_body(response, scanner())
+            metrics.inc('response_bytes_total', len(response.content))
+            return response
+        except requests.Timeout:
+            status = 'timeout'
+            raise
+        finally:
+            latency = time.monotonic() - started
+            self.proxy_pool.release(proxy, latency, failed)
+            if slot is not None:
+                self.limiter.release(slot, latency, overloaded=status == 'timeout' or status in OVERLOAD_STATUS_CODES)
+            if self.hedge is not None:
+                self.hedge.observe(latency)
+            metrics.inc('requests_total', proxy=proxy.address or 'direct', status=status)
+            metrics.observe('request_seconds', latency, proxy=proxy.address or 'direct')
+
+    def _read_partial_body(self, response: requests.Response, scanner: BodyScanner) -> None:
+        """Read the streamed body until the scanner is satisfied, then drop the connection"""
+        reader = BodyReader(scanner, self.max_body_bytes)
+        try:
+            for chunk in response.iter_content(BodyReader.CHUNK_SIZE):
+                if reader.feed(chunk):
+                    break
+        finally:
+            # Closes the connection when the body was not read to the end
+            response.close()
+        # Serve the partial body through the usual content and text accessors
+        response._content = bytes(reader.body)
+        response._content_consumed = True
+        if reader.stopped is not None:
+            metrics.inc('partial_reads_total', reason=reader.stopped)
+            self.logger.debug(f'Stopped reading {response.url} at {len(reader.body)} bytes ({reader.stopped})')
 
-    def get_repository(self, repo_url: str) -> requests.Response:
-        """Get extra information for a repository"""
+    def get_repository(self, repo_url: str, scanner: Optional[Callable[[], BodyScanner]] = None) -> requests.Response:
+        """Get extra information for a repository, reading only as far as ``scanner`` needs"""
         self.logger.info(f'Getting info for {repo_url}')
-        response = self.make_request(repo_url)
+        response = self.make_request(repo_url, scanner=scanner)
         return response
     
-    def search(self, keywords: List[str], search_type: SearchType) -> requests.Response:
+    def search(self, keywords: List[str], search_type: SearchType, page: int = 1) -> requests.Response:
         """Search for repositories, issues, or discussions"""
-        self.logger.info(f'Searching for {search_type.value} with keywords: {keywords}')
+        self.logger.info(f'Searching for {search_type.value} with keywords: {keywords} (page {page})')
         params = {
             'q': ' '.join(keywords),
             'type': search_type.value
         }
-        url = f'{self.BASE_URL}/search'
+        if page > 1:
+            params['p'] = str(page)
+        url = f'{self.base_url}/search'
         response = self.make_request(url, params)
         return response
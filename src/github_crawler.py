@@ -1,11 +1,32 @@
-import concurrent.futures
+import asyncio
 import logging
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
+from src import metrics, profiling
+from src.api_client import GitHubApiClient
+from src.api_parser import ApiResultParser
+from src.async_github_client import AsyncGitHubClient
+from src.body_reader import SCANNERS
+from src.checkpoint import CheckpointJournal
+from src.concurrency import AdaptiveLimiter
 from src.enums import SearchType
 from src.github_client import GitHubClient
+from src.http_cache import HttpCache
+from src.lru_cache import LruCache
 from src.exceptions import GitHubCrawlerException
+from src.hedging import HedgePolicy
+from src.parse_pool import ParsePool
 from src.parser import ResultParser
+from src.pipeline import Pipeline, Reorderer, Stage
+from src.query_planner import QueryPlanner
+from src.rate_limiter import RequestScheduler
+from src.single_flight import SingleFlight
+from src.url_index import UrlIndex
+
+
+CRAWL_BACKENDS = ('html', 'api')
 
 
 class GitHubCrawler:
@@ -15,18 +36,122 @@ class GitHubCrawler:
                  proxies: List[str], 
                  keywords: List[str], 
                  search_type: SearchType, 
-                 include_extra_info: bool = False):
+                 include_extra_info: bool = False,
+                 max_pages: int = 1,
+                 max_results: Optional[int] = None,
+                 page_workers: int = 4,
+                 enrich_workers: Optional[int] = None,
+                 parse_workers: int = 1,
+                 queue_size: int = 16,
+                 concurrency: int = 100,
+                 requests_per_proxy: int = 4,
+                 scheduler: Optional[RequestScheduler] = None,
+                 cache: Optional[HttpCache] = None,
+                 parser_backend: str = 'auto',
+                 parse_pool: Optional[ParsePool] = None,
+                 checkpoint: Optional[CheckpointJournal] = None,
+                 index: Optional[UrlIndex] = None,
+                 incremental: bool = False,
+                 partial_reads: bool = False,
+                 max_body_bytes: int = 5 * 1024 * 1024,
+                 backend: str = 'html',
+                 token: Optional[str] = None,
+                 shard: bool = False,
+                 result_cache: Optional[LruCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 limiter: Optional[AdaptiveLimiter] = None,
+                 hedge: Optional[HedgePolicy] = None,
+                 request_timeout: float = 10.0,
+                 deadline: Optional[float] = None,
+                 client: Optional[GitHubClient] = None,
+                 base_url: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
+        if backend not in CRAWL_BACKENDS:
+            raise ValueError(f'Invalid backend: {backend}. Must be one of: {", ".join(CRAWL_BACKENDS)}')
+        self.backend = backend
+        if backend == 'api' and SearchType(search_type.lower()) not in GitHubApiClient.SEARCH_PATHS:
+            raise ValueError(f'The api backend cannot search {search_type}')
         self.search_type = SearchType(search_type.lower())
         self.keywords = keywords
         self.include_extra_info = include_extra_info
+        self.max_pages = max(1, max_pages)
+        if backend == 'api' and self.max_pages > GitHubApiClient.MAX_PAGES:
+            self.logger.warning(f'The search API stops at page {GitHubApiClient.MAX_PAGES}, crawling {GitHubApiClient.MAX_PAGES} pages instead of {self.max_pages}')
+            self.max_pages = GitHubApiClient.MAX_PAGES
+        self.max_results = max_results
+        self.page_workers = max(1, page_workers)
+        self.concurrency = max(1, concurrency)
+        self.proxies = proxies
+        self.base_url = base_url or GitHubClient.BASE_URL
+        self.requests_per_proxy = max(1, requests_per_proxy)
+        self.limiter = limiter
+        # With a limiter, the threads only need to cover its ceiling; it decides how many send at once
+        self.enrich_workers = enrich_workers or (
+            limiter.max_limit if limiter is not None else max(5, len(proxies) * self.requests_per_proxy)
+        )
+        # API responses are JSON, too cheap to parse to be worth another process
+        self.parse_pool = parse_pool if backend == 'html' else None
+        # Each parse stage thread waits on one page at a time, so keep every process busy
+        self.parse_workers = max(1, parse_workers, self.parse_pool.workers if self.parse_pool is not None else 0)
+        self.queue_size = max(1, queue_size)
+        self.scheduler = scheduler or RequestScheduler()
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.index = index or UrlIndex()
+        self.incremental = incremental
+        # Result pages are only read up to the section their extra info is parsed from
+        self.page_scanner = SCANNERS[self.search_type] if partial_reads else None
+        self.max_body_bytes = max_body_bytes
+        self.shard = shard
+        # Parsed search pages and extra info, shared by crawlers given the same cache
+        self.result_cache = result_cache if result_cache is not None else LruCache()
+        self.hedge = hedge
+        self.request_timeout = request_timeout
+        # Seconds a crawl may run before the rest of its work is dropped
+        self.deadline = deadline
+        # False once a crawl was cut short by its deadline
+        self.complete = True
         
-        self.client = GitHubClient(proxies)
-        self.parser = ResultParser()
+        if client is not None:
+            # A client shared between crawlers keeps its sessions and proxy health between crawls
+            self.client = client
+            self.parser = ApiResultParser() if backend == 'api' else self.parse_pool or ResultParser(backend=parser_backend)
+        elif backend == 'api':
+            self.client = GitHubApiClient(
+                proxies,
+                token=token,
+                base_url=base_url or GitHubApiClient.BASE_URL,
+                requests_per_proxy=self.requests_per_proxy,
+                scheduler=self.scheduler,
+                cache=self.cache,
+                single_flight=single_flight,
+                limiter=limiter,
+                hedge=hedge,
+                timeout=request_timeout
+            )
+            self.parser = ApiResultParser()
+        else:
+            self.client = GitHubClient(
+                proxies, 
+                base_url=self.base_url, 
+                requests_per_proxy=self.requests_per_proxy, 
+                scheduler=self.scheduler,
+                cache=self.cache,
+                max_body_bytes=max_body_bytes,
+                single_flight=single_flight,
+                limiter=limiter,
+                hedge=hedge,
+                timeout=request_timeout
+            )
+            self.parser = self.parse_pool or ResultParser(backend=parser_backend)
         
-        self.logger.info(f'Initializing GitHubCrawler with {self.search_type.value} search type')
+        self.logger.info(f'Initializing GitHubCrawler with {self.search_type.value} search type and {backend} backend')
         self.logger.info(f'Keywords: {self.keywords}')
         self.logger.info(f'Include extra info: {self.include_extra_info}')
+        self.logger.info(f'Max pages: {self.max_pages}, max results: {self.max_results}')
+        self.logger.info(f'Shard: {self.shard}')
+        self.logger.info(f'Deadline: {self.deadline}')
+        self.logger.info(f'Incremental: {self.incremental}')
 
     def execute_search(self) -> List[Dict[str, Any]]:
         try:
@@ -34,35 +159,428 @@ class GitHubCrawler:
         except GitHubCrawlerException as e:
             self.logger.error(f'Error during search: {str(e)}')
             return []
+        finally:
+            self._log_cache_stats()
         
         return results
     
+    async def execute_search_async(self) -> List[Dict[str, Any]]:
+        """Run the crawl on the asyncio engine, with up to ``concurrency`` requests in flight"""
+        if self.backend == 'api' or self.shard:
+            # One API request covers up to 100 results and shards are crawled side by side
+            # by the pipeline's page workers, so the threaded pipeline is enough
+            return await asyncio.to_thread(self.execute_search)
+        started = time.monotonic()
+        self.complete = True
+        try:
+            async with AsyncGitHubClient(
+                self.proxies,
+                base_url=self.base_url,
+                concurrency=self.concurrency,
+                requests_per_proxy=self.requests_per_proxy,
+                scheduler=self.scheduler,
+                cache=self.cache,
+                max_body_bytes=self.max_body_bytes,
+                limiter=self.limiter,
+                hedge=self.hedge,
+                timeout=self.request_timeout
+            ) as client:
+                results = await self._search_async(client, self.keywords, started)
+        except GitHubCrawlerException as e:
+            self.logger.error(f'Error during search: {str(e)}')
+            return []
+        finally:
+            self._log_cache_stats()
+        
+        return results
+    
+    def _log_cache_stats(self) -> None:
+        if self.cache is not None:
+            self.logger.info(f'HTTP cache: {self.cache.stats()}')
+        self.logger.info(f'Result cache: {self.result_cache.stats()}')
+        if self.limiter is not None:
+            self.logger.info(f'Concurrency: {self.limiter.stats()}')
+        if self.hedge is not None:
+            self.logger.info(f'Hedged requests: {self.hedge.stats()}')
+        if self.incremental:
+            self.logger.info(f'URL index: {self.index.stats()}')
+    
+    def iter_search(self) -> Iterator[Dict[str, Any]]:
+        """Yield results in search order as soon as they are parsed and, if requested, enriched"""
+        return self._iter_pipeline(self.keywords)
+    
     def _search(self, keywords: List[str]) -> List[Dict[str, Any]]:
         """Search GitHub and return results"""
-        response = self.client.search(keywords, self.search_type)
-        results = self.parser.parse_search_results(response.text, self.search_type)
-        
-        if self.search_type == SearchType.REPOSITORIES and self.include_extra_info:
-            results = self._include_extra_info(results)
+        return list(self._iter_pipeline(keywords))
+    
+    def crawl_search_page(self, page: int, shard: str = '') -> List[Dict[str, Any]]:
+        """Fetch and parse a single search page, without deduplication"""
+        return self._parse_search_page(self.keywords, *self._fetch_search_page(self.keywords, 0, shard, page))[2]
+    
+    def crawl_extra_info(self, results: List[Dict[str, Any]], raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """Add extra info to results in place, one API query or one page per result.
+
+        Errors are logged and leave a result without extra info, unless
+        ``raise_errors`` is set and they are raised for the caller to retry.
+        """
+        if self.backend == 'api':
+            self._fetch_extra_info_batch(list(enumerate(results)), raise_errors)
+        else:
+            for position, result in enumerate(results):
+                self._parse_extra_info(*self._fetch_extra_info(position, result, raise_errors), raise_errors)
         return results
     
-    def _include_extra_info(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_url = {
-                executor.submit(self._get_repository_extra_info, result['url']): result 
-                for result in results
-            }
-            for future in concurrent.futures.as_completed(future_to_url):
-                result = future_to_url[future]
+    def _should_include_extra_info(self) -> bool:
+        return self.include_extra_info
+    
+    def _iter_pipeline(self, keywords: List[str]) -> Iterator[Dict[str, Any]]:
+        """Run the crawl as a pipeline and yield its results in search order.
+
+        fetch search page -> parse search page -> collate -> fetch result page -> parse result page
+
+        Each stage has its own workers and bounded input queue. Collate puts
+        the search pages back in the order they were fed, drops duplicates,
+        stops a shard at its first empty page and the crawl once every shard
+        is finished or at ``max_results``; the page of a result is fetched as
+        soon as the result is collated. Shards are fed page by page, page 1 of
+        every shard first, so they are crawled side by side.
+        """
+        started = time.monotonic()
+        self.complete = True
+        run = self.index.start_run()
+        shards = self._plan_shards(keywords) if self.shard else ['']
+        finished = set()
+        pages = Reorderer()
+        # Results passed on for enrichment and not yielded yet, returned as is if the deadline cuts the crawl short
+        collated: Optional[Dict[int, Dict[str, Any]]] = {} if self.deadline is not None else None
+        count = 0
+        done = False
+        # The API backend enriches the results of a page with one GraphQL query
+        batched = self.backend == 'api' and self._should_include_extra_info()
+        
+        def collate(item):
+            nonlocal count, done
+            new_results = []
+            sequence, shard, page_results = item
+            for shard, page_results in pages.push(sequence, (shard, page_results)):
+                if done or shard in finished:
+                    continue
+                unique_results = self._dedup_page(page_results, run, count)
+                new_results.extend((count + position, result) for position, result in enumerate(unique_results))
+                count += len(unique_results)
+                if not page_results:
+                    finished.add(shard)
+                if len(finished) == len(shards) or (self.max_results is not None and count >= self.max_results):
+                    done = True
+                    pipeline.stop_source()
+            if collated is not None:
+                collated.update(new_results)
+            if batched:
+                batch_size = GitHubApiClient.BATCH_SIZE
+                return [new_results[start:start + batch_size] for start in range(0, len(new_results), batch_size)]
+            return new_results
+        
+        stages = [
+            Stage('fetch_search', lambda item: [self._fetch_search_page(keywords, *item)], self.page_workers, queue_size=1),
+            Stage('parse_search', lambda item: [self._parse_search_page(keywords, *item)], self.parse_workers),
+            Stage('collate', collate),
+        ]
+        if batched:
+            stages.append(Stage('fetch_extra_info', self._fetch_extra_info_batch, self.enrich_workers))
+        elif self._should_include_extra_info():
+            stages += [
+                Stage('fetch_extra_info', lambda item: [self._fetch_extra_info(*item)], self.enrich_workers),
+                Stage('parse_extra_info', lambda item: [self._parse_extra_info(*item)], self.parse_workers),
+            ]
+        pipeline = Pipeline(stages, queue_size=self.queue_size)
+        results = Reorderer()
+        
+        def search_pages():
+            sequence = 0
+            for page in range(1, self.max_pages + 1):
+                for shard in shards:
+                    if shard not in finished:
+                        yield sequence, shard, page
+                        sequence += 1
+        
+        def expire():
+            self._deadline_reached()
+            pipeline.cancel()
+        
+        timer = None
+        if self.deadline is not None:
+            timer = threading.Timer(self._remaining(started), expire)
+            timer.daemon = True
+            timer.start()
+        try:
+            for position, result in pipeline.run(search_pages()):
+                ready = results.push(position, result)
+                if collated is not None:
+                    for yielded in range(results.next - len(ready), results.next):
+                        collated.pop(yielded, None)
+                yield from ready
+        finally:
+            if timer is not None:
+                timer.cancel()
+        if not self.complete and collated is not None:
+            for position, result in sorted(dict(collated).items()):
+                if position >= results.next:
+                    yield dict(result)
+        metrics.set_gauge('crawl_complete', int(self.complete))
+    
+    def _remaining(self, started: float) -> Optional[float]:
+        """Seconds left before the deadline of a crawl started at ``started``, None without a deadline"""
+        if self.deadline is None:
+            return None
+        return max(0.0, started + self.deadline - time.monotonic())
+    
+    def _deadline_reached(self) -> None:
+        self.complete = False
+        self.logger.warning(f'Deadline of {self.deadline}s reached, returning partial results')
+    
+    def _plan_shards(self, keywords: List[str]) -> List[str]:
+        """Qualifiers splitting the search into shards under GitHub's result cap"""
+        planner = QueryPlanner(self._count_results, self.search_type, workers=self.page_workers)
+        return planner.plan(keywords)
+    
+    def _count_results(self, keywords: List[str]) -> Optional[int]:
+        response = self.client.search(keywords, self.search_type, 1)
+        return self.parser.parse_result_count(self._page_body(response))
+    
+    def _dedup_page(self, page_results: List[Dict[str, Any]], run: str, count: int) -> List[Dict[str, Any]]:
+        new_results = []
+        for result in page_results:
+            if self.max_results is not None and count + len(new_results) >= self.max_results:
+                break
+            if self.index.mark_seen(run, result['url']):
+                new_results.append(result)
+        return new_results
+    
+    def _fetch_search_page(self, 
+                           keywords: List[str], 
+                           sequence: int, 
+                           shard: str, 
+                           page: int) -> Tuple[int, str, int, Union[str, bytes, None], Optional[List[Dict[str, Any]]]]:
+        """Return the HTML of a search page, or its results if the checkpoint or result cache has them"""
+        if self.checkpoint is not None:
+            results = self.checkpoint.completed_page(self._page_key(shard, page))
+            if results is not None:
+                return sequence, shard, page, None, results
+        query = keywords + [shard] if shard else keywords
+        results = self.result_cache.get(self._result_key('search', ' '.join(query), page))
+        if results is not None:
+            return sequence, shard, page, None, [dict(result) for result in results]
+        response = self.client.search(query, self.search_type, page)
+        return sequence, shard, page, self._page_body(response), None
+    
+    def _page_key(self, shard: str, page: int) -> Union[int, str]:
+        """Key of a search page in the checkpoint"""
+        return f'{shard} p{page}' if shard else page
+    
+    def _result_key(self, *parts: Any) -> Tuple:
+        """Key of a parsed page in the result cache"""
+        return (self.backend, self.search_type.value) + parts
+    
+    def _page_body(self, response) -> Union[str, bytes]:
+        """The raw UTF-8 body when parsing in other processes, so decoding happens there too"""
+        if self.parse_pool is not None and str(response.encoding).lower() in ('utf-8', 'utf8'):
+            return response.content
+        return response.text
+    
+    def _parse_search_page(self, 
+                           keywords: List[str], 
+                           sequence: int, 
+                           shard: str, 
+                           page: int, 
+                           html: Union[str, bytes, None], 
+                           results: Optional[List[Dict[str, Any]]]) -> Tuple[int, str, List[Dict[str, Any]]]:
+        if results is None:
+            results = self.parser.parse_search_results(html, self.search_type)
+            query = keywords + [shard] if shard else keywords
+            self.result_cache.put(self._result_key('search', ' '.join(query), page), [dict(result) for result in results])
+            if self.checkpoint is not None:
+                self.checkpoint.record_page(self._page_key(shard, page), results)
+        return sequence, shard, results
+    
+    def _fetch_extra_info(self, 
+                          position: int, 
+                          result: Dict[str, Any],
+                          raise_errors: bool = False) -> Tuple[int, Dict[str, Any], Union[str, bytes, None], Optional[Dict[str, Any]]]:
+        """Return the HTML of a result's page, or its extra info if it is already known"""
+        try:
+            extra_info = self._known_extra_info(result['url'])
+            if extra_info is not None:
+                return position, result, None, extra_info
+            self.logger.info(f'Getting extra info for {result["url"]}')
+            response = self.client.get_repository(result['url'], scanner=self.page_scanner)
+            return position, result, self._page_body(response), None
+        except Exception as exc:
+            self.logger.error(f'Error processing {result["url"]}: {exc}')
+            if raise_errors:
+                raise
+            return position, result, None, None
+    
+    def _parse_extra_info(self, 
+                          position: int, 
+                          result: Dict[str, Any], 
+                          html: Union[str, bytes, None], 
+                          extra_info: Optional[Dict[str, Any]],
+                          raise_errors: bool = False) -> Tuple[int, Dict[str, Any]]:
+        try:
+            if html is not None:
+                # A crawler sharing the result cache may have parsed the page since it was fetched
+                extra_info = self.result_cache.get(self._result_key('extra_info', result['url']))
+            if html is not None and extra_info is None:
+                extra_info = self.parser.parse_extra_info(html, result['url'], self.search_type)
+                self._record_extra_info(result['url'], extra_info)
+            if extra_info:
+                result['extra'] = extra_info
+        except Exception as exc:
+            self.logger.error(f'Error processing {result["url"]}: {exc}')
+            if raise_errors:
+                raise
+        return position, result
+    
+    def _fetch_extra_info_batch(self, 
+                                batch: List[Tuple[int, Dict[str, Any]]], 
+                                raise_errors: bool = False) -> List[Tuple[int, Dict[str, Any]]]:
+        """Enrich a batch of results with a single API request"""
+        pending = []
+        for _, result in batch:
+            extra_info = self._known_extra_info(result['url'])
+            if extra_info is not None:
+                result['extra'] = extra_info
+            else:
+                pending.append(result)
+        if not pending:
+            return batch
+        try:
+            nodes = self.client.get_extra_info_batch([result['url'] for result in pending], self.search_type)
+        except Exception as exc:
+            self.logger.error(f'Error processing {len(pending)} results: {exc}')
+            if raise_errors:
+                raise
+            return batch
+        for result in pending:
+            extra_info = self.parser.parse_extra_info(nodes.get(result['url']), result['url'], self.search_type)
+            self._record_extra_info(result['url'], extra_info)
+            result['extra'] = extra_info
+        return batch
+    
+    def _known_extra_info(self, repo_url: str) -> Optional[Dict[str, Any]]:
+        """Extra info parsed recently in this process, finished earlier in this job or, in incremental mode, enriched recently"""
+        extra_info = self.result_cache.get(self._result_key('extra_info', repo_url))
+        if extra_info is not None:
+            return extra_info
+        if self.checkpoint is not None:
+            extra_info = self.checkpoint.completed_repository(repo_url)
+            if extra_info is not None:
+                return extra_info
+        if self.incremental and self.search_type == SearchType.REPOSITORIES:
+            return self.index.get(repo_url)
+        return None
+    
+    def _record_extra_info(self, repo_url: str, extra_info: Dict[str, Any]) -> None:
+        self.result_cache.put(self._result_key('extra_info', repo_url), extra_info)
+        if self.checkpoint is not None:
+            self.checkpoint.record_repository(repo_url, extra_info)
+        if self.search_type == SearchType.REPOSITORIES:
+            self.index.upsert(repo_url, extra_info)
+    
+    async def _search_async(self, client: AsyncGitHubClient, keywords: List[str], started: float) -> List[Dict[str, Any]]:
+        results = []
+        tasks = []
+        run = self.index.start_run()
+        try:
+            for first_page in range(1, self.max_pages + 1, self.page_workers):
+                last_page = min(first_page + self.page_workers, self.max_pages + 1)
                 try:
-                    extra_info = future.result()
-                    if extra_info:
-                        result['extra'] = extra_info
-                except Exception as exc:
-                    self.logger.error(f'Error processing {result["url"]}: {exc}')
+                    batch = await asyncio.wait_for(asyncio.gather(*(
+                        self._search_page_async(client, keywords, page) for page in range(first_page, last_page)
+                    )), self._remaining(started))
+                except asyncio.TimeoutError:
+                    self._deadline_reached()
+                    break
+                done = False
+                for page_results in batch:
+                    new_results = self._dedup_page(page_results, run, len(results))
+                    results.extend(new_results)
+                    if self._should_include_extra_info():
+                        # Start enriching this page while the next batch of pages is fetched
+                        tasks.extend(
+                            asyncio.ensure_future(self._get_extra_info_async(client, result['url']))
+                            for result in new_results
+                        )
+                    if not page_results or (self.max_results is not None and len(results) >= self.max_results):
+                        done = True
+                        break
+                if done:
+                    break
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        profiling.mark('search finished')
+        if tasks:
+            results = await self._include_extra_info_async(results, tasks, self._remaining(started))
+            profiling.mark('fetch_extra_info finished')
+        metrics.set_gauge('crawl_complete', int(self.complete))
+        return results
+    
+    async def _search_page_async(self, client: AsyncGitHubClient, keywords: List[str], page: int) -> List[Dict[str, Any]]:
+        if self.checkpoint is not None:
+            results = self.checkpoint.completed_page(page)
+            if results is not None:
+                return results
+        cache_key = self._result_key('search', ' '.join(keywords), page)
+        results = self.result_cache.get(cache_key)
+        if results is not None:
+            return [dict(result) for result in results]
+        response = await client.search(keywords, self.search_type, page)
+        if self.parse_pool is not None:
+            results = await asyncio.wrap_future(
+                self.parse_pool.submit_search_results(self._page_body(response), self.search_type)
+            )
+        else:
+            results = self.parser.parse_search_results(response.text, self.search_type)
+        self.result_cache.put(cache_key, [dict(result) for result in results])
+        if self.checkpoint is not None:
+            self.checkpoint.record_page(page, results)
+        return results
+    
+    async def _include_extra_info_async(self, 
+                                        results: List[Dict[str, Any]], 
+                                        tasks: List[asyncio.Future], 
+                                        timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait up to ``timeout`` seconds for the extra info, results still waiting for it are returned without"""
+        metrics.set_gauge('queue_depth', sum(not task.done() for task in tasks), stage='fetch_extra_info')
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        metrics.set_gauge('queue_depth', 0, stage='fetch_extra_info')
+        if pending:
+            self._deadline_reached()
+            for task in pending:
+                task.cancel()
+        for result, task in zip(results, tasks):
+            if task in pending:
+                continue
+            if task.exception() is not None:
+                self.logger.error(f'Error processing {result["url"]}: {task.exception()}')
+            elif task.result():
+                result['extra'] = task.result()
         return results
     
-    def _get_repository_extra_info(self, repo_url: str) -> Dict[str, Any]:
-        self.logger.info(f'Getting extra info for {repo_url}')
-        response = self.client.get_repository(repo_url)
-        return self.parser.parse_repository_info(response.text, repo_url)
\ No newline at end of file
+    async def _get_extra_info_async(self, client: AsyncGitHubClient, url: str) -> Dict[str, Any]:
+        extra_info = self._known_extra_info(url)
+        if extra_info is not None:
+            return extra_info
+        self.logger.info(f'Getting extra info for {url}')
+        response = await client.get_repository(url, scanner=self.page_scanner)
+        if self.parse_pool is not None:
+            extra_info = await asyncio.wrap_future(
+                self.parse_pool.submit_extra_info(self._page_body(response), url, self.search_type)
+            )
+        else:
+            extra_info = self.parser.parse_extra_info(response.text, url, self.search_type)
+        self._record_extra_info(url, extra_info)
+        return extra_info
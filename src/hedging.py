@@ -0,0 +1,67 @@
+import collections
+import threading
+from typing import Dict, Optional
+
+from src import metrics
+
+
+class HedgePolicy:
+    """Decides when a slow request gets a duplicate sent through another proxy.
+
+    The hedge delay is the ``percentile`` of the last ``window`` request
+    latencies, so only the slowest requests are hedged, and nothing is
+    hedged until ``min_samples`` latencies are known. Hedges are capped at
+    ``budget`` times the requests sent, so a server that is slow for every
+    request does not get twice the load.
+    """
+
+    def __init__(self,
+                 percentile: float = 95.0,
+                 window: int = 200,
+                 min_samples: int = 20,
+                 min_delay: float = 0.01,
+                 budget: float = 0.1):
+        if not 0 < percentile < 100:
+            raise ValueError(f'Invalid hedge percentile: {percentile}')
+        self.percentile = percentile
+        self.min_samples = max(1, min_samples)
+        self.min_delay = min_delay
+        self.budget = budget
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+        self._latencies = collections.deque(maxlen=max(window, self.min_samples))
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self.requests += 1
+
+    def delay(self) -> Optional[float]:
+        """Seconds after which a request is hedged, None while too few latencies are known"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        return max(self.min_delay, latencies[index])
+
+    def try_hedge(self) -> bool:
+        """Take a hedge from the budget, False if it is spent"""
+        with self._lock:
+            if self.hedges >= self.budget * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def record(self, won: bool) -> None:
+        """Record whether the hedge answered before the request it duplicated"""
+        with self._lock:
+            self.wins += won
+        metrics.inc('hedged_requests_total', outcome='won' if won else 'lost')
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        delay = self.delay()
+        with self._lock:
+            return {'delay': delay, 'requests': self.requests, 'hedges': self.hedges, 'wins': self.wins}
@@ -0,0 +1,164 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src import metrics
+
+
+class CacheEntry:
+    """A cached response body with the validators needed to revalidate it"""
+
+    def __init__(self, key: str, url: str, headers: Dict[str, str], body: bytes, encoding: Optional[str], stored_at: float):
+        self.key = key
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl: float, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if 'ETag' in self.headers:
+            headers['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        response._content = self.body
+        return response
+
+
+class HttpCache:
+    """Persistent response cache backed by SQLite.
+
+    Entries are keyed by URL and query parameters. An entry younger than
+    ``ttl`` is served without a request; an older one is revalidated with
+    ``If-None-Match``/``If-Modified-Since`` so unchanged pages come back as
+    304s. Bodies are stored compressed and the least recently used entries
+    are evicted once the cache grows past ``max_bytes``.
+    """
+
+    VALIDATOR_HEADERS = ('ETag', 'Last-Modified', 'Content-Type')
+
+    def __init__(self, path: str, ttl: float = 3600.0, max_bytes: int = 256 * 1024 * 1024, logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, url TEXT, headers TEXT, body BLOB, encoding TEXT, '
+            'stored_at REAL, accessed_at REAL, size INTEGER)'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Mapping[str, str]] = None) -> str:
+        if not params:
+            return url
+        return f'{url}?{urlencode(sorted(params.items()))}'
+
+    def get(self, url: str, params: Optional[Mapping[str, str]] = None) -> Optional[CacheEntry]:
+        """Return the stored entry for a request, fresh or not"""
+        key = self.make_key(url, params)
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT url, headers, body, encoding, stored_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self._connection.commit()
+        entry_url, headers, body, encoding, stored_at = row
+        return CacheEntry(key, entry_url, json.loads(headers), zlib.decompress(body), encoding, stored_at)
+
+    def lookup(self, url: str, params: Optional[Mapping[str, str]] = None) -> Optional[CacheEntry]:
+        """Return the stored entry for a request and count it as a hit when it is fresh"""
+        entry = self.get(url, params)
+        with self._lock:
+            fresh = entry is not None and entry.is_fresh(self.ttl)
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.inc('cache_lookups_total', result='hit' if fresh else 'miss')
+        return entry
+
+    def store(self, url: str, params: Optional[Mapping[str, str]], response) -> None:
+        """Store a successful response"""
+        key = self.make_key(url, params)
+        headers = {name: response.headers[name] for name in self.VALIDATOR_HEADERS if name in response.headers}
+        body = zlib.compress(response.content)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, str(response.url), json.dumps(headers), body, response.encoding, now, now, len(body))
+            )
+            self._evict()
+            self._connection.commit()
+
+    def refresh(self, entry: CacheEntry) -> None:
+        """Mark an entry as revalidated after a 304 response"""
+        now = time.time()
+        entry.stored_at = now
+        with self._lock:
+            self.revalidated += 1
+            self._connection.execute(
+                'UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, entry.key)
+            )
+            self._connection.commit()
+        metrics.inc('cache_lookups_total', result='revalidated')
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': size,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self) -> None:
+        total, = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute('SELECT key, size FROM responses ORDER BY accessed_at, rowid').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            self.evictions += 1
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from src import metrics
+
+
+class LruCache:
+    """Bounded in-memory map evicting its least recently used entries.
+
+    Holds up to ``max_entries`` values, each for at most ``ttl`` seconds
+    when a ttl is given; 0 entries disables it. Safe to share between
+    threads, and so between crawlers and event loops of one process.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: Optional[float] = None):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] >= self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        metrics.inc('result_cache_lookups_total', result='miss' if entry is None else 'hit')
+        return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
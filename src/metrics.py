@@ -0,0 +1,270 @@
+"""Counters, gauges and latency histograms for every crawl stage.
+
+Recording goes through the module-level functions (``inc``, ``observe``,
+``set_gauge``, ``timer``). Until ``enable`` installs a registry they return
+immediately, so instrumented code costs a function call and a None check
+when metrics are off.
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+PREFIX = 'github_crawler_'
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given quantile"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for upper, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return upper
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Thread-safe store of all recorded metrics"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, LabelSet], float] = {}
+        self.gauges: Dict[Tuple[str, LabelSet], float] = {}
+        self.histograms: Dict[Tuple[str, LabelSet], Histogram] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, labels: LabelSet = ()) -> None:
+        with self._lock:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: LabelSet = ()) -> None:
+        with self._lock:
+            self.gauges[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: LabelSet = ()) -> None:
+        with self._lock:
+            key = (name, labels)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for kind, metrics in (('counter', self.counters), ('gauge', self.gauges)):
+                for name in sorted({name for name, _ in metrics}):
+                    lines.append(f'# TYPE {PREFIX}{name} {kind}')
+                    for (metric, labels), value in sorted(metrics.items()):
+                        if metric == name:
+                            lines.append(f'{PREFIX}{name}{_format_labels(labels)} {value:g}')
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f'# TYPE {PREFIX}{name} histogram')
+                for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for upper, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        bound = '+Inf' if upper == float('inf') else f'{upper:g}'
+                        lines.append(f'{PREFIX}{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+                    lines.append(f'{PREFIX}{name}_sum{_format_labels(labels)} {histogram.sum:g}')
+                    lines.append(f'{PREFIX}{name}_count{_format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarise all metrics as plain data for the end-of-run JSON report"""
+        with self._lock:
+            return {
+                'duration_seconds': round(time.time() - self.started, 3),
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'gauges': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.gauges.items())
+                ],
+                'histograms': [
+                    {
+                        'name': name,
+                        'labels': dict(labels),
+                        'count': histogram.count,
+                        'sum': round(histogram.sum, 6),
+                        'p50': histogram.quantile(0.5),
+                        'p99': histogram.quantile(0.99),
+                    }
+                    for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0])
+                ],
+            }
+
+
+class MetricsSink:
+    """Destination the registry is written to at the end of a run"""
+
+    def write(self, registry: MetricsRegistry) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PrometheusFileSink(MetricsSink):
+    """Writes the Prometheus text format to a file, e.g. for node_exporter's textfile collector"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, registry: MetricsRegistry) -> None:
+        with open(self.path, 'w') as f:
+            f.write(registry.to_prometheus())
+
+
+class JsonSummarySink(MetricsSink):
+    """Writes the JSON summary of a run"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, registry: MetricsRegistry) -> None:
+        with open(self.path, 'w') as f:
+            json.dump(registry.summary(), f, indent=2)
+
+
+class PrometheusHttpSink(MetricsSink):
+    """Serves the live registry at ``/metrics`` for Prometheus to scrape"""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = '127.0.0.1'):
+        sink_registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                payload = sink_registry.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logging.getLogger(__name__).info(f'Serving metrics at http://{host}:{self.server.server_address[1]}/metrics')
+
+    def write(self, registry: MetricsRegistry) -> None:
+        pass
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+_registry: Optional[MetricsRegistry] = None
+_NULL_TIMER = nullcontext()
+
+
+def enable(registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """Start recording into ``registry`` (a new one by default) and return it"""
+    global _registry
+    _registry = registry or MetricsRegistry()
+    return _registry
+
+
+def disable() -> None:
+    global _registry
+    _registry = None
+
+
+def registry() -> Optional[MetricsRegistry]:
+    return _registry
+
+
+def inc(name: str, value: float = 1, **labels: Any) -> None:
+    if _registry is None:
+        return
+    _registry.inc(name, value, _label_set(labels))
+
+
+def set_gauge(name: str, value: float, **labels: Any) -> None:
+    if _registry is None:
+        return
+    _registry.set_gauge(name, value, _label_set(labels))
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    if _registry is None:
+        return
+    _registry.observe(name, value, _label_set(labels))
+
+
+def timer(name: str, **labels: Any):
+    """Context manager observing the duration of its block into a histogram"""
+    if _registry is None:
+        return _NULL_TIMER
+    return _Timer(_registry, name, _label_set(labels))
+
+
+def write_sinks(sinks: List[MetricsSink]) -> None:
+    if _registry is None:
+        return
+    for sink in sinks:
+        sink.write(_registry)
+
+
+class _Timer:
+    def __init__(self, registry: MetricsRegistry, name: str, labels: LabelSet):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.started, self.labels)
+
+
+def _label_set(labels: Dict[str, Any]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
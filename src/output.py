@@ -0,0 +1,157 @@
+import ast
+import csv
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from src.records import RepoInfo, SearchHit, compact
+
+OUTPUT_FORMATS = ('json', 'ndjson', 'csv')
+CSV_COLUMNS = ('url', 'owner', 'repository', 'number', 'title', 'language_stats')
+NPY_MAGIC = b'\x93NUMPY'
+
+
+def write_json(results: Iterable[Dict[str, Any]], f: TextIO) -> int:
+    """Stream results as an indented JSON array, byte-for-byte equal to ``json.dump(results, f, indent=2)``.
+
+    The array is closed even when ``results`` raises, so the file stays valid JSON.
+    """
+    count = 0
+    f.write('[')
+    try:
+        for result in results:
+            record = json.dumps(result, indent=2).replace('\n', '\n  ')
+            f.write(f'{"," if count else ""}\n  {record}')
+            count += 1
+    finally:
+        f.write('\n]' if count else ']')
+    return count
+
+
+def write_ndjson(results: Iterable[Dict[str, Any]], f: TextIO) -> int:
+    """Write one JSON record per line, flushing each so partial output survives a crash"""
+    count = 0
+    for result in results:
+        f.write(json.dumps(result) + '\n')
+        f.flush()
+        count += 1
+    return count
+
+
+def write_csv(results: Iterable[Dict[str, Any]], f: TextIO) -> int:
+    """Write one row per result with the extra info flattened into ``CSV_COLUMNS``.
+
+    Fields a result does not have are left empty; ``language_stats`` is a
+    JSON object, empty when the result has no language statistics.
+    """
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(CSV_COLUMNS)
+    count = 0
+    for result in results:
+        extra = result.get('extra') or {}
+        row = [result['url']] + [extra.get(column) for column in CSV_COLUMNS[1:-1]]
+        stats = extra.get('language_stats')
+        row.append(json.dumps(stats, separators=(',', ':')) if stats else None)
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_results(results: Iterable[Dict[str, Any]], f: TextIO, output_format: str = 'json') -> int:
+    """Write results in the given format and return how many were written"""
+    if output_format == 'ndjson':
+        return write_ndjson(results, f)
+    if output_format == 'csv':
+        return write_csv(results, f)
+    if output_format == 'json':
+        return write_json(results, f)
+    raise ValueError(f'Invalid output format: {output_format}. Must be one of: {", ".join(OUTPUT_FORMATS)}')
+
+
+def matrix_labels_file(path: str) -> str:
+    """File naming the rows and columns of the language matrix saved at ``path``"""
+    return f'{os.path.splitext(path)[0]}.labels.json'
+
+
+class LanguageMatrix:
+    """Language percentages of repositories as a languages × repositories matrix.
+
+    ``collect`` records the results streaming past on their way to the
+    output file, keeping only the non-zero cells, and ``write`` saves them
+    as a float32 ``.npy`` file that ``numpy.load(path, mmap_mode='r')`` or
+    ``load_language_matrix`` maps without parsing. Columns follow the order
+    of the results, so column ``j`` is row ``j`` of the CSV output; the
+    labels go to ``matrix_labels_file(path)``.
+    """
+
+    def __init__(self):
+        self.repositories: List[str] = []
+        self.languages: Dict[str, int] = {}
+        self._rows = array('I')
+        self._columns = array('I')
+        self._values = array('f')
+
+    def add(self, result: Dict[str, Any]) -> None:
+        record = compact(result)
+        column = len(self.repositories)
+        self.repositories.append(result['url'])
+        if isinstance(record, SearchHit) and isinstance(record.extra, RepoInfo):
+            for language, percentage in zip(record.extra.languages, record.extra.percentages):
+                self._rows.append(self.languages.setdefault(language, len(self.languages)))
+                self._columns.append(column)
+                self._values.append(percentage)
+
+    def collect(self, results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield ``results`` unchanged, adding each to the matrix"""
+        for result in results:
+            self.add(result)
+            yield result
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.languages), len(self.repositories)
+
+    def write(self, path: str) -> Tuple[int, int]:
+        """Save the matrix and its labels and return its shape"""
+        rows, columns = self.shape
+        header = repr({'descr': '<f4', 'fortran_order': False, 'shape': (rows, columns)})
+        # Version 1.0 header, padded so the data starts on a 64 byte boundary
+        header += ' ' * (-(len(NPY_MAGIC) + 4 + len(header) + 1) % 64) + '\n'
+        cells = sorted(range(len(self._values)), key=self._rows.__getitem__)
+        with open(path, 'wb') as f:
+            f.write(NPY_MAGIC + bytes((1, 0)) + len(header).to_bytes(2, 'little') + header.encode('latin1'))
+            start = 0
+            for row in range(rows):
+                line = array('f', bytes(4 * columns))
+                while start < len(cells) and self._rows[cells[start]] == row:
+                    line[self._columns[cells[start]]] = self._values[cells[start]]
+                    start += 1
+                if sys.byteorder == 'big':
+                    line.byteswap()
+                line.tofile(f)
+        with open(matrix_labels_file(path), 'w') as f:
+            json.dump({'languages': list(self.languages), 'repositories': self.repositories}, f)
+        return rows, columns
+
+
+def load_language_matrix(path: str) -> Tuple[List[str], List[str], memoryview]:
+    """Memory-map a matrix saved by ``LanguageMatrix.write``.
+
+    Returns the language and repository labels and a read-only view of the
+    cells, indexed ``matrix[language, repository]``.
+    """
+    with open(matrix_labels_file(path)) as f:
+        labels = json.load(f)
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:len(NPY_MAGIC)] != NPY_MAGIC:
+        raise ValueError(f'Invalid matrix file: {path}')
+    length = int.from_bytes(data[8:10], 'little')
+    header = ast.literal_eval(data[10:10 + length].decode('latin1'))
+    if header['descr'] != '<f4' or header['fortran_order'] or sys.byteorder == 'big':
+        raise ValueError(f'Invalid matrix file: {path}')
+    view = memoryview(data)[10 + length:]
+    return labels['languages'], labels['repositories'], view.cast('f', header['shape']) if view else view
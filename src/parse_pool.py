@@ -0,0 +1,77 @@
+import concurrent.futures
+import logging
+import multiprocessing
+from typing import Any, Dict, List, Optional, Union
+
+from src.enums import SearchType
+from src.parser import ResultParser
+
+# The parser of the current worker process, created once by _init_worker
+_parser: Optional[ResultParser] = None
+
+
+def _init_worker(backend: str) -> None:
+    global _parser
+    _parser = ResultParser(backend=backend)
+
+
+def _decode(html: Union[str, bytes]) -> str:
+    return html.decode('utf-8', errors='replace') if isinstance(html, bytes) else html
+
+
+def _parse_search_results(html: Union[str, bytes], search_type: SearchType) -> List[Dict[str, Any]]:
+    return _parser.parse_search_results(_decode(html), search_type)
+
+
+def _parse_result_count(html: Union[str, bytes]) -> Optional[int]:
+    return _parser.parse_result_count(_decode(html))
+
+
+def _parse_extra_info(html: Union[str, bytes], url: str, search_type: SearchType) -> Dict[str, Any]:
+    return _parser.parse_extra_info(_decode(html), url, search_type)
+
+
+class ParsePool:
+    """Parses pages in worker processes, so parsing is not serialised by the GIL.
+
+    It has the same parse methods as ResultParser and takes either text or
+    UTF-8 encoded response bytes; only the bytes and the small result dicts
+    cross the process boundary. Every worker keeps one ResultParser.
+    """
+
+    def __init__(self, workers: Optional[int] = None, backend: str = 'auto'):
+        self.logger = logging.getLogger(__name__)
+        self.workers = workers or multiprocessing.cpu_count()
+        # Workers are spawned rather than forked: the crawler forks from a process
+        # running I/O threads, whose held locks a forked child would inherit
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(backend,)
+        )
+        self.logger.info(f'Parsing with {self.workers} processes')
+
+    def submit_search_results(self, html: Union[str, bytes], search_type: SearchType) -> concurrent.futures.Future:
+        return self.executor.submit(_parse_search_results, html, search_type)
+
+    def submit_extra_info(self, html: Union[str, bytes], url: str, search_type: SearchType) -> concurrent.futures.Future:
+        return self.executor.submit(_parse_extra_info, html, url, search_type)
+
+    def parse_search_results(self, html: Union[str, bytes], search_type: SearchType) -> List[Dict[str, Any]]:
+        return self.submit_search_results(html, search_type).result()
+
+    def parse_result_count(self, html: Union[str, bytes]) -> Optional[int]:
+        return self.executor.submit(_parse_result_count, html).result()
+
+    def parse_extra_info(self, html: Union[str, bytes], url: str, search_type: SearchType) -> Dict[str, Any]:
+        return self.submit_extra_info(html, url, search_type).result()
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> 'ParsePool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
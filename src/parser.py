@@ -1,23 +1,30 @@
 import logging
-from typing import Any, Dict, List
+import re
+from typing import Any, Dict, List, Optional
 
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+from src import metrics
 from src.enums import SearchType
+from src.parser_backends import create_backend
 
 
 class ResultParser:
     """Responsible for parsing HTML responses"""
     
-    def __init__(self):
+    # Up to three segments GitHub appends to issue and discussion titles: "Issue #12 · owner/name · GitHub"
+    TITLE_SUFFIX = re.compile(r'GitHub|(?:Issue|Discussion) #\d+|[\w.-]+/[\w.-]+')
+    # Number of matches in the data search pages embed for their scripts
+    RESULT_COUNT = re.compile(r'"result_count":\s*(\d+)')
+    
+    def __init__(self, backend: str = 'auto'):
         self.logger = logging.getLogger(__name__)
+        self.backend = create_backend(backend)
     
     def parse_search_results(self, html: str, search_type: SearchType) -> List[Dict[str, Any]]:
         self.logger.info(f'Parsing results of {search_type.value} search')
         
-        soup = BeautifulSoup(html, 'html.parser')
-        divs = soup.find_all('div', class_='search-title')
-        urls = [div.find('a').get('href') for div in divs]
+        with metrics.timer('parse_seconds', method='parse_search_results'):
+            urls = self.backend.search_result_links(html)
         
         self.logger.info(f'Found {len(urls)} results')
         
@@ -31,16 +38,21 @@ class ResultParser:
             })
         return results
     
+    def parse_result_count(self, html: str) -> Optional[int]:
+        """Total number of matches of a search, None if the page does not say"""
+        match = self.RESULT_COUNT.search(html)
+        return int(match.group(1)) if match is not None else None
+    
     def parse_repository_info(self, html: str, repo_url: str) -> Dict[str, Any]:
         try:
             owner = repo_url.split('/')[-2]
-            soup = BeautifulSoup(html, 'html.parser')
             language_stats = {}
-            layout_sidebar = soup.find('div', class_='Layout-sidebar')
-            languages = layout_sidebar.find_all('li', class_='d-inline')
-            for language in languages:
-                spans = language.find_all('span')
-                lang, percentage = spans[-2].text, spans[-1].text
+            with metrics.timer('parse_seconds', method='parse_repository_info'):
+                languages = self.backend.language_items(html)
+            if languages is None:
+                raise ValueError('Layout-sidebar not found')
+            for spans in languages:
+                lang, percentage = spans[-2], spans[-1]
                 language_stats[lang] = float(percentage.strip('%'))
             
             return {
@@ -53,3 +65,32 @@ class ResultParser:
                 'owner': owner,
                 'language_stats': {}
             }
+    
+    def parse_thread_info(self, html: str, url: str) -> Dict[str, Any]:
+        """Extra info of an issue or discussion, from its URL and page title"""
+        parts = urlparse(url).path.strip('/').split('/')
+        owner, repository = parts[0], parts[1]
+        number = int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else None
+        try:
+            with metrics.timer('parse_seconds', method='parse_thread_info'):
+                title = self.backend.page_title(html)
+            if title is not None:
+                segments = title.split(' · ')
+                for _ in range(3):
+                    if len(segments) > 1 and self.TITLE_SUFFIX.fullmatch(segments[-1]):
+                        segments.pop()
+                title = ' · '.join(segments)
+        except Exception as e:
+            self.logger.error(f'Error parsing info for {url}: {str(e)}')
+            title = None
+        return {
+            'owner': owner,
+            'repository': repository,
+            'number': number,
+            'title': title
+        }
+    
+    def parse_extra_info(self, html: str, url: str, search_type: SearchType) -> Dict[str, Any]:
+        if search_type == SearchType.REPOSITORIES:
+            return self.parse_repository_info(html, url)
+        return self.parse_thread_info(html, url)
@@ -0,0 +1,191 @@
+import logging
+from typing import Dict, List, Optional, Type
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:  # pragma: no cover - optional dependency
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - optional dependency
+    LexborHTMLParser = None
+
+
+def _has_class(class_name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _class_filter(class_name: str):
+    """SoupStrainer sees the raw class attribute, so match its tokens explicitly"""
+    def matches(value) -> bool:
+        if value is None:
+            return False
+        tokens = value.split() if isinstance(value, str) else value
+        return class_name in tokens
+    return matches
+
+
+class ParserBackend:
+    """Extracts the raw values ResultParser needs from an HTML document.
+
+    ``search_result_links`` returns the ``href`` of the first link in every
+    ``search-title`` div (None where there is no link or href).
+    ``language_items`` returns the texts of all spans of every ``d-inline``
+    list item in the first ``Layout-sidebar`` div, or None without a sidebar.
+    ``page_title`` returns the stripped text of the ``title`` element, or None.
+    """
+
+    name = ''
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def search_result_links(self, html: str) -> List[Optional[str]]:
+        raise NotImplementedError
+
+    def language_items(self, html: str) -> Optional[List[List[str]]]:
+        raise NotImplementedError
+
+    def page_title(self, html: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+class BeautifulSoupBackend(ParserBackend):
+    """Builds the full document tree with Python's html.parser"""
+
+    name = 'bs4'
+
+    def _soup(self, html: str, only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        return BeautifulSoup(html, 'html.parser')
+
+    def search_result_links(self, html: str) -> List[Optional[str]]:
+        soup = self._soup(html, SoupStrainer('div', class_=_class_filter('search-title')))
+        links = []
+        for div in soup.find_all('div', class_='search-title'):
+            link = div.find('a')
+            links.append(link.get('href') if link is not None else None)
+        return links
+
+    def language_items(self, html: str) -> Optional[List[List[str]]]:
+        soup = self._soup(html, SoupStrainer('div', class_=_class_filter('Layout-sidebar')))
+        layout_sidebar = soup.find('div', class_='Layout-sidebar')
+        if layout_sidebar is None:
+            return None
+        return [
+            [span.text for span in language.find_all('span')]
+            for language in layout_sidebar.find_all('li', class_='d-inline')
+        ]
+
+    def page_title(self, html: str) -> Optional[str]:
+        title = self._soup(html, SoupStrainer('title')).find('title')
+        return title.text.strip() if title is not None else None
+
+
+class StrainedBeautifulSoupBackend(BeautifulSoupBackend):
+    """Only builds the ``search-title`` divs or the ``Layout-sidebar`` subtree"""
+
+    name = 'bs4-strainer'
+
+    def _soup(self, html: str, only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        return BeautifulSoup(html, 'html.parser', parse_only=only)
+
+
+class LxmlBackend(ParserBackend):
+    """Parses with libxml2 and queries the tree with XPath"""
+
+    name = 'lxml'
+
+    SEARCH_TITLES = f"//div[{_has_class('search-title')}]"
+    LAYOUT_SIDEBAR = f"//div[{_has_class('Layout-sidebar')}]"
+    LANGUAGE_ITEMS = f".//li[{_has_class('d-inline')}]"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return lxml is not None
+
+    def _document(self, html: str):
+        return lxml.html.document_fromstring(html) if html.strip() else None
+
+    def search_result_links(self, html: str) -> List[Optional[str]]:
+        document = self._document(html)
+        if document is None:
+            return []
+        links = []
+        for div in document.xpath(self.SEARCH_TITLES):
+            link = div.find('.//a')
+            links.append(link.get('href') if link is not None else None)
+        return links
+
+    def language_items(self, html: str) -> Optional[List[List[str]]]:
+        document = self._document(html)
+        sidebars = document.xpath(self.LAYOUT_SIDEBAR) if document is not None else []
+        if not sidebars:
+            return None
+        return [
+            [span.text_content() for span in language.iter('span')]
+            for language in sidebars[0].xpath(self.LANGUAGE_ITEMS)
+        ]
+
+    def page_title(self, html: str) -> Optional[str]:
+        document = self._document(html)
+        titles = document.xpath('//title') if document is not None else []
+        return titles[0].text_content().strip() if titles else None
+
+
+class SelectolaxBackend(ParserBackend):
+    """Parses with the lexbor engine and queries the tree with CSS selectors"""
+
+    name = 'selectolax'
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return LexborHTMLParser is not None
+
+    def search_result_links(self, html: str) -> List[Optional[str]]:
+        document = LexborHTMLParser(html)
+        links = []
+        for div in document.css('div.search-title'):
+            link = div.css_first('a')
+            links.append(link.attributes.get('href') if link is not None else None)
+        return links
+
+    def language_items(self, html: str) -> Optional[List[List[str]]]:
+        layout_sidebar = LexborHTMLParser(html).css_first('div.Layout-sidebar')
+        if layout_sidebar is None:
+            return None
+        return [
+            [span.text(deep=True) for span in language.css('span')]
+            for language in layout_sidebar.css('li.d-inline')
+        ]
+
+    def page_title(self, html: str) -> Optional[str]:
+        title = LexborHTMLParser(html).css_first('title')
+        return title.text(deep=True).strip() if title is not None else None
+
+
+# Fastest first, as measured by benchmarks/parser_backends.py on tests/fixtures
+BACKENDS: Dict[str, Type[ParserBackend]] = {
+    backend.name: backend
+    for backend in (SelectolaxBackend, LxmlBackend, StrainedBeautifulSoupBackend, BeautifulSoupBackend)
+}
+
+
+def available_backends() -> List[str]:
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def create_backend(name: str = 'auto') -> ParserBackend:
+    """Create a parser backend by name, ``auto`` picks the fastest installed one"""
+    if name == 'auto':
+        name = available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f'Invalid parser backend: {name}. Must be one of: auto, {", ".join(BACKENDS)}')
+    backend = BACKENDS[name]
+    if not backend.is_available():
+        raise ValueError(f'Parser backend {name} is not installed')
+    logging.getLogger(__name__).debug(f'Using {name} parser backend')
+    return backend()
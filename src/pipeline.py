@@ -0,0 +1,174 @@
+import contextvars
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from src import metrics, profiling
+
+_DONE = object()
+
+
+class Stage:
+    """A step of a pipeline, run by ``workers`` threads.
+
+    ``func`` takes one item and returns the items to pass on to the next
+    stage, zero or more of them.
+    """
+
+    def __init__(self,
+                 name: str,
+                 func: Callable[[Any], Iterable[Any]],
+                 workers: int = 1,
+                 queue_size: Optional[int] = None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+
+
+class Pipeline:
+    """Runs items through stages of worker threads connected by bounded queues.
+
+    A full queue blocks the stage feeding it, so a slow stage throttles the
+    stages before it instead of letting work pile up in memory. The outputs
+    of the last stage are yielded in the order they complete. The first
+    exception raised by a stage stops the pipeline and is re-raised to the
+    consumer. Worker threads see the context variables of the thread calling
+    ``run``.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 16, poll_interval: float = 0.1):
+        if not stages:
+            raise ValueError('A pipeline needs at least one stage')
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._source_stopped = threading.Event()
+        self._cancelled = threading.Event()
+        self._abandoned = False
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+
+    def stop_source(self) -> None:
+        """Stop feeding new items, items already in the pipeline still run through it"""
+        self._source_stopped.set()
+
+    def cancel(self) -> None:
+        """Stop every stage now; ``run`` returns without waiting for the items in progress, which are dropped"""
+        self._abandoned = True
+        self._cancelled.set()
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        queues = [queue.Queue(maxsize=stage.queue_size or self.queue_size) for stage in self.stages]
+        output = queue.Queue(maxsize=self.queue_size)
+        remaining = {stage.name: stage.workers for stage in self.stages}
+        threads = [threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._feed, items, queues[0]),
+            name='pipeline-source',
+            daemon=True
+        )]
+        for position, stage in enumerate(self.stages):
+            target = queues[position + 1] if position + 1 < len(self.stages) else output
+            consumers = self.stages[position + 1].workers if position + 1 < len(self.stages) else 1
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(self._work, stage, queues[position], target, consumers, remaining),
+                    name=f'pipeline-{stage.name}-{worker}',
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(output)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._cancelled.set()
+            if not self._abandoned:
+                for thread in threads:
+                    thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _feed(self, items: Iterable[Any], target: queue.Queue) -> None:
+        try:
+            for item in items:
+                if self._source_stopped.is_set() or not self._put(target, item):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        for _ in range(self.stages[0].workers):
+            self._put(target, _DONE)
+
+    def _work(self,
+              stage: Stage,
+              source: queue.Queue,
+              target: queue.Queue,
+              consumers: int,
+              remaining: Dict[str, int]) -> None:
+        while True:
+            item = self._get(source)
+            if item is _DONE:
+                break
+            metrics.set_gauge('queue_depth', source.qsize(), stage=stage.name)
+            try:
+                outputs = stage.func(item)
+                for output in outputs:
+                    if not self._put(target, output):
+                        break
+            except BaseException as e:
+                self._fail(e)
+                break
+        with self._lock:
+            remaining[stage.name] -= 1
+            last = remaining[stage.name] == 0
+        if last:
+            profiling.mark(f'{stage.name} finished')
+            for _ in range(consumers):
+                self._put(target, _DONE)
+
+    def _get(self, source: queue.Queue) -> Any:
+        while not self._cancelled.is_set():
+            try:
+                return source.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        while not self._cancelled.is_set():
+            try:
+                target.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self.logger.debug(f'Pipeline stopped after {error!r}')
+        self._cancelled.set()
+
+
+class Reorderer:
+    """Releases ``(index, value)`` pairs in index order, holding back values that arrive early"""
+
+    def __init__(self, start: int = 0):
+        self.next = start
+        self.pending: Dict[int, Any] = {}
+
+    def push(self, index: int, value: Any) -> List[Any]:
+        self.pending[index] = value
+        ready = []
+        while self.next in self.pending:
+            ready.append(self.pending.pop(self.next))
+            self.next += 1
+        return ready
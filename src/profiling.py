@@ -0,0 +1,219 @@
+"""Profilers for whole crawl runs, worker threads included.
+
+``start`` installs one of the profilers below and ``stop`` writes its
+output and returns a short summary. Code marks stage boundaries with
+``mark``, which returns immediately while no profiler is running, like
+the functions of ``src.metrics``.
+
+- ``cpu``: cProfile, one profiler per thread, merged into a pstats file
+  (``python -m pstats``, snakeviz, flameprof). Python 3.11 and earlier
+  only: from 3.12 cProfile runs on ``sys.monitoring``, which allows a
+  single active profiler per process.
+- ``memory``: tracemalloc snapshots at every mark; the report lists the
+  allocation sites that grew the most since the previous mark.
+- ``sampling``: a background thread records the stack of every thread
+  ``interval`` seconds apart into collapsed stacks for flamegraph.pl or
+  speedscope. It costs little enough to leave on in production.
+"""
+import cProfile
+import collections
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from typing import Counter, List, Optional, Tuple
+
+PROFILE_MODES = ('cpu', 'memory', 'sampling')
+OUTPUT_EXTENSIONS = {'cpu': 'pstats', 'memory': 'txt', 'sampling': 'collapsed'}
+# A cProfile profiler per thread needs the pre-3.12 profiling hooks
+CPU_PROFILE_SUPPORTED = sys.version_info < (3, 12)
+
+
+class Profiler:
+    """Profiles the process between ``start`` and ``stop`` and writes ``output``"""
+
+    def __init__(self, output: str, top: int = 20):
+        self.output = output
+        self.top = top
+
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def mark(self, label: str) -> None:
+        """Record a stage boundary"""
+
+    def stop(self) -> str:
+        """Stop profiling, write the output file and return a top-``top`` summary"""
+        raise NotImplementedError
+
+
+class CpuProfiler(Profiler):
+    """cProfile across threads: every thread started while profiling gets its own profiler.
+
+    Needs Python 3.11 or earlier, see ``CPU_PROFILE_SUPPORTED``.
+    """
+
+    def __init__(self, output: str, top: int = 20):
+        super().__init__(output, top)
+        self._profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        threading.setprofile(self._profile_thread)
+        self._profile_thread()
+
+    def _profile_thread(self, *args) -> None:
+        # Called once in each new thread; enabling a profiler replaces this hook in that thread
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._profilers.append(profiler)
+        profiler.enable()
+
+    def stop(self) -> str:
+        threading.setprofile(None)
+        with self._lock:
+            profilers = list(self._profilers)
+        # Only the calling thread can be disabled; the others have finished or stop counting here
+        profilers[0].disable()
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            profiler.create_stats()
+            if profiler.stats:
+                stats.add(profiler)
+        stats.dump_stats(self.output)
+        summary = io.StringIO()
+        stats.stream = summary
+        stats.sort_stats('cumulative').print_stats(self.top)
+        return f'CPU profile of {len(profilers)} thread(s) saved to {self.output}\n{summary.getvalue()}'
+
+
+class MemoryProfiler(Profiler):
+    """tracemalloc snapshots at every stage boundary"""
+
+    FRAMES = 10
+
+    def __init__(self, output: str, top: int = 20):
+        super().__init__(output, top)
+        self._snapshots: List[Tuple[str, tracemalloc.Snapshot, int, int]] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        tracemalloc.start(self.FRAMES)
+        self.mark('start')
+
+    def mark(self, label: str) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._snapshots.append((label, snapshot, current, peak))
+
+    def stop(self) -> str:
+        self.mark('end')
+        tracemalloc.stop()
+        lines = []
+        previous = None
+        for label, snapshot, current, peak in self._snapshots:
+            lines.append(f'== {label}: {current / 1024 / 1024:.1f} MB allocated, {peak / 1024 / 1024:.1f} MB peak')
+            if previous is not None:
+                lines.extend(f'  {stat}' for stat in snapshot.compare_to(previous, 'lineno')[:self.top])
+            previous = snapshot
+        with open(self.output, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        top = previous.statistics('lineno')[:self.top]
+        return (
+            f'Memory profile of {len(self._snapshots)} snapshots saved to {self.output}\n'
+            + '\n'.join(str(stat) for stat in top)
+        )
+
+
+class SamplingProfiler(Profiler):
+    """Samples the stack of every thread from a background thread"""
+
+    def __init__(self, output: str, top: int = 20, interval: float = 0.01):
+        super().__init__(output, top)
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter[str] = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name='profiler-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _sample(self) -> None:
+        names = {}
+        while not self._stopped.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == self._thread.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> str:
+        self._stopped.set()
+        self._thread.join()
+        with open(self.output, 'w') as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write(f'{stack} {count}\n')
+        # Where threads spend their samples, ignoring the thread name at the root of each stack
+        leaves: Counter[str] = collections.Counter()
+        for stack, count in self._stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        summary = '\n'.join(f'{count / total:6.1%}  {frame}' for frame, count in leaves.most_common(self.top))
+        return f'{self.samples} samples of every thread saved to {self.output}\n{summary}'
+
+
+_profiler: Optional[Profiler] = None
+
+
+def start(mode: str, output: Optional[str] = None, top: int = 20, interval: float = 0.01) -> Profiler:
+    """Start profiling the process, writing to ``output`` (data/profile.<mode>.<ext> by default)"""
+    global _profiler
+    if mode not in PROFILE_MODES:
+        raise ValueError(f'Invalid profile mode: {mode}. Must be one of: {", ".join(PROFILE_MODES)}')
+    if mode == 'cpu' and not CPU_PROFILE_SUPPORTED:
+        raise ValueError(
+            f'The cpu profile needs Python 3.11 or earlier, this is {sys.version.split()[0]}. '
+            'Use the sampling profile instead'
+        )
+    output = output or os.path.join('data', f'profile.{mode}.{OUTPUT_EXTENSIONS[mode]}')
+    if mode == 'cpu':
+        profiler = CpuProfiler(output, top)
+    elif mode == 'memory':
+        profiler = MemoryProfiler(output, top)
+    else:
+        profiler = SamplingProfiler(output, top, interval)
+    profiler.start()
+    _profiler = profiler
+    logging.getLogger(__name__).info(f'Profiling ({mode}) to {output}')
+    return profiler
+
+
+def stop() -> Optional[str]:
+    """Stop the running profiler, write its output and return its summary"""
+    global _profiler
+    if _profiler is None:
+        return None
+    profiler, _profiler = _profiler, None
+    return profiler.stop()
+
+
+def mark(label: str) -> None:
+    if _profiler is None:
+        return
+    _profiler.mark(label)
@@ -0,0 +1,178 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.exceptions import GitHubCrawlerException
+
+
+class ProxyState:
+    """Health statistics and pooled session of a single proxy"""
+
+    def __init__(self, address: Optional[str], max_in_flight: Optional[int]):
+        self.address = address
+        self.max_in_flight = max_in_flight
+        self.proxies: Dict[str, str] = {
+            'http': f'http://{address}',
+            'https': f'http://{address}'
+        } if address else {}
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.strikes = 0
+        self.cooldown_until = 0.0
+        self._session: Optional[requests.Session] = None
+
+    def __repr__(self) -> str:
+        return f'ProxyState({self.address or "direct"})'
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            pool_size = self.max_in_flight or 10
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._session = requests.Session()
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        return self._session
+
+    @property
+    def url(self) -> Optional[str]:
+        return self.proxies.get('http')
+
+    def is_available(self, now: float) -> bool:
+        if now < self.cooldown_until:
+            return False
+        return self.max_in_flight is None or self.in_flight < self.max_in_flight
+
+    def score(self) -> float:
+        """Expected cost of sending one more request through this proxy, lower is better"""
+        latency = self.latency if self.latency is not None else 0.0
+        return (latency + 0.01) * (self.in_flight + 1) * (1 + 4 * self.error_rate)
+
+
+class ProxyPool:
+    """Spreads requests across proxies based on their health.
+
+    Every request leases the proxy with the lowest score among those that are
+    not cooling down and have a free slot. Latency and error rate are tracked
+    as moving averages; a proxy failing ``failure_threshold`` times in a row
+    is put on a cooldown that doubles with each further strike. Without
+    proxies the pool holds a single, unbounded direct route.
+    """
+
+    def __init__(self,
+                 proxies: List[str],
+                 max_in_flight: int = 4,
+                 failure_threshold: int = 3,
+                 cooldown: float = 30.0,
+                 max_cooldown: float = 600.0,
+                 smoothing: float = 0.2,
+                 logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.smoothing = smoothing
+        if proxies:
+            self.proxies = [ProxyState(address, max_in_flight) for address in dict.fromkeys(proxies)]
+        else:
+            self.proxies = [ProxyState(None, None)]
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def try_acquire(self, exclude: Optional[ProxyState] = None) -> Optional[ProxyState]:
+        """Lease the best available proxy, or return None if every proxy is busy or cooling down"""
+        with self._condition:
+            return self._lease(time.monotonic(), exclude)
+
+    def acquire(self, timeout: Optional[float] = None, exclude: Optional[ProxyState] = None) -> ProxyState:
+        """Lease the best available proxy other than ``exclude``, waiting until one becomes available"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                proxy = self._lease(now, exclude)
+                if proxy is not None:
+                    return proxy
+                wait = self.next_available_in(now)
+                if deadline is not None:
+                    if now >= deadline:
+                        raise GitHubCrawlerException('No proxy available')
+                    wait = min(wait, deadline - now) if wait is not None else deadline - now
+                self._condition.wait(wait)
+
+    def cancel(self, proxy: ProxyState) -> None:
+        """Return a leased proxy that sent no request"""
+        with self._condition:
+            proxy.in_flight -= 1
+            self._condition.notify_all()
+
+    def release(self, proxy: ProxyState, latency: float, failed: bool) -> None:
+        """Return a leased proxy and record the outcome of its request"""
+        with self._condition:
+            proxy.in_flight -= 1
+            proxy.requests += 1
+            if proxy.latency is None:
+                proxy.latency = latency
+            else:
+                proxy.latency += self.smoothing * (latency - proxy.latency)
+            proxy.error_rate += self.smoothing * ((1.0 if failed else 0.0) - proxy.error_rate)
+            if failed:
+                proxy.failures += 1
+                proxy.consecutive_failures += 1
+                if len(self.proxies) > 1 and proxy.consecutive_failures >= self.failure_threshold:
+                    self._cool_down(proxy)
+            else:
+                proxy.consecutive_failures = 0
+                proxy.strikes = 0
+            self._condition.notify_all()
+
+    def next_available_in(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the next cooling-down proxy returns, None if none is cooling down.
+
+        Nothing signals the end of a cooldown, so waits for a proxy are bounded by this.
+        """
+        now = time.monotonic() if now is None else now
+        cooling = [proxy.cooldown_until - now for proxy in self.proxies if proxy.cooldown_until > now]
+        return max(0.0, min(cooling)) if cooling else None
+
+    def stats(self) -> List[Dict[str, object]]:
+        with self._condition:
+            return [{
+                'proxy': proxy.address or 'direct',
+                'requests': proxy.requests,
+                'failures': proxy.failures,
+                'latency': proxy.latency,
+                'error_rate': round(proxy.error_rate, 3),
+                'in_flight': proxy.in_flight,
+            } for proxy in self.proxies]
+
+    def _lease(self, now: float, exclude: Optional[ProxyState] = None) -> Optional[ProxyState]:
+        # A single route is never excluded, there would be nothing left to lease
+        available = [
+            proxy for proxy in self.proxies
+            if proxy.is_available(now) and (proxy is not exclude or len(self.proxies) == 1)
+        ]
+        if not available:
+            return None
+        best_score = min(proxy.score() for proxy in available)
+        proxy = random.choice([proxy for proxy in available if proxy.score() == best_score])
+        proxy.in_flight += 1
+        return proxy
+
+    def _cool_down(self, proxy: ProxyState) -> None:
+        proxy.strikes += 1
+        proxy.consecutive_failures = 0
+        duration = min(self.cooldown * 2 ** (proxy.strikes - 1), self.max_cooldown)
+        proxy.cooldown_until = time.monotonic() + duration
+        self.logger.warning(f'Proxy {proxy.address} cooling down for {duration:.0f}s after repeated failures')
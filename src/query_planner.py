@@ -0,0 +1,123 @@
+import concurrent.futures
+import datetime
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from src.enums import SearchType
+
+# The number field a single day's shard is split on once dates cannot be split further
+COUNT_FIELDS = {
+    SearchType.REPOSITORIES: 'stars',
+    SearchType.ISSUES: 'comments',
+    SearchType.DISCUSSIONS: 'comments',
+}
+
+
+class Shard:
+    """A slice of a search: its ``created:`` date range and, if split further, a number range.
+
+    An upper bound of None on the number range is open (``stars:100..*``).
+    """
+
+    # Open number ranges starting past this are not split any further
+    MAX_NUMBER = 1000000
+
+    def __init__(self,
+                 created: Tuple[datetime.date, datetime.date],
+                 numbers: Optional[Tuple[int, Optional[int]]] = None,
+                 count: Optional[int] = None):
+        self.created = created
+        self.numbers = numbers
+        self.count = count
+
+    def qualifiers(self, count_field: str) -> str:
+        first, last = self.created
+        qualifiers = f'created:{first.isoformat()}..{last.isoformat()}'
+        if self.numbers is not None:
+            low, high = self.numbers
+            qualifiers += f' {count_field}:{low}..{"*" if high is None else high}'
+        return qualifiers
+
+    def split(self) -> List['Shard']:
+        """Halve the date range, or the number range of a single day, [] if neither can be split"""
+        first, last = self.created
+        if first < last:
+            middle = first + (last - first) // 2
+            return [Shard((first, middle)), Shard((middle + datetime.timedelta(days=1), last))]
+        low, high = self.numbers or (0, None)
+        if high is None and low < self.MAX_NUMBER:
+            # Counts are heavy-tailed, so open ranges are split at doubling bounds
+            middle = low * 2 + 1
+        elif high is not None and low < high:
+            middle = (low + high) // 2
+        else:
+            return []
+        return [Shard(self.created, (low, middle)), Shard(self.created, (middle + 1, high))]
+
+
+class QueryPlanner:
+    """Splits a search into shards GitHub can list in full.
+
+    GitHub only lists the first ``cap`` matches of a search. A search
+    reporting more is split on halves of its ``created:`` date range and,
+    for a single day still over the cap, on ranges of stars or comments,
+    recursively until every shard fits. ``count`` returns the number of
+    matches GitHub reports for a list of keywords, None if it is unknown.
+    The shards of a level are counted in parallel by ``workers`` threads.
+    """
+
+    CAP = 1000
+    FIRST_DAY = datetime.date(2008, 1, 1)
+
+    def __init__(self,
+                 count: Callable[[List[str]], Optional[int]],
+                 search_type: SearchType,
+                 cap: Optional[int] = None,
+                 workers: int = 4,
+                 first_day: Optional[datetime.date] = None,
+                 last_day: Optional[datetime.date] = None):
+        self.logger = logging.getLogger(__name__)
+        self.count = count
+        self.count_field = COUNT_FIELDS[search_type]
+        self.cap = cap or self.CAP
+        self.workers = max(1, workers)
+        self.first_day = first_day or self.FIRST_DAY
+        self.last_day = last_day or datetime.date.today()
+
+    def plan(self, keywords: List[str]) -> List[str]:
+        """Return the qualifiers of every shard, [''] when the search fits unsplit"""
+        total = self.count(keywords)
+        if total is None:
+            self.logger.warning('The search does not report its number of results, crawling it unsplit')
+            return ['']
+        if total <= self.cap:
+            self.logger.info(f'{total} results, no need to shard')
+            return ['']
+        shards = []
+        pending = Shard((self.first_day, self.last_day), count=total).split()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending:
+                counts = executor.map(self._count_shard, pending, [keywords] * len(pending))
+                next_pending = []
+                for shard, count in zip(pending, counts):
+                    shard.count = count
+                    if count == 0:
+                        continue
+                    children = shard.split() if count is not None and count > self.cap else []
+                    if children:
+                        next_pending.extend(children)
+                        continue
+                    if count is not None and count > self.cap:
+                        self.logger.warning(
+                            f'Shard {shard.qualifiers(self.count_field)} has {count} results, '
+                            f'only the first {self.cap} can be crawled'
+                        )
+                    shards.append(shard)
+                pending = next_pending
+        shards.sort(key=lambda shard: (shard.created, shard.numbers[0] if shard.numbers else 0))
+        covered = sum(shard.count or 0 for shard in shards)
+        self.logger.info(f'{total} results split into {len(shards)} shards covering {covered} results')
+        return [shard.qualifiers(self.count_field) for shard in shards]
+
+    def _count_shard(self, shard: Shard, keywords: List[str]) -> Optional[int]:
+        return self.count(keywords + [shard.qualifiers(self.count_field)])
@@ -0,0 +1,231 @@
+import asyncio
+import email.utils
+import logging
+import math
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Tuple, Type, TypeVar
+from urllib.parse import urlparse
+
+import requests
+
+from src import metrics
+from src.exceptions import GitHubCrawlerException
+
+T = TypeVar('T')
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Paces requests to ``rate`` per second, allowing bursts of up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def pause_until(self, until: float) -> None:
+        self.paused_until = max(self.paused_until, until)
+
+
+class RequestScheduler:
+    """Paces requests per host and retries rate-limited or failed ones.
+
+    Each host gets a token bucket. ``Retry-After`` pauses the host, the
+    ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` pair spreads the remaining
+    budget over the rest of the window, and every 429 halves the host's rate
+    until successful responses ramp it back up. Retries use exponential
+    backoff with full jitter and give up once ``deadline`` seconds have passed
+    since the first attempt. A host paused past the deadline fails the request
+    at once instead of sleeping through the pause.
+    """
+
+    def __init__(self,
+                 rate: float = 10.0,
+                 burst: float = 10.0,
+                 min_rate: float = 0.1,
+                 max_retries: int = 5,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 deadline: float = 120.0,
+                 logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.retries = 0
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request slot for the url's host and return the delay before sending"""
+        with self._lock:
+            return self._bucket(url).reserve(time.monotonic())
+
+    def observe(self, url: str, status_code: int, headers: Mapping[str, str]) -> None:
+        """Adjust the host's pace from a response's status and rate-limit headers"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(url)
+            retry_after = parse_retry_after(headers)
+            if retry_after is not None:
+                bucket.pause_until(now + retry_after)
+            remaining, reset_in = parse_rate_limit(headers)
+            if remaining is not None and reset_in is not None:
+                if remaining <= 0:
+                    bucket.pause_until(now + reset_in)
+                else:
+                    bucket.rate = max(self.min_rate, min(self.rate, remaining / max(reset_in, 1.0)))
+            elif status_code == 429:
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+            elif status_code < 400 and bucket.rate < self.rate:
+                bucket.rate = min(self.rate, bucket.rate + self.rate / 20)
+
+    def retry_delay(self, attempt: int, status_code: Optional[int], headers: Mapping[str, str], elapsed: float) -> Optional[float]:
+        """Return how long to wait before retrying, or None if the request should not be retried"""
+        if status_code is not None and not is_retryable(status_code, headers):
+            return None
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = parse_retry_after(headers)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if elapsed + delay > self.deadline:
+            return None
+        return delay
+
+    def run(self,
+            url: str,
+            send: Callable[[], requests.Response],
+            retry_on: Tuple[Type[BaseException], ...] = (requests.RequestException,)) -> requests.Response:
+        """Send a request through ``send``, pacing and retrying it.
+
+        Returns the last response, which may still carry an error status once
+        retries are exhausted. Errors listed in ``retry_on`` are retried and
+        re-raised when retries are exhausted.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            delay = self._pace(url, started)
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                response = send()
+            except retry_on as e:
+                retry_in = self.retry_delay(attempt, None, {}, time.monotonic() - started)
+                if retry_in is None:
+                    raise
+                self._log_retry(url, str(e), retry_in)
+            else:
+                self.observe(url, response.status_code, response.headers)
+                retry_in = self.retry_delay(attempt, response.status_code, response.headers, time.monotonic() - started)
+                if response.status_code < 400 or retry_in is None:
+                    return response
+                self._log_retry(url, f'status {response.status_code}', retry_in)
+                # A streamed response holds its pooled connection until closed
+                response.close()
+            time.sleep(retry_in)
+            attempt += 1
+
+    async def run_async(self,
+                        url: str,
+                        send: Callable[[], Awaitable[T]],
+                        retry_on: Tuple[Type[BaseException], ...]) -> T:
+        """Asyncio counterpart of ``run`` for responses exposing ``status_code`` and ``headers``"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            delay = self._pace(url, started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                response = await send()
+            except retry_on as e:
+                retry_in = self.retry_delay(attempt, None, {}, time.monotonic() - started)
+                if retry_in is None:
+                    raise
+                self._log_retry(url, str(e), retry_in)
+            else:
+                self.observe(url, response.status_code, response.headers)
+                retry_in = self.retry_delay(attempt, response.status_code, response.headers, time.monotonic() - started)
+                if response.status_code < 400 or retry_in is None:
+                    return response
+                self._log_retry(url, f'status {response.status_code}', retry_in)
+            await asyncio.sleep(retry_in)
+            attempt += 1
+
+    def _pace(self, url: str, started: float) -> float:
+        """Reserve a request slot, raising if its delay runs past the deadline of a request started at ``started``"""
+        delay = self.reserve(url)
+        if time.monotonic() - started + delay > self.deadline:
+            raise GitHubCrawlerException(f'Error during request: {url} is rate limited for {delay:.0f}s, past the request deadline')
+        return delay
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    def _log_retry(self, url: str, reason: str, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+        metrics.inc('retries_total', host=urlparse(url).netloc)
+        self.logger.warning(f'Retrying {url} in {delay:.2f}s after {reason}')
+
+
+def is_retryable(status_code: int, headers: Mapping[str, str]) -> bool:
+    """GitHub signals secondary rate limits with a 403 and an exhausted budget"""
+    if status_code in RETRYABLE_STATUS_CODES:
+        return True
+    return status_code == 403 and (headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in headers)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        # A negative, infinite or NaN delay is not a usable pause
+        return seconds if math.isfinite(seconds) and seconds >= 0 else None
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def parse_rate_limit(headers: Mapping[str, str]) -> Tuple[Optional[int], Optional[float]]:
+    """Return the remaining request budget and seconds until it resets"""
+    try:
+        remaining = int(headers['X-RateLimit-Remaining'])
+        reset = float(headers['X-RateLimit-Reset'])
+    except (KeyError, ValueError):
+        return None, None
+    if not math.isfinite(reset):
+        return None, None
+    reset_in = max(0.0, reset - time.time())
+    return remaining, reset_in
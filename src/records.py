@@ -0,0 +1,98 @@
+"""Compact in-memory forms of crawl results.
+
+A result dict with a nested ``language_stats`` dict costs several hundred
+bytes per repository. The records below keep the same data in slotted
+dataclasses: owner and language names are interned, so a name shared by
+thousands of repositories is stored once, and a repository's percentages
+live in a single ``array``. ``to_dict`` gives back the exact dict the
+parsers produce, so output files do not change.
+"""
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class RepoInfo:
+    """Extra info of a repository: its owner and language percentages"""
+
+    owner: str
+    languages: Tuple[str, ...]
+    percentages: array
+
+    @classmethod
+    def from_dict(cls, extra: Dict[str, Any]) -> 'RepoInfo':
+        stats = extra['language_stats']
+        return cls(
+            _intern(extra['owner']),
+            tuple(sys.intern(language) for language in stats),
+            array('d', stats.values()),
+        )
+
+    @property
+    def language_stats(self) -> Dict[str, float]:
+        return dict(zip(self.languages, self.percentages))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'owner': self.owner, 'language_stats': self.language_stats}
+
+
+@dataclass(slots=True)
+class ThreadInfo:
+    """Extra info of an issue or discussion"""
+
+    owner: str
+    repository: str
+    number: Optional[int]
+    title: Optional[str]
+
+    @classmethod
+    def from_dict(cls, extra: Dict[str, Any]) -> 'ThreadInfo':
+        return cls(_intern(extra['owner']), _intern(extra['repository']), extra['number'], extra['title'])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'owner': self.owner, 'repository': self.repository, 'number': self.number, 'title': self.title}
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """A search result and its extra info, if it was fetched.
+
+    Extra info of an unexpected shape is kept as the dict it came in.
+    """
+
+    url: str
+    extra: Union[RepoInfo, ThreadInfo, Dict[str, Any], None] = None
+
+    @classmethod
+    def from_dict(cls, result: Dict[str, Any]) -> 'SearchHit':
+        extra = result.get('extra')
+        if isinstance(extra, dict):
+            if extra.keys() == {'owner', 'language_stats'} and all(type(value) is float for value in extra['language_stats'].values()):
+                extra = RepoInfo.from_dict(extra)
+            elif extra.keys() == {'owner', 'repository', 'number', 'title'}:
+                extra = ThreadInfo.from_dict(extra)
+        return cls(result['url'], extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {'url': self.url}
+        if self.extra is not None:
+            result['extra'] = self.extra if isinstance(self.extra, dict) else self.extra.to_dict()
+        return result
+
+
+def compact(result: Dict[str, Any]) -> Union[SearchHit, Dict[str, Any]]:
+    """The record of a result, or the result itself if it has fields records do not keep"""
+    if 'url' not in result or result.keys() - {'url', 'extra'} or ('extra' in result and result['extra'] is None):
+        return result
+    return SearchHit.from_dict(result)
+
+
+def expand(record: Union[SearchHit, Dict[str, Any]]) -> Dict[str, Any]:
+    """The result dict of a record made by ``compact``"""
+    return record.to_dict() if isinstance(record, SearchHit) else record
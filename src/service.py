@@ -0,0 +1,283 @@
+import collections
+import concurrent.futures
+import json
+import logging
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from src import metrics
+from src.concurrency import TENANT
+from src.exceptions import GitHubCrawlerException
+from src.github_crawler import CRAWL_BACKENDS, GitHubCrawler
+from src.records import SearchHit, compact, expand
+from src.validators import validate_input_data
+
+# Crawl options a job may set next to its input data: (types accepted, default)
+JOB_OPTIONS = {
+    'extra_info': ((bool,), False),
+    'max_pages': ((int,), 1),
+    'max_results': ((int, type(None)), None),
+    'backend': ((str,), 'html'),
+    'shard': ((bool,), False),
+    'deadline': ((int, float, type(None)), None),
+}
+
+
+def parse_job_request(request: Any, defaults: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a job into its input data and crawl options, raising ValueError if it is invalid.
+
+    Options the job leaves out are taken from ``defaults``, then from ``JOB_OPTIONS``.
+    """
+    if not isinstance(request, dict):
+        raise ValueError('A job must be a JSON object')
+    validate_input_data(request)
+    unknown = request.keys() - {'keywords', 'proxies', 'type'} - JOB_OPTIONS.keys()
+    if unknown:
+        raise ValueError(f'Unknown field(s): {", ".join(sorted(unknown))}')
+    options = {}
+    for name, (types, default) in JOB_OPTIONS.items():
+        value = request.get(name, (defaults or {}).get(name, default))
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f'Invalid {name}: {value!r}')
+        options[name] = value
+    if options['backend'] not in CRAWL_BACKENDS:
+        raise ValueError(f'Invalid backend: {options["backend"]}. Must be one of: {", ".join(CRAWL_BACKENDS)}')
+    return {field: request[field] for field in ('keywords', 'proxies', 'type')}, options
+
+
+class CrawlJob:
+    """A crawl submitted to a CrawlService and the results it has found so far.
+
+    Results are kept as compact records until they are read.
+    """
+
+    def __init__(self, input_data: Dict[str, Any], options: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.input_data = input_data
+        self.options = options
+        self.status = 'queued'
+        self.results: List[Union[SearchHit, Dict[str, Any]]] = []
+        self.error: Optional[str] = None
+        self.complete: Optional[bool] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._condition = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def start(self) -> None:
+        with self._condition:
+            self.status = 'running'
+            self.started = time.time()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        with self._condition:
+            self.results.append(compact(result))
+            self._condition.notify_all()
+
+    def finish(self, error: Optional[str] = None, complete: bool = True) -> None:
+        with self._condition:
+            self.status = 'failed' if error is not None else 'done'
+            self.error = error
+            self.complete = complete and error is None
+            self.finished = time.time()
+            self._condition.notify_all()
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """Yield the job's results, waiting for new ones until it is finished"""
+        position = 0
+        while True:
+            with self._condition:
+                while position >= len(self.results) and not self.done:
+                    self._condition.wait()
+                ready = self.results[position:]
+                done = self.done
+            yield from map(expand, ready)
+            position += len(ready)
+            if done and position >= len(self.results):
+                return
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'id': self.id,
+                'status': self.status,
+                'keywords': self.input_data['keywords'],
+                'type': self.input_data['type'],
+                'options': self.options,
+                'results': len(self.results),
+                'complete': self.complete,
+                'error': self.error,
+                'submitted': self.submitted,
+                'started': self.started,
+                'finished': self.finished,
+            }
+
+
+class CrawlService:
+    """Runs crawl jobs in a long-lived process, up to ``max_jobs`` at a time.
+
+    ``crawler_factory`` builds the crawler of a job from its input data and
+    options; handing every crawler the same clients, scheduler and caches
+    keeps HTTP sessions, proxy health and parsed pages warm between jobs.
+    At most ``max_queued`` jobs wait for a free slot, and the last
+    ``history`` finished jobs are kept with their results.
+    """
+
+    def __init__(self,
+                 crawler_factory: Callable[[Dict[str, Any], Dict[str, Any]], GitHubCrawler],
+                 max_jobs: int = 2,
+                 max_queued: int = 100,
+                 history: int = 100):
+        self.logger = logging.getLogger(__name__)
+        self.crawler_factory = crawler_factory
+        self.max_jobs = max(1, max_jobs)
+        self.max_queued = max_queued
+        self.history = history
+        self._jobs: Dict[str, CrawlJob] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(self.max_jobs, thread_name_prefix='crawl-job')
+
+    def submit(self, request: Dict[str, Any]) -> CrawlJob:
+        """Queue a job given as input data plus crawl options, raising ValueError if it is invalid"""
+        input_data, options = parse_job_request(request)
+        job = CrawlJob(input_data, options)
+        with self._lock:
+            queued = sum(other.status == 'queued' for other in self._jobs.values())
+            if queued >= self.max_queued:
+                raise GitHubCrawlerException(f'Too many queued jobs: {queued}')
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job)
+        metrics.inc('jobs_total', status='queued')
+        self.logger.info(f'Job {job.id} queued: {input_data["keywords"]} {options}')
+        return job
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[CrawlJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def close(self) -> None:
+        """Stop accepting work and wait for the running jobs"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, job: CrawlJob) -> None:
+        # Jobs running side by side share the request slots of an adaptive limiter evenly
+        TENANT.set(job.id)
+        job.start()
+        self.logger.info(f'Job {job.id} started')
+        try:
+            crawler = self.crawler_factory(job.input_data, job.options)
+            for result in crawler.iter_search():
+                job.add(result)
+        except Exception as exc:
+            self.logger.error(f'Job {job.id} failed: {exc}')
+            job.finish(error=str(exc))
+        else:
+            job.finish(complete=crawler.complete)
+            self.logger.info(f'Job {job.id} finished with {len(job.results)} results')
+        metrics.inc('jobs_total', status=job.status)
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+
+class CrawlServer:
+    """Local HTTP/JSON API of a CrawlService.
+
+    ``POST /jobs`` submits a job and answers 202 with its status, ``GET /jobs``
+    lists the jobs, ``GET /jobs/<id>`` returns one and ``GET /jobs/<id>/results``
+    streams its results as NDJSON while it runs, ending once it finishes.
+    """
+
+    def __init__(self, service: CrawlService, port: int = 8080, host: str = '127.0.0.1'):
+        self.logger = logging.getLogger(__name__)
+        self.service = service
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def serve_forever(self) -> None:
+        self.logger.info(f'Serving crawl jobs at {self.base_url}/jobs')
+        self.server.serve_forever()
+
+    def start(self) -> None:
+        """Serve from a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != '/jobs':
+                    self._send_json(404, {'error': 'Not found'})
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', '0'))) or b'null')
+                    job = service.submit(request)
+                except (ValueError, TypeError) as e:
+                    self._send_json(400, {'error': str(e)})
+                    return
+                except GitHubCrawlerException as e:
+                    self._send_json(429, {'error': str(e)})
+                    return
+                self._send_json(202, job.to_dict())
+
+            def do_GET(self):
+                parts = self.path.strip('/').split('/')
+                if parts == ['jobs']:
+                    self._send_json(200, [job.to_dict() for job in service.jobs()])
+                    return
+                job = service.get(parts[1]) if len(parts) in (2, 3) and parts[0] == 'jobs' else None
+                if job is None or (len(parts) == 3 and parts[2] != 'results'):
+                    self._send_json(404, {'error': 'Not found'})
+                elif len(parts) == 2:
+                    self._send_json(200, job.to_dict())
+                else:
+                    self._stream_results(job)
+
+            def _stream_results(self, job: CrawlJob):
+                # HTTP/1.0 without a length: the results end when the connection closes
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.end_headers()
+                try:
+                    for result in job.iter_results():
+                        self.wfile.write(json.dumps(result).encode('utf-8') + b'\n')
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _send_json(self, status: int, body: Any):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
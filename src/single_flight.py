@@ -0,0 +1,67 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from src import metrics
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one, across threads.
+
+    The first caller of a key runs the call; callers arriving while it is in
+    flight wait for it and get its result, or its exception. Nothing is kept
+    once the call returns, so a later call with the key runs again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+        if not leader:
+            metrics.inc('coalesced_calls_total')
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent calls with the same key into one task, on one event loop.
+
+    A caller cancelled while waiting does not cancel the shared call, which
+    keeps running for the other callers.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            metrics.inc('coalesced_calls_total')
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved here so an exception nobody waited for is not reported as lost
+            task.exception()
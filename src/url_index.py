@@ -0,0 +1,76 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+
+class UrlIndex:
+    """SQLite index of repository URLs.
+
+    Across runs it remembers when each repository was last enriched and what
+    it produced, so incremental crawls only refetch new or stale URLs. Within
+    a run it records which URLs have been seen, so a URL surfacing on several
+    pages or keywords is only crawled once. The default in-memory database
+    keeps the in-run part without persisting anything.
+    """
+
+    def __init__(self, path: str = ':memory:', max_age: float = 6 * 3600.0):
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS repositories ('
+            'url TEXT PRIMARY KEY, owner TEXT, language_stats TEXT, enriched_at REAL)'
+        )
+        self._connection.execute(
+            'CREATE TEMP TABLE IF NOT EXISTS seen (run TEXT, url TEXT, PRIMARY KEY (run, url))'
+        )
+        self._connection.commit()
+
+    def start_run(self) -> str:
+        """Start tracking a new run and return its id"""
+        return uuid.uuid4().hex
+
+    def mark_seen(self, run: str, url: str) -> bool:
+        """Record a URL for a run, return True if the run had not seen it before"""
+        with self._lock:
+            cursor = self._connection.execute('INSERT OR IGNORE INTO seen VALUES (?, ?)', (run, url))
+            return cursor.rowcount == 1
+
+    def get(self, url: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the stored extra info of a repository enriched within ``max_age`` seconds"""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT owner, language_stats FROM repositories WHERE url = ? AND enriched_at >= ?',
+                (url, time.time() - max_age)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        owner, language_stats = row
+        return {'owner': owner, 'language_stats': json.loads(language_stats)}
+
+    def upsert(self, url: str, extra: Dict[str, Any]) -> None:
+        """Store the extra info of a freshly enriched repository"""
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO repositories VALUES (?, ?, ?, ?)',
+                (url, extra.get('owner'), json.dumps(extra.get('language_stats', {})), time.time())
+            )
+            self._connection.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            repositories, = self._connection.execute('SELECT COUNT(*) FROM repositories').fetchone()
+            return {'hits': self.hits, 'misses': self.misses, 'repositories': repositories}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
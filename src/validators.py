@@ -29,4 +29,24 @@ def validate_input_data(input_data):
     if input_data['type'] not in valid_types:
         raise ValueError(f'Invalid search type: {input_data["type"]}. Must be one of: {", ".join(valid_types)}')
     
-    return True
\ No newline at end of file
+    return True
+
+
+def validate_batch_input(input_data):
+    """
+    Validates the outline of a batch input file, a list of crawl jobs
+    sharing its proxies; each job is validated when it runs
+    Args:
+        input_data (dict): The input data to validate
+    Raises:
+        ValueError: If any validation fails
+    Returns:
+        bool: True if validation passes
+    """
+    if not isinstance(input_data['jobs'], list) or not input_data['jobs']:
+        raise ValueError('Jobs must be a non-empty list')
+    
+    if not isinstance(input_data.get('proxies', []), list):
+        raise ValueError('Proxies must be a list')
+    
+    return True
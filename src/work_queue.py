@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.exceptions import GitHubCrawlerException
+
+STATES = ('pending', 'leased', 'done', 'failed')
+
+
+class WorkItem:
+    """A unit of crawl work leased from a WorkQueue"""
+
+    def __init__(self, item_id: int, job: str, kind: str, key: str, payload: Dict[str, Any], attempts: int):
+        self.id = item_id
+        self.job = job
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+
+
+class WorkQueue:
+    """Durable SQLite queue of crawl work shared by the coordinator and workers.
+
+    Items are leased for ``lease_seconds``; an item whose worker crashed or
+    stalled is handed out again once its lease expires, up to
+    ``max_attempts`` times before it is marked failed. Items are unique per
+    job, kind and key, so a repository found on several search pages is
+    only queued once. Every process opens its own WorkQueue on the same
+    file; leases are taken in an immediate transaction, so two workers
+    never lease the same item.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 5, timeout: float = 30.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        if path != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, spec TEXT)')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS items ('
+            'id INTEGER PRIMARY KEY, job TEXT, kind TEXT, key TEXT, position INTEGER, payload TEXT, '
+            'state TEXT, worker TEXT, lease_until REAL, attempts INTEGER, result TEXT, error TEXT, '
+            'UNIQUE (job, kind, key))'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS items_state ON items (state, lease_until)')
+
+    def add_job(self, job: str, spec: Dict[str, Any]) -> None:
+        with self._lock:
+            self._connection.execute('INSERT OR IGNORE INTO jobs VALUES (?, ?)', (job, json.dumps(spec)))
+
+    def job_spec(self, job: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._connection.execute('SELECT spec FROM jobs WHERE id = ?', (job,)).fetchone()
+        if row is None:
+            raise GitHubCrawlerException(f'Unknown job: {job}')
+        return json.loads(row[0])
+
+    def clear_job(self, job: str) -> int:
+        """Remove every item of a job, return how many there were"""
+        with self._lock:
+            return self._connection.execute('DELETE FROM items WHERE job = ?', (job,)).rowcount
+
+    def retry_failed(self, job: str) -> int:
+        """Return the failed items of a job to the queue with fresh attempts, return how many"""
+        with self._lock:
+            return self._connection.execute(
+                "UPDATE items SET state = 'pending', attempts = 0, error = NULL, worker = NULL, lease_until = NULL "
+                "WHERE job = ? AND state = 'failed'",
+                (job,)
+            ).rowcount
+
+    def put(self, job: str, kind: str, items: Iterable[Tuple[str, int, Dict[str, Any]]]) -> int:
+        """Queue ``(key, position, payload)`` items, skipping keys the job already has; return how many were new"""
+        rows = [(job, kind, key, position, json.dumps(payload)) for key, position, payload in items]
+        with self._lock:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO items (job, kind, key, position, payload, state, attempts) '
+                "VALUES (?, ?, ?, ?, ?, 'pending', 0)",
+                rows
+            )
+            return self._connection.total_changes - before
+
+    def lease(self, worker: str, limit: int = 1) -> List[WorkItem]:
+        """Lease up to ``limit`` pending or expired items, oldest first"""
+        now = time.time()
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                self._connection.execute(
+                    "UPDATE items SET state = 'failed', error = 'lease expired' "
+                    "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                    (now, self.max_attempts)
+                )
+                rows = self._connection.execute(
+                    'SELECT id, job, kind, key, payload, attempts FROM items '
+                    "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+                    'ORDER BY id LIMIT ?',
+                    (now, limit)
+                ).fetchall()
+                self._connection.executemany(
+                    "UPDATE items SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    [(worker, now + self.lease_seconds, row[0]) for row in rows]
+                )
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+        return [
+            WorkItem(item_id, job, kind, key, json.loads(payload), attempts + 1)
+            for item_id, job, kind, key, payload, attempts in rows
+        ]
+
+    def ack(self, item: WorkItem, worker: str, result: Any) -> bool:
+        """Complete a leased item, False if the lease was lost to another worker"""
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE items SET state = 'done', result = ?, error = NULL "
+                "WHERE id = ? AND state = 'leased' AND worker = ?",
+                (json.dumps(result), item.id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, item: WorkItem, worker: str, error: str) -> bool:
+        """Return a leased item to the queue, or mark it failed after ``max_attempts``"""
+        state = 'failed' if item.attempts >= self.max_attempts else 'pending'
+        with self._lock:
+            cursor = self._connection.execute(
+                'UPDATE items SET state = ?, error = ?, lease_until = NULL '
+                "WHERE id = ? AND state = 'leased' AND worker = ?",
+                (state, error, item.id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def results(self, job: str, kind: str) -> List[Tuple[str, Any]]:
+        """``(key, result)`` of the job's done items of a kind, in position order"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, result FROM items WHERE job = ? AND kind = ? AND state = 'done' ORDER BY position, id",
+                (job, kind)
+            ).fetchall()
+        return [(key, json.loads(result)) for key, result in rows]
+
+    def stats(self, job: Optional[str] = None) -> Dict[str, int]:
+        """Number of items in each state, of one job or of the whole queue"""
+        query = 'SELECT state, COUNT(*) FROM items'
+        params: Tuple = ()
+        if job is not None:
+            query += ' WHERE job = ?'
+            params = (job,)
+        with self._lock:
+            counts = dict(self._connection.execute(query + ' GROUP BY state', params).fetchall())
+        return {state: counts.get(state, 0) for state in STATES}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
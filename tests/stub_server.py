@@ -0,0 +1,169 @@
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.github_stub import GitHubStandIn
+
+
+class StubGitHubServer(GitHubStandIn):
+    """Local stand-in for github.com serving minimal search and repository pages.
+
+    ``pages`` maps a search page number to the repository paths listed on it,
+    ``languages`` maps a repository path to its language statistics and
+    ``titles`` maps an issue or discussion path to its page title.
+    ``stalls`` maps a path to how many of its first requests hang for
+    ``stall`` seconds before being answered.
+    """
+
+    def __init__(self,
+                 pages: Dict[int, List[str]],
+                 languages: Dict[str, Dict[str, float]],
+                 titles: Optional[Dict[str, str]] = None,
+                 stalls: Optional[Dict[str, int]] = None,
+                 stall: float = 1.0,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+        self.languages = languages
+        self.titles = titles or {}
+        self.stalls = dict(stalls or {})
+        self.stall = stall
+        self._stall_lock = threading.Lock()
+
+    def search_html(self, params: Dict[str, str]) -> Optional[str]:
+        page = int(params.get('p', '1'))
+        divs = ''.join(
+            f'<div class="search-title"><a href="{self.base_url}{path}">{path}</a></div>'
+            for path in self.pages.get(page, [])
+        )
+        return f'<html><body>{divs}</body></html>'
+
+    def repository_html(self, path: str) -> Optional[str]:
+        with self._stall_lock:
+            stalled = self.stalls.get(path, 0) > 0
+            if stalled:
+                self.stalls[path] -= 1
+        if stalled:
+            time.sleep(self.stall)
+        if path in self.titles:
+            return f'<html><head><title>{self.titles[path]}</title></head><body></body></html>'
+        if path not in self.languages:
+            return None
+        items = ''.join(
+            f'<li class="d-inline"><span>{language}</span><span>{percentage}%</span></li>'
+            for language, percentage in self.languages[path].items()
+        )
+        return f'<html><body><div class="Layout-sidebar"><ul>{items}</ul></div></body></html>'
+
+
+class StubSearchIndexServer(GitHubStandIn):
+    """Local stand-in for github.com search over an index of repositories.
+
+    ``repositories`` maps a repository path to its creation date and stars.
+    Searches filter on ``created:`` and ``stars:`` range qualifiers and, like
+    github.com, report every match as ``result_count`` but only list the
+    first ``cap``, ``per_page`` per page, oldest first.
+    """
+
+    QUALIFIER = re.compile(r'(created|stars):(\S+)\.\.(\S+)')
+
+    def __init__(self, repositories: Dict[str, Tuple[str, int]], cap: int = 1000, per_page: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.repositories = repositories
+        self.cap = cap
+        self.per_page = per_page
+
+    def search_html(self, params: Dict[str, str]) -> Optional[str]:
+        matches = sorted(
+            (created, path) for path, (created, stars) in self.repositories.items()
+            if self.matches(params.get('q', ''), created, stars)
+        )
+        page = int(params.get('p', '1'))
+        listed = matches[:self.cap][(page - 1) * self.per_page:page * self.per_page]
+        divs = ''.join(
+            f'<div class="search-title"><a href="{self.base_url}{path}">{path}</a></div>' for _, path in listed
+        )
+        data = json.dumps({'payload': {'result_count': len(matches), 'page': page}})
+        return (
+            f'<html><body><script type="application/json" data-target="react-app.embeddedData">{data}</script>'
+            f'{divs}</body></html>'
+        )
+
+    @classmethod
+    def matches(cls, query: str, created: str, stars: int) -> bool:
+        for field, low, high in cls.QUALIFIER.findall(query):
+            value = created if field == 'created' else stars
+            convert = str if field == 'created' else int
+            if value < convert(low) or (high != '*' and value > convert(high)):
+                return False
+        return True
+
+class StubGitHubApiServer(GitHubStandIn):
+    """Local stand-in for GitHub's REST search and GraphQL APIs.
+
+    ``repositories`` maps ``owner/name`` to the size in bytes of each of its
+    languages and ``issues`` maps ``owner/name/number`` to an issue title.
+    Search lists all of them, whatever the query, and like GitHub answers
+    422 for pages past the first 1000 matches. GraphQL answers the aliased
+    ``repository`` fields of a batch query from the query variables, and
+    ``graphql_batches`` records the size of every batch.
+    """
+
+    CONTENT_TYPE = 'application/json; charset=utf-8'
+
+    def __init__(self, repositories: Dict[str, Dict[str, int]], issues: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.repositories = repositories
+        self.issues = issues or {}
+        self.graphql_batches: List[int] = []
+
+    def route(self, path: str, params: Dict[str, str]) -> Tuple[int, str]:
+        if path == '/search/repositories':
+            urls = [f'https://github.com/{full_name}' for full_name in self.repositories]
+        elif path == '/search/issues':
+            urls = [
+                f'https://github.com/{key.rsplit("/", 1)[0]}/issues/{key.rsplit("/", 1)[1]}' for key in self.issues
+            ]
+        else:
+            return 404, json.dumps({'message': 'Not Found'})
+        per_page, page = int(params.get('per_page', '30')), int(params.get('page', '1'))
+        if page * per_page > 1000:
+            return 422, json.dumps({'message': 'Only the first 1000 search results are available'})
+        items = [{'html_url': url} for url in urls[(page - 1) * per_page:page * per_page]]
+        return 200, json.dumps({'total_count': len(urls), 'incomplete_results': False, 'items': items})
+
+    def route_post(self, path: str, body: bytes) -> Tuple[int, str]:
+        if path != '/graphql':
+            return 404, json.dumps({'message': 'Not Found'})
+        variables = json.loads(body)['variables']
+        data, errors = {}, []
+        position = 0
+        while f'owner{position}' in variables:
+            owner, name = variables[f'owner{position}'], variables[f'name{position}']
+            node = self._node(owner, name, variables.get(f'number{position}'))
+            if node is None:
+                errors.append({'type': 'NOT_FOUND', 'path': [f'r{position}'], 'message': f'Could not resolve {owner}/{name}'})
+            data[f'r{position}'] = node
+            position += 1
+        with self._lock:
+            self.graphql_batches.append(position)
+        return 200, json.dumps({'data': data, 'errors': errors} if errors else {'data': data})
+
+    def _node(self, owner: str, name: str, number: Optional[int]) -> Optional[Dict]:
+        full_name = f'{owner}/{name}'
+        if number is not None:
+            title = self.issues.get(f'{full_name}/{number}')
+            issue = {'number': number, 'title': title} if title is not None else None
+            return {'owner': {'login': owner}, 'name': name, 'issue': issue}
+        if full_name not in self.repositories:
+            return None
+        languages = sorted(self.repositories[full_name].items(), key=lambda item: -item[1])
+        return {
+            'owner': {'login': owner},
+            'languages': {
+                'totalSize': sum(size for _, size in languages),
+                'edges': [{'size': size, 'node': {'name': language}} for language, size in languages]
+            }
+        }
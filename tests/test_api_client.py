@@ -0,0 +1,100 @@
+import unittest
+from src.api_client import build_batch_query
+from src.api_parser import ApiResultParser
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubApiServer
+
+class TestGitHubApiClient(unittest.TestCase):
+    def crawl(self, server, search_type=SearchType.REPOSITORIES, **kwargs):
+        kwargs.setdefault('scheduler', RequestScheduler(rate=1000))
+        return GitHubCrawler(
+            proxies=[],
+            keywords=['python'],
+            search_type=search_type.value,
+            include_extra_info=True,
+            backend='api',
+            base_url=server.base_url,
+            **kwargs
+        ).execute_search()
+    
+    def test_batch_query(self):
+        """Test a batch query has one aliased repository field per URL"""
+        query, variables = build_batch_query(
+            ['https://github.com/user1/repo1', 'https://github.com/user2/repo2'], SearchType.REPOSITORIES
+        )
+        
+        # Verify the query
+        self.assertIn('r1: repository(owner: $owner1, name: $name1)', query)
+        self.assertIn('$owner0: String!', query)
+        self.assertEqual(variables, {'owner0': 'user1', 'name0': 'repo1', 'owner1': 'user2', 'name1': 'repo2'})
+    
+    def test_crawl_repositories(self):
+        """Test 150 repositories take two search pages and two GraphQL queries and map onto the HTML schema"""
+        repositories = {f'user{i}/repo{i}': {'Python': 3 * i + 1, 'C': i} for i in range(150)}
+        repositories['user0/repo0'] = {}
+        with StubGitHubApiServer(repositories) as server:
+            results = self.crawl(server, max_pages=3, token='secret')
+        
+        # Verify the requests
+        self.assertEqual(len([path for path in server.requests if path.startswith('/search/repositories')]), 3)
+        self.assertEqual(sorted(server.graphql_batches), [50, 100])
+        self.assertEqual(set(server.authorizations), {'Bearer secret'})
+        
+        # Verify the results
+        self.assertEqual(len(results), 150)
+        self.assertEqual(results[0], {'url': 'https://github.com/user0/repo0', 'extra': {'owner': 'user0', 'language_stats': {}}})
+        self.assertEqual(results[1]['extra'], {'owner': 'user1', 'language_stats': {'Python': 80.0, 'C': 20.0}})
+        self.assertEqual(results[149]['extra']['language_stats'], {'Python': 75.0, 'C': 25.0})
+    
+    def test_pages_past_search_cap(self):
+        """Test pages past the first 1000 matches are not requested"""
+        repositories = {f'user{i}/repo{i}': {'Go': 1} for i in range(1100)}
+        with StubGitHubApiServer(repositories) as server:
+            results = self.crawl(server, max_pages=15)
+        
+        # Verify the crawl stopped at the cap instead of failing
+        self.assertEqual(len([path for path in server.requests if path.startswith('/search/repositories')]), 10)
+        self.assertEqual(server.status_counts[422], 0)
+        self.assertEqual(len(results), 1000)
+    
+    def test_crawl_issues_and_missing_nodes(self):
+        """Test issues are enriched and results GraphQL cannot resolve keep a fallback"""
+        issues = {'user1/repo/1': 'Crash on start', 'user2/repo/7': 'Docs typo'}
+        with StubGitHubApiServer({}, issues) as server:
+            server.issues['user2/repo/7'] = None
+            results = self.crawl(server, SearchType.ISSUES)
+        
+        # Verify the results
+        self.assertEqual([result['extra'] for result in results], [
+            {'owner': 'user1', 'repository': 'repo', 'number': 1, 'title': 'Crash on start'},
+            {'owner': 'user2', 'repository': 'repo', 'number': 7, 'title': None},
+        ])
+    
+    def test_unsupported_and_failing(self):
+        """Test discussions are rejected and GraphQL failures keep the results without extra info"""
+        with self.assertRaises(ValueError):
+            GitHubCrawler(proxies=[], keywords=['python'], search_type='discussions', backend='api')
+        with self.assertRaises(ValueError):
+            GitHubCrawler(proxies=[], keywords=['python'], search_type='repositories', backend='graphql')
+        
+        with StubGitHubApiServer({'user/repo': {'Go': 1}}) as server:
+            server.route_post = lambda path, body: (500, '{}')
+            results = self.crawl(server, scheduler=RequestScheduler(rate=1000, max_retries=0))
+        
+        # Verify the results
+        self.assertEqual(results, [{'url': 'https://github.com/user/repo'}])
+    
+    def test_parse_repository_info(self):
+        """Test language sizes become percentages with one decimal"""
+        node = {
+            'owner': {'login': 'User'},
+            'languages': {'totalSize': 3, 'edges': [{'size': 2, 'node': {'name': 'Go'}}, {'size': 1, 'node': {'name': 'C'}}]}
+        }
+        
+        # Verify the info
+        self.assertEqual(
+            ApiResultParser().parse_repository_info(node, 'https://github.com/User/repo'),
+            {'owner': 'User', 'language_stats': {'Go': 66.7, 'C': 33.3}}
+        )
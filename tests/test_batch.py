@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+from src.batch import BatchRunner, batch_jobs
+from src.concurrency import AdaptiveLimiter
+from src.github_client import GitHubClient
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+PAGES = {1: ['/user1/repo1', '/user2/repo2']}
+LANGUAGES = {'/user1/repo1': {'Python': 100.0}, '/user2/repo2': {'Go': 100.0}}
+
+class TestBatch(unittest.TestCase):
+    def test_batch_jobs(self):
+        """Test batch jobs inherit the file's proxies and get numbered output files"""
+        input_data = {
+            'proxies': ['http://proxy1.com'],
+            'jobs': [
+                {'keywords': ['python'], 'type': 'repositories'},
+                {'keywords': ['go'], 'type': 'issues', 'proxies': [], 'output_file': 'go.json'},
+                'not a job',
+            ]
+        }
+        jobs = batch_jobs(input_data, 'data/results.json')
+        
+        # Verify the requests and output files
+        self.assertEqual(jobs[0].request, {'proxies': ['http://proxy1.com'], 'keywords': ['python'], 'type': 'repositories'})
+        self.assertEqual(jobs[1].request['proxies'], [])
+        self.assertEqual([job.output_file for job in jobs], ['data/results.1.json', 'go.json', 'data/results.3.json'])
+    
+    def test_run_batch(self):
+        """Test a batch runs its jobs on one shared client and reports each job separately"""
+        created = []
+        with StubGitHubServer(PAGES, LANGUAGES) as server, tempfile.TemporaryDirectory() as directory:
+            limiter = AdaptiveLimiter(max_limit=4)
+            client = GitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000), limiter=limiter)
+            
+            def create_crawler(input_data, options):
+                created.append(options)
+                return GitHubCrawler(
+                    proxies=input_data['proxies'],
+                    keywords=input_data['keywords'],
+                    search_type=input_data['type'],
+                    include_extra_info=options['extra_info'],
+                    max_pages=options['max_pages'],
+                    limiter=limiter,
+                    client=client,
+                    base_url=server.base_url
+                )
+            
+            input_data = {'proxies': [], 'jobs': [
+                {'keywords': ['python'], 'type': 'repositories'},
+                {'keywords': ['go'], 'type': 'repositories', 'extra_info': False},
+                {'keywords': ['rust'], 'type': 'users'},
+            ]}
+            jobs = batch_jobs(input_data, os.path.join(directory, 'results.json'))
+            BatchRunner(create_crawler, max_jobs=2, defaults={'extra_info': True}).run(jobs)
+            with open(jobs[0].output_file) as f:
+                python_results = json.load(f)
+            with open(jobs[1].output_file) as f:
+                go_results = json.load(f)
+        
+        # Verify the results and the per-job report
+        self.assertEqual(python_results[0]['extra'], {'owner': 'user1', 'language_stats': {'Python': 100.0}})
+        self.assertEqual(go_results, [{'url': f'{server.base_url}/user1/repo1'}, {'url': f'{server.base_url}/user2/repo2'}])
+        self.assertEqual([job.status for job in jobs], ['done', 'done', 'failed'])
+        self.assertEqual([job.results for job in jobs], [2, 2, 0])
+        self.assertTrue(jobs[2].error.startswith('Invalid search type: users'))
+        self.assertEqual(sorted(options['extra_info'] for options in created), [False, True])
+        self.assertEqual(limiter.in_flight, 0)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import unittest
+from benchmarks.github_stub import FixtureGitHubStandIn
+from benchmarks.parser_backends import FIXTURES_DIR, load_corpus
+from src.async_github_client import AsyncGitHubClient
+from src.body_reader import BodyReader, SectionScanner, TitleScanner
+from src.github_client import GitHubClient
+from src.parser import ResultParser
+from src.parser_backends import available_backends
+from src.rate_limiter import RequestScheduler
+
+class TestBodyReader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        _, cls.repository_pages = load_corpus()
+        with open(os.path.join(FIXTURES_DIR, 'expected.json')) as f:
+            cls.expected = json.load(f)['repositories']
+    
+    def read(self, body: bytes, chunk_size: int, scanner=None, max_bytes: int = 1024 * 1024) -> BodyReader:
+        reader = BodyReader(scanner, max_bytes)
+        for start in range(0, len(body), chunk_size):
+            if reader.feed(body[start:start + chunk_size]):
+                break
+        return reader
+    
+    def test_sidebar_section(self):
+        """Test reading stops after the sidebar and the partial page parses like the full one"""
+        for chunk_size in (7, 1000, 1024 * 1024):
+            for url, html in self.repository_pages:
+                reader = self.read(html.encode('utf-8'), chunk_size, SectionScanner())
+                
+                # Verify the body ends with the sidebar
+                self.assertEqual(reader.stopped, 'section_end')
+                self.assertLess(len(reader.body), len(html.encode('utf-8')))
+                self.assertNotIn(b'</footer>', reader.body)
+                for name in available_backends():
+                    with self.subTest(chunk_size=chunk_size, url=url, backend=name):
+                        # Verify the language stats
+                        partial = reader.body.decode('utf-8')
+                        self.assertEqual(ResultParser(backend=name).parse_repository_info(partial, url), self.expected[url])
+    
+    def test_nested_divs_and_split_tags(self):
+        """Test nested divs are matched and tags split across chunks are found"""
+        html = b'<div class="x Layout-sidebar"><div><div></div></div><li class="d-inline"></li></div><p>rest</p>'
+        
+        reader = self.read(html, 3, SectionScanner())
+        
+        # Verify the section
+        self.assertEqual(bytes(reader.body), html[:-len(b'<p>rest</p>')])
+    
+    def test_title_and_cap(self):
+        """Test issue pages stop after the title and bodies are capped at max_bytes"""
+        html = b'<html><head><title>Bug</title><style>' + b'x' * 5000 + b'</style></head></html>'
+        
+        title = self.read(html, 10, TitleScanner())
+        capped = self.read(html, 1000, SectionScanner(), max_bytes=1500)
+        whole = self.read(html, 1000)
+        
+        # Verify where reading stopped
+        self.assertEqual(bytes(title.body), b'<html><head><title>Bug</title>')
+        self.assertEqual((capped.stopped, len(capped.body)), ('max_bytes', 1500))
+        self.assertEqual((whole.stopped, bytes(whole.body)), (None, html))
+    
+    def test_clients_stream_gzipped_pages(self):
+        """Test both clients read gzipped repository pages only up to the sidebar"""
+        with FixtureGitHubStandIn(pages=1) as stand_in:
+            url = f'{stand_in.base_url}/encode/django-rest-framework--p1'
+            client = GitHubClient([], base_url=stand_in.base_url, scheduler=RequestScheduler(rate=1000))
+            full = client.get_repository(url)
+            partial = client.get_repository(url, scanner=SectionScanner)
+            
+            async def get_async():
+                async with AsyncGitHubClient([], base_url=stand_in.base_url, scheduler=RequestScheduler(rate=1000)) as async_client:
+                    return await async_client.get_repository(url, scanner=SectionScanner)
+            async_partial = asyncio.run(get_async())
+        
+        # Verify the bodies
+        self.assertEqual(full.headers['Content-Encoding'], 'gzip')
+        self.assertTrue(full.text.startswith(partial.text))
+        self.assertTrue(partial.text.rstrip().endswith('</div>'))
+        self.assertLess(len(partial.content), len(full.content))
+        self.assertEqual(async_partial.content, partial.content)
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from src.checkpoint import CheckpointJournal
+from src.enums import SearchType
+from src.exceptions import GitHubCrawlerException
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'results.json.checkpoint')
+        self.job = {'keywords': ['python'], 'type': 'repositories'}
+    
+    def test_record_and_resume(self):
+        """Test recorded work is available after reopening the journal"""
+        journal = CheckpointJournal(self.path, self.job)
+        journal.record_page(1, [{'url': 'https://github.com/user/repo'}])
+        journal.record_repository('https://github.com/user/repo', {'owner': 'user', 'language_stats': {}})
+        journal.close()
+        
+        # Verify records written are not kept in memory
+        self.assertEqual((journal.pages, journal.repositories), ({}, {}))
+        
+        resumed = CheckpointJournal(self.path, self.job, resume=True)
+        self.addCleanup(resumed.close)
+        
+        # Verify the recorded work
+        self.assertEqual(resumed.completed_page(1), [{'url': 'https://github.com/user/repo'}])
+        self.assertIsNone(resumed.completed_page(2))
+        self.assertEqual(resumed.completed_repository('https://github.com/user/repo')['owner'], 'user')
+    
+    def test_complete_removes_journal(self):
+        """Test a finished crawl closes and deletes its journal"""
+        journal = CheckpointJournal(self.path, self.job)
+        journal.record_page(1, [])
+        
+        journal.complete()
+        
+        # Verify the journal is gone
+        self.assertTrue(journal._file.closed)
+        self.assertFalse(os.path.exists(self.path))
+    
+    def test_without_resume_starts_over(self):
+        """Test a journal opened without resume discards earlier work"""
+        journal = CheckpointJournal(self.path, self.job)
+        journal.record_page(1, [])
+        journal.close()
+        
+        fresh = CheckpointJournal(self.path, self.job)
+        self.addCleanup(fresh.close)
+        
+        # Verify the journal is empty
+        self.assertIsNone(fresh.completed_page(1))
+    
+    def test_ignores_truncated_record(self):
+        """Test a record cut short by a crash is skipped and later records stay readable"""
+        journal = CheckpointJournal(self.path, self.job)
+        journal.record_page(1, [])
+        journal.close()
+        with open(self.path, 'a') as f:
+            f.write('{"type": "repository", "url": "https://github.com/us')
+        
+        resumed = CheckpointJournal(self.path, self.job, resume=True)
+        resumed.record_page(2, [])
+        resumed.close()
+        again = CheckpointJournal(self.path, self.job, resume=True)
+        self.addCleanup(again.close)
+        
+        # Verify the surviving records
+        self.assertEqual(again.completed_page(1), [])
+        self.assertEqual(again.completed_page(2), [])
+        self.assertEqual(again.repositories, {})
+    
+    def test_rejects_other_job(self):
+        """Test resuming a journal written for another job fails"""
+        CheckpointJournal(self.path, self.job).close()
+        
+        with self.assertRaises(GitHubCrawlerException):
+            CheckpointJournal(self.path, {'keywords': ['rust'], 'type': 'repositories'}, resume=True)
+    
+    def test_concurrent_writers(self):
+        """Test records from concurrent threads are never interleaved"""
+        journal = CheckpointJournal(self.path, self.job)
+        
+        def write(worker):
+            for i in range(200):
+                journal.record_repository(f'https://github.com/user{worker}/repo{i}', {'owner': f'user{worker}', 'language_stats': {'Python': 100.0}})
+        
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        journal.close()
+        
+        # Verify every line is a complete record
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 1 + 8 * 200)
+    
+    def test_crawler_resumes_missing_work(self):
+        """Test a resumed crawl only fetches the work that did not finish"""
+        pages = {1: ['/user1/repo1', '/user2/repo2'], 2: ['/user3/repo3']}
+        languages = {'/user1/repo1': {'Python': 100.0}, '/user2/repo2': {'Go': 100.0}}
+        with StubGitHubServer(pages, languages) as server:
+            def crawl(resume):
+                journal = CheckpointJournal(self.path, self.job, resume=resume)
+                self.addCleanup(journal.close)
+                return GitHubCrawler(
+                    proxies=[],
+                    keywords=['python'],
+                    search_type=SearchType.REPOSITORIES.value,
+                    include_extra_info=True,
+                    max_pages=3,
+                    scheduler=RequestScheduler(rate=1000, max_retries=0),
+                    checkpoint=journal,
+                    base_url=server.base_url
+                ).execute_search()
+            
+            first = crawl(resume=False)
+            server.languages['/user3/repo3'] = {'Rust': 100.0}
+            server.requests.clear()
+            second = crawl(resume=True)
+        
+        # Verify only the failed repository was fetched again
+        self.assertNotIn('extra', first[2])
+        self.assertEqual(server.requests, ['/user3/repo3'])
+        self.assertEqual([result['extra']['owner'] for result in second], ['user1', 'user2', 'user3'])
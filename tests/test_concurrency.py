@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import unittest
+from src.async_github_client import AsyncGitHubClient
+from src.concurrency import TENANT, AdaptiveLimiter
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_increase_when_saturated(self):
+        """Test the limit grows by about one slot per round of saturated requests, up to the maximum"""
+        limiter = AdaptiveLimiter(initial=2, max_limit=4)
+
+        # Verify the limit only grows while every slot is taken
+        started = limiter.acquire()
+        limiter.release(started, 0.01)
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(20):
+            slots = [limiter.acquire() for _ in range(limiter.limit)]
+            for slot in slots:
+                limiter.release(slot, 0.01)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_decrease_on_overload(self):
+        """Test overloaded responses halve the limit once per burst, down to the minimum"""
+        limiter = AdaptiveLimiter(initial=16, min_limit=3)
+        slots = [limiter.acquire() for _ in range(4)]
+
+        # Verify a burst of errors sent before the decrease only counts once
+        for slot in slots:
+            limiter.release(slot, 0.01, overloaded=True)
+        self.assertEqual(limiter.limit, 8)
+        for _ in range(3):
+            limiter.release(limiter.acquire(), 0.01, overloaded=True)
+        self.assertEqual(limiter.limit, 3)
+
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(min_limit=4, max_limit=2)
+
+    def test_decrease_on_latency(self):
+        """Test a latency well over the baseline lowers the limit and blocks callers over it"""
+        limiter = AdaptiveLimiter(initial=10)
+        for _ in range(5):
+            limiter.release(limiter.acquire(), 0.02)
+
+        # Verify the congestion signal
+        for _ in range(5):
+            limiter.release(limiter.acquire(), 0.5)
+        self.assertLess(limiter.limit, 10)
+        self.assertGreater(limiter.stats()['latency'], 0.1)
+
+        # Verify a caller waits for a released slot
+        slots = [limiter.acquire() for _ in range(limiter.limit)]
+        self.assertIsNone(limiter.try_acquire())
+        waiter = threading.Thread(target=lambda: slots.append(limiter.acquire()))
+        waiter.start()
+        limiter.release(slots.pop(0), 0.02)
+        waiter.join(timeout=1)
+        self.assertFalse(waiter.is_alive())
+
+    def test_crawl_backs_off_when_rate_limited(self):
+        """Test crawls through a limiter back off on 429s and still return every result"""
+        pages = {1: [f'/user{i}/repo{i}' for i in range(20)]}
+        languages = {path: {'Python': 100.0} for path in pages[1]}
+        with StubGitHubServer(pages, languages, rate_limit_rate=0.3, retry_after=0, latency=0.01) as server:
+            limiter = AdaptiveLimiter(initial=8, max_limit=8)
+            with self.assertLogs('src.concurrency', level='INFO') as logs:
+                results = GitHubCrawler(
+                    proxies=[],
+                    keywords=['python'],
+                    search_type=SearchType.REPOSITORIES.value,
+                    include_extra_info=True,
+                    scheduler=RequestScheduler(rate=1000, max_retries=20, backoff_base=0.01),
+                    limiter=limiter,
+                    base_url=server.base_url
+                ).execute_search()
+
+            async_limiter = AdaptiveLimiter(initial=8, max_limit=8)
+
+            async def fetch_all():
+                async with AsyncGitHubClient(
+                    [],
+                    base_url=server.base_url,
+                    scheduler=RequestScheduler(rate=1000, max_retries=20, backoff_base=0.01),
+                    limiter=async_limiter
+                ) as client:
+                    return await asyncio.gather(*(client.get_repository(f'{server.base_url}{path}') for path in pages[1]))
+
+            responses = asyncio.run(fetch_all())
+
+        # Verify the results and the back-off
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(result['extra']['language_stats'] == {'Python': 100.0} for result in results))
+        self.assertTrue(any('Concurrency limit lowered' in line for line in logs.output))
+        self.assertEqual([response.status_code for response in responses], [200] * 20)
+        self.assertEqual((limiter.in_flight, async_limiter.in_flight), (0, 0))
+        self.assertGreater(server.status_counts[429], 0)
+
+    def test_tenants_take_turns(self):
+        """Test a freed slot goes to the waiting job with the fewest requests in flight"""
+        limiter = AdaptiveLimiter(initial=2, max_limit=2)
+        granted = []
+
+        def acquire(tenant):
+            TENANT.set(tenant)
+            limiter.acquire()
+            granted.append(tenant)
+
+        TENANT.set('a')
+        slots = [limiter.acquire(), limiter.acquire()]
+        waiters = []
+        for tenant in ('a', 'b'):
+            waiters.append(threading.Thread(target=acquire, args=(tenant,)))
+            waiters[-1].start()
+            while limiter._waiting[tenant] == 0:
+                time.sleep(0.001)
+
+        # Verify job b gets the slot job a frees although a waited first
+        limiter.release(slots.pop(), 0.01)
+        waiters[1].join(timeout=1)
+        self.assertEqual(granted, ['b'])
+        limiter.release(slots.pop(), 0.01)
+        waiters[0].join(timeout=1)
+        self.assertEqual(granted, ['b', 'a'])
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import threading
+import unittest
+from src.distributed import Coordinator, CrawlWorker
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from src.work_queue import WorkQueue
+from tests.stub_server import StubGitHubApiServer, StubGitHubServer
+
+class TestDistributed(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'queue.sqlite')
+        self.input_data = {'keywords': ['python'], 'proxies': [], 'type': 'repositories'}
+    
+    def run_workers(self, server, count, max_retries=5, request_timeout=10.0, **kwargs):
+        def create_crawler(spec):
+            return GitHubCrawler(
+                proxies=spec['proxies'],
+                keywords=spec['keywords'],
+                search_type=spec['type'],
+                include_extra_info=spec['include_extra_info'],
+                scheduler=RequestScheduler(rate=1000, max_retries=max_retries),
+                backend=spec['backend'],
+                request_timeout=request_timeout,
+                base_url=server.base_url
+            )
+        workers = []
+        for number in range(count):
+            queue = WorkQueue(self.path)
+            self.addCleanup(queue.close)
+            workers.append(CrawlWorker(queue, create_crawler, worker_id=f'worker{number}', poll_interval=0.01, exit_when_idle=True, **kwargs))
+        threads = [threading.Thread(target=worker.run) for worker in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return workers
+    
+    def test_distributed_crawl(self):
+        """Test two workers produce the results of a single-process crawl"""
+        pages = {1: ['/user1/repo1', '/user2/repo2'], 2: ['/user2/repo2', '/user3/repo3'], 3: ['/user4/repo4']}
+        languages = {path: {'Python': 100.0} for page in pages.values() for path in page}
+        queue = WorkQueue(self.path)
+        self.addCleanup(queue.close)
+        coordinator = Coordinator(queue, poll_interval=0.01)
+        with StubGitHubServer(pages, languages) as server:
+            job = coordinator.submit(self.input_data, max_pages=5, include_extra_info=True)
+            self.assertEqual(coordinator.submit(self.input_data, max_pages=5, include_extra_info=True), job)
+            self.run_workers(server, 2, batch_size=2)
+            requests = list(server.requests)
+            expected = GitHubCrawler(
+                proxies=[],
+                keywords=['python'],
+                search_type='repositories',
+                include_extra_info=True,
+                max_pages=5,
+                scheduler=RequestScheduler(rate=1000),
+                base_url=server.base_url
+            ).execute_search()
+        
+        # Verify the results
+        self.assertEqual(coordinator.wait(job), {'pending': 0, 'leased': 0, 'done': 9, 'failed': 0})
+        self.assertEqual(coordinator.collect(job), expected)
+        self.assertEqual(len(coordinator.collect(job, max_results=3)), 3)
+        self.assertEqual(len([path for path in requests if path == '/user2/repo2']), 1)
+    
+    def test_failed_items_are_retried(self):
+        """Test an item failing on one attempt is completed on a later one"""
+        queue = WorkQueue(self.path)
+        self.addCleanup(queue.close)
+        coordinator = Coordinator(queue, poll_interval=0.01)
+        with StubGitHubServer({1: ['/user1/repo1']}, {}, error_rate=0.5, seed=1) as server:
+            job = coordinator.submit(self.input_data, max_pages=4)
+            self.run_workers(server, 1, max_retries=0)
+        
+        # Verify the results
+        self.assertGreater(server.status_counts[500], 0)
+        self.assertEqual(coordinator.wait(job)['done'], 4)
+        self.assertEqual(coordinator.collect(job), [{'url': f'{server.base_url}/user1/repo1'}])
+    
+    def test_resubmitted_job(self):
+        """Test resubmitting an unfinished job retries its failed items and a finished one is crawled anew"""
+        queue = WorkQueue(self.path, max_attempts=1)
+        self.addCleanup(queue.close)
+        coordinator = Coordinator(queue, poll_interval=0.01)
+        pages = {1: ['/a/one']}
+        with StubGitHubServer(pages, {}) as server:
+            job = coordinator.submit(self.input_data, max_pages=2)
+            item = queue.lease('crashed', 1)[0]
+            queue.fail(item, 'crashed', 'Connection reset')
+            self.assertEqual(queue.stats(job)['failed'], 1)
+            
+            # Verify the failed page is queued again along with the one still pending
+            self.assertEqual(coordinator.submit(self.input_data, max_pages=2), job)
+            self.assertEqual(queue.stats(job), {'pending': 2, 'leased': 0, 'done': 0, 'failed': 0})
+            self.run_workers(server, 1)
+            first = coordinator.collect(job)
+            
+            # Verify a finished job picks up upstream changes when submitted again
+            pages[1] = ['/b/two']
+            coordinator.submit(self.input_data, max_pages=2)
+            self.run_workers(server, 1)
+            second = coordinator.collect(job)
+        
+        self.assertEqual(first, [{'url': f'{server.base_url}/a/one'}])
+        self.assertEqual(second, [{'url': f'{server.base_url}/b/two'}])
+    
+    def test_failed_extra_info_is_retried(self):
+        """Test an extra info item whose page fails to load is leased again instead of completed without extra info"""
+        queue = WorkQueue(self.path)
+        self.addCleanup(queue.close)
+        coordinator = Coordinator(queue, poll_interval=0.01)
+        languages = {'/user1/repo1': {'Python': 100.0}}
+        with StubGitHubServer({1: ['/user1/repo1']}, languages, stalls={'/user1/repo1': 1}, stall=0.5) as server:
+            job = coordinator.submit(self.input_data, include_extra_info=True)
+            self.run_workers(server, 1, max_retries=0, request_timeout=0.1)
+            requests = list(server.requests)
+        
+        # Verify the timed out fetch was retried on a second lease
+        self.assertEqual(requests.count('/user1/repo1'), 2)
+        self.assertEqual(coordinator.wait(job), {'pending': 0, 'leased': 0, 'done': 2, 'failed': 0})
+        self.assertEqual(coordinator.collect(job)[0]['extra']['language_stats'], {'Python': 100.0})
+    
+    def test_api_batches(self):
+        """Test extra info items of an API job are enriched with one query per lease"""
+        queue = WorkQueue(self.path)
+        self.addCleanup(queue.close)
+        coordinator = Coordinator(queue, poll_interval=0.01)
+        repositories = {f'user{i}/repo{i}': {'Go': 1} for i in range(30)}
+        with StubGitHubApiServer(repositories) as server:
+            job = coordinator.submit(self.input_data, include_extra_info=True, backend='api')
+            self.run_workers(server, 1, batch_size=20)
+        
+        # Verify the requests and results
+        self.assertEqual(sorted(server.graphql_batches), [10, 20])
+        results = coordinator.collect(job)
+        self.assertEqual(len(results), 30)
+        self.assertTrue(all(result['extra']['language_stats'] == {'Go': 100.0} for result in results))
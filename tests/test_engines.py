@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from src.github_crawler import GitHubCrawler
+from src.enums import SearchType
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestCrawlEngines(unittest.TestCase):
+    def setUp(self):
+        self.pages = {
+            1: ['/user1/repo1', '/user2/repo2'],
+            2: ['/user2/repo2', '/user3/repo3'],
+            3: ['/user4/repo4'],
+        }
+        self.languages = {
+            '/user1/repo1': {'Python': 80.0, 'HTML': 20.0},
+            '/user2/repo2': {'JavaScript': 100.0},
+            '/user3/repo3': {'Go': 60.5, 'Shell': 39.5},
+            '/user4/repo4': {'Rust': 100.0},
+        }
+        self.server = StubGitHubServer(self.pages, self.languages)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+    
+    def _crawler(self, **kwargs):
+        return GitHubCrawler(
+            proxies=[],
+            keywords=['python'],
+            search_type=SearchType.REPOSITORIES.value,
+            include_extra_info=True,
+            max_pages=5,
+            base_url=self.server.base_url,
+            scheduler=RequestScheduler(rate=1000, burst=1000),
+            **kwargs
+        )
+    
+    def test_thread_engine(self):
+        """Test the thread engine against the stub server"""
+        results = self._crawler().execute_search()
+        
+        # Verify the results
+        self.assertEqual(
+            [result['url'] for result in results],
+            [f'{self.server.base_url}/user{i}/repo{i}' for i in range(1, 5)]
+        )
+        self.assertEqual(results[2]['extra'], {'owner': 'user3', 'language_stats': {'Go': 60.5, 'Shell': 39.5}})
+    
+    def test_async_engine_matches_thread_engine(self):
+        """Test both engines and the streaming API return identical results"""
+        thread_results = self._crawler().execute_search()
+        async_results = asyncio.run(self._crawler(concurrency=50).execute_search_async())
+        streamed_results = list(self._crawler().iter_search())
+        
+        # Verify the results
+        self.assertEqual(async_results, thread_results)
+        self.assertEqual(streamed_results, thread_results)
+    
+    def test_async_engine_many_repositories(self):
+        """Test the async engine enriches many repositories concurrently"""
+        self.server.pages[1] = [f'/user{i}/repo{i}' for i in range(300)]
+        self.server.languages.update({f'/user{i}/repo{i}': {'Python': 100.0} for i in range(300)})
+        
+        results = asyncio.run(self._crawler(concurrency=200, max_results=300).execute_search_async())
+        
+        # Verify the results
+        self.assertEqual(len(results), 300)
+        self.assertTrue(all(result['extra']['language_stats'] == {'Python': 100.0} for result in results))
@@ -4,18 +4,61 @@ import requests
 from src.github_client import GitHubClient
 from src.enums import SearchType
 from src.exceptions import GitHubCrawlerException
+from src.rate_limiter import RequestScheduler
 
 class TestGitHubClient(unittest.TestCase):
     def setUp(self):
         self.proxies = ['127.0.0.1:8080', '127.0.0.1:8020']
-        self.client = GitHubClient(self.proxies)
+        self.client = GitHubClient(self.proxies, scheduler=RequestScheduler(backoff_base=0, max_retries=2))
     
     def test_init(self):
         """Test initialization of GitHubClient"""
-        proxy = self.client.proxy['http'].split('//')[1]
-        self.assertIn(proxy, self.proxies)
-        self.assertIsNotNone(self.client.session)
-        self.assertIsInstance(self.client.session, requests.Session)
+        addresses = [proxy.address for proxy in self.client.proxy_pool.proxies]
+        self.assertEqual(addresses, self.proxies)
+        for proxy in self.client.proxy_pool.proxies:
+            self.assertIsInstance(proxy.session, requests.Session)
+    
+    def test_make_request_rotates_proxies(self):
+        """Test make_request spreads requests across proxies"""
+        used = []
+        for proxy in self.client.proxy_pool.proxies:
+            proxy._session = MagicMock()
+            proxy._session.get.side_effect = lambda *args, **kwargs: used.append(kwargs['proxies']['http']) or MagicMock(status_code=200, headers={})
+        
+        # Make requests
+        for _ in range(10):
+            self.client.make_request('https://github.com/user/repo')
+        
+        # Verify both proxies were used
+        self.assertEqual(set(used), {f'http://{proxy}' for proxy in self.proxies})
+    
+    def test_make_request_error(self):
+        """Test make_request wraps request errors"""
+        for proxy in self.client.proxy_pool.proxies:
+            proxy._session = MagicMock()
+            proxy._session.get.side_effect = requests.ConnectionError('Connection refused')
+        
+        # Verify the exception
+        with self.assertRaises(GitHubCrawlerException):
+            self.client.make_request('https://github.com/user/repo')
+        self.assertEqual(sum(proxy.failures for proxy in self.client.proxy_pool.proxies), 3)
+    
+    def test_make_request_retries_rate_limited_response(self):
+        """Test make_request retries a 429 response until it succeeds"""
+        responses = [
+            MagicMock(status_code=429, headers={'Retry-After': '0'}),
+            MagicMock(status_code=200, headers={}),
+        ]
+        for proxy in self.client.proxy_pool.proxies:
+            proxy._session = MagicMock()
+            proxy._session.get.side_effect = lambda *args, **kwargs: responses.pop(0)
+        
+        # Make the request
+        response = self.client.make_request('https://github.com/user/repo')
+        
+        # Verify the result
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.scheduler.retries, 1)
     
     @patch('src.github_client.GitHubClient.make_request')
     def test_search(self, mock_make_request):
@@ -49,4 +92,4 @@ class TestGitHubClient(unittest.TestCase):
         
         # Verify
         self.assertEqual(response, mock_response)
-        mock_make_request.assert_called_once_with(repo_url) 
\ No newline at end of file
+        mock_make_request.assert_called_once_with(repo_url, scanner=None) 
\ No newline at end of file
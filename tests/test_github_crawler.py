@@ -66,7 +66,7 @@ class TestGitHubCrawler(unittest.TestCase):
         
         # Verify the results
         self.assertEqual(results, expected_results)
-        self.crawler.client.search.assert_called_once_with(self.keywords, SearchType(self.search_type))
+        self.crawler.client.search.assert_called_once_with(self.keywords, SearchType(self.search_type), 1)
         self.crawler.parser.parse_search_results.assert_called_once_with(mock_response.text, SearchType(self.search_type))
     
     def test_search_with_extra_info(self):
@@ -77,43 +77,120 @@ class TestGitHubCrawler(unittest.TestCase):
         # Mock the dependencies
         mock_response = MagicMock()
         self.crawler.client.search.return_value = mock_response
+        self.crawler.client.get_repository.return_value = MagicMock(text='<html>Mock HTML</html>')
         
         initial_results = [{'url': 'https://github.com/user/repo'}]
         self.crawler.parser.parse_search_results.return_value = initial_results
+        self.crawler.parser.parse_extra_info.return_value = {'owner': 'user'}
         
-        expected_results = [{'url': 'https://github.com/user/repo', 'extra': {'owner': 'user'}}]
-        self.crawler._include_extra_info = MagicMock(return_value=expected_results)
+        # Execute the search
+        results = self.crawler._search(self.keywords)
+        
+        # Verify the results
+        self.assertEqual(results, [{'url': 'https://github.com/user/repo', 'extra': {'owner': 'user'}}])
+        self.crawler.parser.parse_extra_info.assert_called_once_with(
+            '<html>Mock HTML</html>', 'https://github.com/user/repo', SearchType.REPOSITORIES
+        )
+    
+    def test_search_multiple_pages(self):
+        """Test the _search method walks pages in order and removes duplicates"""
+        self.crawler.max_pages = 3
+        pages = {
+            1: [{'url': 'https://github.com/user/repo1'}, {'url': 'https://github.com/user/repo2'}],
+            2: [{'url': 'https://github.com/user/repo2'}, {'url': 'https://github.com/user/repo3'}],
+            3: [{'url': 'https://github.com/user/repo4'}],
+        }
+        self.crawler.client.search.side_effect = lambda keywords, search_type, page: MagicMock(text=pages[page])
+        self.crawler.parser.parse_search_results.side_effect = lambda html, search_type: html
         
         # Execute the search
         results = self.crawler._search(self.keywords)
         
         # Verify the results
-        self.assertEqual(results, expected_results)
-        self.crawler._include_extra_info.assert_called_once_with(initial_results)
+        self.assertEqual(
+            [result['url'] for result in results],
+            [
+                'https://github.com/user/repo1',
+                'https://github.com/user/repo2',
+                'https://github.com/user/repo3',
+                'https://github.com/user/repo4',
+            ]
+        )
+        self.assertEqual(self.crawler.client.search.call_count, 3)
     
-    @patch('concurrent.futures.ThreadPoolExecutor')
-    def test_include_extra_info(self, mock_executor):
-        """Test the _include_extra_info method"""
-        # Set up the mock executor
-        mock_executor_instance = MagicMock()
-        mock_executor.return_value.__enter__.return_value = mock_executor_instance
-        
-        # Set up the mock futures
-        mock_future = MagicMock()
-        mock_future.result.return_value = {'owner': 'user', 'language_stats': {'Python': 100.0}}
-        mock_executor_instance.submit.return_value = mock_future
-        
-        # Set up the concurrent.futures.as_completed mock
-        with patch('concurrent.futures.as_completed', return_value=[mock_future]):
-            # Execute the method
-            results = [{'url': 'https://github.com/user/repo'}]
-            updated_results = self.crawler._include_extra_info(results)
-            
-            # Verify the results
-            self.assertEqual(updated_results[0]['extra'], {'owner': 'user', 'language_stats': {'Python': 100.0}})
+    def test_search_stops_at_empty_page_and_max_results(self):
+        """Test the _search method stops at the last page and truncates to max_results"""
+        self.crawler.max_pages = 5
+        self.crawler.max_results = 3
+        pages = {
+            1: [{'url': 'https://github.com/user/repo1'}, {'url': 'https://github.com/user/repo2'}],
+            2: [{'url': 'https://github.com/user/repo3'}, {'url': 'https://github.com/user/repo4'}],
+        }
+        self.crawler.client.search.side_effect = lambda keywords, search_type, page: MagicMock(text=pages.get(page, []))
+        self.crawler.parser.parse_search_results.side_effect = lambda html, search_type: html
+        
+        # Execute the search
+        results = self.crawler._search(self.keywords)
+        
+        # Verify the results
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[-1]['url'], 'https://github.com/user/repo3')
+    
+    def test_iter_search_streams_enriched_results(self):
+        """Test iter_search yields enriched results in search order"""
+        self.crawler.include_extra_info = True
+        self.crawler.max_pages = 2
+        pages = {
+            1: [{'url': 'https://github.com/user1/repo'}, {'url': 'https://github.com/user2/repo'}],
+            2: [{'url': 'https://github.com/user2/repo'}, {'url': 'https://github.com/user3/repo'}],
+        }
+        self.crawler.client.search.side_effect = lambda keywords, search_type, page: MagicMock(text=pages[page])
+        self.crawler.parser.parse_search_results.side_effect = lambda html, search_type: html
+        self.crawler.client.get_repository.side_effect = lambda url, scanner: MagicMock(text=url)
+        self.crawler.parser.parse_extra_info.side_effect = lambda html, url, search_type: {'owner': url.split('/')[-2]}
+        
+        # Iterate the results
+        results = self.crawler.iter_search()
+        first = next(results)
+        
+        # Verify the results
+        self.assertEqual(first, {'url': 'https://github.com/user1/repo', 'extra': {'owner': 'user1'}})
+        self.assertEqual([result['extra']['owner'] for result in results], ['user2', 'user3'])
+    
+    def test_search_issues_with_extra_info(self):
+        """Test issues are enriched too"""
+        self.crawler.search_type = SearchType.ISSUES
+        self.crawler.include_extra_info = True
+        self.crawler.client.search.return_value = MagicMock()
+        self.crawler.parser.parse_search_results.return_value = [{'url': 'https://github.com/user/repo/issues/1'}]
+        self.crawler.parser.parse_extra_info.return_value = {'owner': 'user', 'repository': 'repo', 'number': 1, 'title': 'Bug'}
+        
+        # Execute the search
+        results = self.crawler._search(self.keywords)
+        
+        # Verify the results
+        self.assertEqual(results[0]['extra']['title'], 'Bug')
+        self.assertEqual(self.crawler.parser.parse_extra_info.call_args[0][2], SearchType.ISSUES)
+    
+    def test_extra_info_error_keeps_result(self):
+        """Test a failed extra info request is logged and the result kept without extra info"""
+        self.crawler.include_extra_info = True
+        self.crawler.client.search.return_value = MagicMock()
+        self.crawler.parser.parse_search_results.return_value = [
+            {'url': 'https://github.com/user1/repo'}, {'url': 'https://github.com/user2/repo'}
+        ]
+        self.crawler.client.get_repository.side_effect = [GitHubCrawlerException('Request failed'), MagicMock(text='')]
+        self.crawler.parser.parse_extra_info.return_value = {'owner': 'user2', 'language_stats': {}}
+        
+        # Execute the search
+        results = self.crawler._search(self.keywords)
+        
+        # Verify the results
+        self.assertEqual(len(results), 2)
+        self.assertEqual(sum('extra' in result for result in results), 1)
     
-    def test_get_repository_extra_info(self):
-        """Test the _get_repository_extra_info method"""
+    def test_fetch_and_parse_extra_info(self):
+        """Test the _fetch_extra_info and _parse_extra_info stages"""
         # Mock the dependencies
         repo_url = 'https://github.com/user/repo'
         mock_response = MagicMock()
@@ -121,12 +198,15 @@ class TestGitHubCrawler(unittest.TestCase):
         self.crawler.client.get_repository.return_value = mock_response
         
         expected_info = {'owner': 'user', 'language_stats': {'Python': 100.0}}
-        self.crawler.parser.parse_repository_info.return_value = expected_info
+        self.crawler.parser.parse_extra_info.return_value = expected_info
         
-        # Execute the method
-        info = self.crawler._get_repository_extra_info(repo_url)
+        # Execute the stages
+        result = {'url': repo_url}
+        fetched = self.crawler._fetch_extra_info(0, result)
+        position, parsed = self.crawler._parse_extra_info(*fetched)
         
         # Verify the results
-        self.assertEqual(info, expected_info)
-        self.crawler.client.get_repository.assert_called_once_with(repo_url)
-        self.crawler.parser.parse_repository_info.assert_called_once_with(mock_response.text, repo_url) 
\ No newline at end of file
+        self.assertEqual(fetched, (0, result, mock_response.text, None))
+        self.assertEqual((position, parsed), (0, {'url': repo_url, 'extra': expected_info}))
+        self.crawler.client.get_repository.assert_called_once_with(repo_url, scanner=None)
+        self.crawler.parser.parse_extra_info.assert_called_once_with(mock_response.text, repo_url, SearchType.REPOSITORIES)
@@ -0,0 +1,45 @@
+import unittest
+import requests
+from benchmarks.crawl_benchmark import percentile, run_crawl
+from benchmarks.github_stub import FixtureGitHubStandIn
+
+class TestGitHubStandIn(unittest.TestCase):
+    def test_serves_unique_repositories_per_page(self):
+        """Test search pages link to distinct repositories served from the fixtures"""
+        with FixtureGitHubStandIn(pages=2) as stand_in:
+            first = requests.get(f'{stand_in.base_url}/search', params={'q': 'drf', 'p': '1'}).text
+            third = requests.get(f'{stand_in.base_url}/search', params={'q': 'drf', 'p': '3'}).text
+            repository = requests.get(f'{stand_in.base_url}/encode/django-rest-framework--p1')
+            missing = requests.get(f'{stand_in.base_url}/user/missing')
+        
+        # Verify the pages
+        self.assertIn(f'href="{stand_in.base_url}/encode/django-rest-framework--p1"', first)
+        self.assertNotIn('search-title', third)
+        self.assertIn('Layout-sidebar', repository.text)
+        self.assertEqual(missing.status_code, 404)
+    
+    def test_fault_injection(self):
+        """Test injected errors and rate limits"""
+        with FixtureGitHubStandIn(error_rate=0.5, rate_limit_rate=0.5, retry_after=7) as stand_in:
+            statuses = [requests.get(f'{stand_in.base_url}/search').status_code for _ in range(20)]
+            limited = next(
+                response for response in (requests.get(f'{stand_in.base_url}/search') for _ in range(20))
+                if response.status_code == 429
+            )
+        
+        # Verify only failures were served
+        self.assertEqual(set(statuses), {429, 500})
+        self.assertEqual(limited.headers['Retry-After'], '7')
+    
+    def test_benchmark_run(self):
+        """Test an end-to-end benchmark run recovers from injected failures"""
+        with FixtureGitHubStandIn(pages=2, error_rate=0.1, rate_limit_rate=0.1, retry_after=0, seed=3) as stand_in:
+            report = run_crawl(stand_in.base_url, 'threads', 2, enrich_workers=4)
+        
+        # Verify the report
+        self.assertEqual(report['results'], 12)
+        self.assertEqual(report['enriched'], 12)
+        self.assertGreater(report['requests'], 15)
+        self.assertGreater(report['pages_per_sec'], 0)
+        self.assertGreaterEqual(report['p99_ms'], report['p50_ms'])
+        self.assertEqual(percentile([3.0, 1.0, 2.0], 0.5), 2.0)
@@ -0,0 +1,127 @@
+import asyncio
+import time
+import unittest
+from src.async_github_client import AsyncGitHubClient
+from src.enums import SearchType
+from src.github_client import GitHubClient
+from src.github_crawler import GitHubCrawler
+from src.hedging import HedgePolicy
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+PAGES = {1: [f'/user{i}/repo{i}' for i in range(6)]}
+LANGUAGES = {path: {'Python': 100.0} for path in PAGES[1]}
+
+
+def warmed_up_policy(latency: float = 0.01) -> HedgePolicy:
+    policy = HedgePolicy(min_samples=10)
+    for _ in range(10):
+        policy.observe(latency)
+    return policy
+
+
+class TestHedging(unittest.TestCase):
+    def test_policy(self):
+        """Test the hedge delay follows the latency percentile and hedges stay within the budget"""
+        policy = HedgePolicy(percentile=90, min_samples=10, budget=0.1)
+        
+        # Verify nothing is hedged until enough latencies are known
+        self.assertIsNone(policy.delay())
+        for latency in range(1, 21):
+            policy.observe(latency / 100)
+        self.assertEqual(policy.delay(), 0.19)
+        
+        # Verify the budget
+        self.assertEqual([policy.try_hedge() for _ in range(3)], [True, True, False])
+        policy.record(won=True)
+        self.assertEqual(policy.stats(), {'delay': 0.19, 'requests': 20, 'hedges': 2, 'wins': 1})
+        
+        with self.assertRaises(ValueError):
+            HedgePolicy(percentile=100)
+    
+    def test_slow_request_is_hedged(self):
+        """Test a request stalling past the hedge delay is answered by its duplicate on both clients"""
+        stalled, async_stalled = PAGES[1][:2]
+        with StubGitHubServer(PAGES, LANGUAGES, stalls={stalled: 1, async_stalled: 1}, stall=1.5) as server:
+            sync_policy = warmed_up_policy()
+            client = GitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000), hedge=sync_policy)
+            started = time.monotonic()
+            response = client.get_repository(f'{server.base_url}{stalled}')
+            sync_elapsed = time.monotonic() - started
+            client.close()
+            
+            async_policy = warmed_up_policy()
+            
+            async def fetch():
+                async with AsyncGitHubClient(
+                    [],
+                    base_url=server.base_url,
+                    scheduler=RequestScheduler(rate=1000),
+                    hedge=async_policy
+                ) as async_client:
+                    return await async_client.get_repository(f'{server.base_url}{async_stalled}')
+            
+            started = time.monotonic()
+            async_response = asyncio.run(fetch())
+            async_elapsed = time.monotonic() - started
+        
+        # Verify the duplicates answered long before the stalled requests
+        self.assertEqual((response.status_code, async_response.status_code), (200, 200))
+        self.assertLess(max(sync_elapsed, async_elapsed), 1.0)
+        self.assertEqual((sync_policy.wins, async_policy.wins), (1, 1))
+        self.assertEqual((server.requests.count(stalled), server.requests.count(async_stalled)), (2, 2))
+    
+    def test_no_hedge_without_free_proxy(self):
+        """Test a slow request is not hedged while no other proxy is free on both clients"""
+        stalled = PAGES[1][0]
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine):
+                with StubGitHubServer(PAGES, LANGUAGES, stalls={stalled: 1}, stall=0.5) as server:
+                    policy = warmed_up_policy()
+                    if engine == 'async':
+                        client = AsyncGitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000), hedge=policy)
+                        client.proxy_pool.proxies[0].max_in_flight = 1
+                        
+                        async def fetch():
+                            async with client:
+                                return await client.get_repository(f'{server.base_url}{stalled}')
+                        
+                        response = asyncio.run(fetch())
+                    else:
+                        client = GitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000), hedge=policy)
+                        client.proxy_pool.proxies[0].max_in_flight = 1
+                        response = client.get_repository(f'{server.base_url}{stalled}')
+                        client.close()
+                
+                # Verify the request was answered by itself and no hedge was spent
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual((policy.hedges, server.requests.count(stalled)), (0, 1))
+                self.assertEqual(client.proxy_pool.proxies[0].in_flight, 0)
+    
+    def test_deadline_returns_partial_results(self):
+        """Test a crawl past its deadline returns the results found so far and is flagged incomplete"""
+        stalled = PAGES[1][2]
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine):
+                with StubGitHubServer(PAGES, LANGUAGES, stalls={stalled: 1}, stall=2.0) as server:
+                    crawler = GitHubCrawler(
+                        proxies=[],
+                        keywords=['python'],
+                        search_type=SearchType.REPOSITORIES.value,
+                        include_extra_info=True,
+                        scheduler=RequestScheduler(rate=1000),
+                        deadline=0.5,
+                        base_url=server.base_url
+                    )
+                    started = time.monotonic()
+                    if engine == 'async':
+                        results = asyncio.run(crawler.execute_search_async())
+                    else:
+                        results = crawler.execute_search()
+                    elapsed = time.monotonic() - started
+                
+                # Verify every result is returned in order, without the extra info that missed the deadline
+                self.assertLess(elapsed, 1.5)
+                self.assertFalse(crawler.complete)
+                self.assertEqual([result['url'] for result in results], [f'{server.base_url}{path}' for path in PAGES[1]])
+                self.assertEqual([result['url'] for result in results if 'extra' not in result], [f'{server.base_url}{stalled}'])
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+from src.github_client import GitHubClient
+from src.http_cache import HttpCache
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cache.sqlite')
+        self.cache = HttpCache(self.path, ttl=60)
+        self.addCleanup(self.cache.close)
+    
+    def _response(self, body, etag='"v1"'):
+        return MagicMock(content=body, url='https://github.com/user/repo', encoding='utf-8', headers={'ETag': etag})
+    
+    def test_store_and_lookup(self):
+        """Test a stored response is served back fresh"""
+        self.cache.store('https://github.com/search', {'type': 'repositories', 'q': 'python'}, self._response(b'<html/>'))
+        
+        entry = self.cache.lookup('https://github.com/search', {'q': 'python', 'type': 'repositories'})
+        
+        # Verify the entry
+        self.assertTrue(entry.is_fresh(self.cache.ttl))
+        self.assertEqual(entry.to_response().text, '<html/>')
+        self.assertEqual(entry.conditional_headers(), {'If-None-Match': '"v1"'})
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertIsNone(self.cache.lookup('https://github.com/other'))
+        self.assertEqual(self.cache.stats()['misses'], 1)
+    
+    def test_persists_across_instances(self):
+        """Test entries survive reopening the cache"""
+        self.cache.store('https://github.com/user/repo', None, self._response(b'repo'))
+        self.cache.close()
+        
+        cache = HttpCache(self.path)
+        self.addCleanup(cache.close)
+        
+        # Verify the entry
+        self.assertEqual(cache.get('https://github.com/user/repo').body, b'repo')
+    
+    def test_refresh_stale_entry(self):
+        """Test a revalidated entry becomes fresh again"""
+        self.cache.store('https://github.com/user/repo', None, self._response(b'repo'))
+        entry = self.cache.get('https://github.com/user/repo')
+        entry.stored_at = time.time() - 120
+        
+        self.cache.refresh(entry)
+        
+        # Verify the entry
+        self.assertTrue(self.cache.get('https://github.com/user/repo').is_fresh(self.cache.ttl))
+        self.assertEqual(self.cache.stats()['revalidated'], 1)
+    
+    def test_lru_eviction(self):
+        """Test the least recently used entries are evicted past max_bytes"""
+        self.cache.max_bytes = 1000
+        body = os.urandom(400)
+        for name in ('a', 'b'):
+            self.cache.store(f'https://github.com/user/{name}', None, self._response(body))
+        self.cache.get('https://github.com/user/a')
+        self.cache.store('https://github.com/user/c', None, self._response(body))
+        
+        # Verify the least recently used entry was evicted
+        self.assertIsNotNone(self.cache.get('https://github.com/user/a'))
+        self.assertIsNone(self.cache.get('https://github.com/user/b'))
+        self.assertIsNotNone(self.cache.get('https://github.com/user/c'))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+    
+    def test_client_revalidates_stale_entries(self):
+        """Test the client serves fresh entries and revalidates stale ones with a 304"""
+        with StubGitHubServer({}, {'/user/repo': {'Python': 100.0}}) as server:
+            client = GitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000), cache=self.cache)
+            url = f'{server.base_url}/user/repo'
+            first = client.get_repository(url)
+            second = client.get_repository(url)
+            self.cache.ttl = 0
+            third = client.get_repository(url)
+        
+        # Verify only the first and the revalidating request reached the server
+        self.assertEqual(first.text, second.text)
+        self.assertEqual(first.text, third.text)
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['revalidated'], 1)
@@ -0,0 +1,79 @@
+import time
+import unittest
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.lru_cache import LruCache
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestLruCache(unittest.TestCase):
+    def test_eviction(self):
+        """Test the least recently used entry is evicted and expired entries are dropped"""
+        cache = LruCache(max_entries=2, ttl=0.05)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        
+        # Verify the eviction
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats(), {'entries': 1, 'hits': 3, 'misses': 2})
+        
+        disabled = LruCache(max_entries=0)
+        disabled.put('a', 1)
+        self.assertIsNone(disabled.get('a'))
+    
+    def test_shared_between_crawlers(self):
+        """Test crawlers sharing a result cache fetch each search and repository page once"""
+        pages = {1: ['/user1/repo1', '/user2/repo2']}
+        languages = {'/user1/repo1': {'Python': 100.0}, '/user2/repo2': {'Go': 100.0}}
+        cache = LruCache()
+        with StubGitHubServer(pages, languages) as server:
+            runs = [
+                GitHubCrawler(
+                    proxies=[],
+                    keywords=['python'],
+                    search_type=SearchType.REPOSITORIES.value,
+                    include_extra_info=True,
+                    scheduler=RequestScheduler(rate=1000),
+                    result_cache=cache,
+                    base_url=server.base_url
+                ).execute_search()
+                for _ in range(2)
+            ]
+        
+        # Verify the requests and results
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(runs[1][1]['extra'], {'owner': 'user2', 'language_stats': {'Go': 100.0}})
+    
+    def test_shared_entries_expire(self):
+        """Test a later job sharing the result cache sees upstream changes once entries expire"""
+        pages = {1: ['/a/one']}
+        languages = {'/a/one': {'Python': 100.0}, '/b/two': {'Go': 100.0}}
+        cache = LruCache(ttl=0.2)
+        with StubGitHubServer(pages, languages) as server:
+            def crawl():
+                return GitHubCrawler(
+                    proxies=[],
+                    keywords=['python'],
+                    search_type=SearchType.REPOSITORIES.value,
+                    include_extra_info=True,
+                    scheduler=RequestScheduler(rate=1000),
+                    result_cache=cache,
+                    base_url=server.base_url
+                ).execute_search()
+            
+            first = crawl()
+            pages[1] = ['/b/two']
+            languages['/a/one'] = {'Rust': 100.0}
+            cached = crawl()
+            time.sleep(0.25)
+            fresh = crawl()
+        
+        # Verify the change is only seen once the entries expired
+        self.assertEqual(cached, first)
+        self.assertEqual([result['url'] for result in fresh], [f'{server.base_url}/b/two'])
+        self.assertEqual(fresh[0]['extra']['language_stats'], {'Go': 100.0})
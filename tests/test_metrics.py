@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+from src import metrics
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(metrics.disable)
+
+    def test_disabled_by_default(self):
+        """Test recording is a no-op until a registry is enabled"""
+        metrics.inc('requests_total', status=200)
+        metrics.observe('request_seconds', 0.1)
+        with metrics.timer('parse_seconds', method='parse_search_results'):
+            pass
+
+        # Verify nothing was recorded
+        self.assertIsNone(metrics.registry())
+
+    def test_prometheus_format(self):
+        """Test counters, gauges and histograms are rendered in the Prometheus text format"""
+        registry = metrics.enable()
+        metrics.inc('requests_total', proxy='direct', status=200)
+        metrics.inc('requests_total', proxy='direct', status=200)
+        metrics.set_gauge('queue_depth', 3)
+        metrics.observe('request_seconds', 0.02, proxy='direct')
+
+        text = registry.to_prometheus()
+
+        # Verify the exposition
+        self.assertIn('# TYPE github_crawler_requests_total counter', text)
+        self.assertIn('github_crawler_requests_total{proxy="direct",status="200"} 2', text)
+        self.assertIn('github_crawler_queue_depth 3', text)
+        self.assertIn('github_crawler_request_seconds_bucket{proxy="direct",le="0.01"} 0', text)
+        self.assertIn('github_crawler_request_seconds_bucket{proxy="direct",le="0.025"} 1', text)
+        self.assertIn('github_crawler_request_seconds_bucket{proxy="direct",le="+Inf"} 1', text)
+        self.assertIn('github_crawler_request_seconds_count{proxy="direct"} 1', text)
+
+    def test_crawl_is_instrumented(self):
+        """Test a crawl records requests, bytes, parse times and sinks write the results"""
+        registry = metrics.enable()
+        pages = {1: ['/user1/repo1', '/user2/repo2']}
+        languages = {'/user1/repo1': {'Python': 100.0}, '/user2/repo2': {'Go': 100.0}}
+        with StubGitHubServer(pages, languages) as server:
+            GitHubCrawler(
+                proxies=[],
+                keywords=['python'],
+                search_type=SearchType.REPOSITORIES.value,
+                include_extra_info=True,
+                scheduler=RequestScheduler(rate=1000),
+                base_url=server.base_url
+            ).execute_search()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        prometheus_path = os.path.join(directory.name, 'metrics.prom')
+        summary_path = os.path.join(directory.name, 'metrics.json')
+        metrics.write_sinks([metrics.PrometheusFileSink(prometheus_path), metrics.JsonSummarySink(summary_path)])
+
+        # Verify the recorded metrics
+        self.assertEqual(registry.counters[('requests_total', (('proxy', 'direct'), ('status', '200')))], 3)
+        self.assertGreater(registry.counters[('response_bytes_total', ())], 0)
+        self.assertEqual(registry.histograms[('parse_seconds', (('method', 'parse_repository_info'),))].count, 2)
+        self.assertIn(('queue_depth', (('stage', 'fetch_extra_info'),)), registry.gauges)
+
+        # Verify the sinks
+        with open(prometheus_path) as f:
+            self.assertIn('github_crawler_parse_seconds_count{method="parse_search_results"} 1', f.read())
+        with open(summary_path) as f:
+            summary = json.load(f)
+        self.assertIn({'name': 'response_bytes_total', 'labels': {}, 'value': registry.counters[('response_bytes_total', ())]}, summary['counters'])
+
+    def test_http_sink(self):
+        """Test the live endpoint serves the registry"""
+        registry = metrics.enable()
+        metrics.inc('retries_total', host='github.com')
+        sink = metrics.PrometheusHttpSink(registry, 0)
+        self.addCleanup(sink.close)
+
+        with urllib.request.urlopen(f'http://127.0.0.1:{sink.server.server_address[1]}/metrics') as response:
+            body = response.read().decode('utf-8')
+
+        # Verify the scrape
+        self.assertIn('github_crawler_retries_total{host="github.com"} 1', body)
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.output import LanguageMatrix, load_language_matrix, matrix_labels_file, write_csv, write_json, write_ndjson, write_results
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.results = [
+            {'url': 'https://github.com/user/repo1'},
+            {'url': 'https://github.com/user/repo2', 'extra': {'owner': 'user', 'language_stats': {'Python': 80.0, 'HTML': 20.0}}},
+        ]
+    
+    def test_write_json_matches_json_dump(self):
+        """Test the streamed JSON array equals json.dump with indent=2"""
+        for results in (self.results, self.results[:1], []):
+            with self.subTest(count=len(results)):
+                f = io.StringIO()
+                count = write_json(iter(results), f)
+                
+                # Verify the output
+                self.assertEqual(f.getvalue(), json.dumps(results, indent=2))
+                self.assertEqual(count, len(results))
+    
+    def test_write_json_closes_array_on_error(self):
+        """Test the JSON array stays valid when the results raise midway"""
+        def results():
+            yield self.results[0]
+            raise RuntimeError('Crawl failed')
+        
+        f = io.StringIO()
+        with self.assertRaises(RuntimeError):
+            write_json(results(), f)
+        
+        # Verify the partial output
+        self.assertEqual(json.loads(f.getvalue()), self.results[:1])
+    
+    def test_write_ndjson_flushes_each_record(self):
+        """Test NDJSON output is written and flushed record by record"""
+        f = io.StringIO()
+        lines_seen = []
+        
+        def results():
+            for result in self.results:
+                yield result
+                lines_seen.append(f.getvalue().count('\n'))
+        
+        count = write_ndjson(results(), f)
+        
+        # Verify the output
+        self.assertEqual(count, 2)
+        self.assertEqual(lines_seen, [1, 2])
+        self.assertEqual([json.loads(line) for line in f.getvalue().splitlines()], self.results)
+    
+    def test_write_results_invalid_format(self):
+        """Test an unknown output format is rejected"""
+        with self.assertRaises(ValueError):
+            write_results(self.results, io.StringIO(), 'xml')
+    
+    def test_write_csv(self):
+        """Test CSV rows flatten the extra info of repositories and issues"""
+        results = self.results + [{'url': 'https://github.com/user/repo/issues/3', 'extra': {'owner': 'user', 'repository': 'repo', 'number': 3, 'title': 'Crash, again'}}]
+        f = io.StringIO()
+        count = write_csv(iter(results), f)
+        
+        # Verify the rows
+        rows = list(csv.DictReader(io.StringIO(f.getvalue())))
+        self.assertEqual(count, 3)
+        self.assertEqual(rows[0]['owner'], '')
+        self.assertEqual(json.loads(rows[1]['language_stats']), {'Python': 80.0, 'HTML': 20.0})
+        self.assertEqual((rows[2]['number'], rows[2]['title'], rows[2]['language_stats']), ('3', 'Crash, again', ''))
+    
+    def test_language_matrix(self):
+        """Test the language matrix is saved as a memory-mappable .npy file with its labels"""
+        results = self.results + [{'url': 'https://github.com/user/repo3', 'extra': {'owner': 'user', 'language_stats': {'Go': 100.0}}}]
+        matrix = LanguageMatrix()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'languages.npy')
+            
+            # Verify results pass through unchanged while the matrix is built
+            self.assertEqual(list(matrix.collect(iter(results))), results)
+            self.assertEqual(matrix.write(path), (3, 3))
+            
+            # Verify the header, cells and labels
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.assertEqual(data[:8], b'\x93NUMPY\x01\x00')
+            self.assertEqual((len(data) - 4 * 9) % 64, 0)
+            languages, repositories, cells = load_language_matrix(path)
+            self.assertEqual(languages, ['Python', 'HTML', 'Go'])
+            self.assertEqual(repositories, [result['url'] for result in results])
+            self.assertEqual(cells.tolist(), [[0.0, 80.0, 0.0], [0.0, 20.0, 0.0], [0.0, 0.0, 100.0]])
+            self.assertTrue(os.path.exists(matrix_labels_file(path)))
+            cells.release()
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import os
+import unittest
+from benchmarks.parser_backends import FIXTURES_DIR, load_corpus
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.parse_pool import ParsePool
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestParsePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ParsePool(2, backend='bs4')
+        cls.search_pages, cls.repository_pages = load_corpus()
+        with open(os.path.join(FIXTURES_DIR, 'expected.json')) as f:
+            cls.expected = json.load(f)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+    
+    def test_fixture_corpus(self):
+        """Test the pool parses text and UTF-8 bytes like ResultParser"""
+        search_results = [
+            self.pool.parse_search_results(html.encode('utf-8'), SearchType.REPOSITORIES) for html in self.search_pages
+        ]
+        futures = {
+            url: self.pool.submit_extra_info(html, url, SearchType.REPOSITORIES) for url, html in self.repository_pages
+        }
+        
+        # Verify the results
+        self.assertEqual(search_results, self.expected['search_results'])
+        self.assertEqual({url: future.result() for url, future in futures.items()}, self.expected['repositories'])
+    
+    def test_crawl_with_pool(self):
+        """Test both engines crawl with parsing in the pool"""
+        pages = {1: ['/user1/repo1', '/user2/repo2']}
+        languages = {'/user1/repo1': {'Python': 100.0}, '/user2/repo2': {'Go': 60.0, 'C': 40.0}}
+        with StubGitHubServer(pages, languages) as server:
+            def crawler():
+                return GitHubCrawler(
+                    proxies=[],
+                    keywords=['python'],
+                    search_type=SearchType.REPOSITORIES.value,
+                    include_extra_info=True,
+                    scheduler=RequestScheduler(rate=1000),
+                    parse_pool=self.pool,
+                    base_url=server.base_url
+                )
+            threaded = crawler().execute_search()
+            async_results = asyncio.run(crawler().execute_search_async())
+        
+        # Verify the results
+        self.assertEqual(threaded, async_results)
+        self.assertEqual([result['extra']['language_stats'] for result in threaded], [languages['/user1/repo1'], languages['/user2/repo2']])
+        self.assertEqual(crawler().parse_workers, 2)
@@ -1,5 +1,7 @@
+import os
 import unittest
 from unittest.mock import MagicMock, patch
+from benchmarks.parser_backends import FIXTURES_DIR
 from src.parser import ResultParser
 from src.enums import SearchType
 
@@ -63,4 +65,28 @@ class TestResultParser(unittest.TestCase):
         
         # Verify the info
         self.assertEqual(info['owner'], 'user')
-        self.assertEqual(info['language_stats'], {}) 
\ No newline at end of file
+        self.assertEqual(info['language_stats'], {})
+        
+    def test_parse_thread_info(self):
+        """Test parsing issue and discussion info from the URL and page title"""
+        issue_html = '<html><head><title>Fix · Issue #12 · user/repo · GitHub</title></head></html>'
+        discussion_html = '<html><head><title>Ideas for v2 · user/repo · Discussion #7 · GitHub</title></head></html>'
+        
+        # Parse the info
+        issue = self.parser.parse_thread_info(issue_html, 'https://github.com/user/repo/issues/12')
+        discussion = self.parser.parse_thread_info(discussion_html, 'https://github.com/user/repo/discussions/7')
+        missing = self.parser.parse_thread_info('<div>Invalid HTML</div>', 'https://github.com/user/repo/issues/3')
+        
+        # Verify the info
+        self.assertEqual(issue, {'owner': 'user', 'repository': 'repo', 'number': 12, 'title': 'Fix'})
+        self.assertEqual(discussion, {'owner': 'user', 'repository': 'repo', 'number': 7, 'title': 'Ideas for v2'})
+        self.assertIsNone(missing['title'])
+    
+    def test_parse_result_count(self):
+        """Test reading the number of matches from the data embedded in a search page"""
+        with open(os.path.join(FIXTURES_DIR, 'search_repositories_1.html'), encoding='utf-8') as f:
+            html = f.read()
+        
+        # Verify the count
+        self.assertEqual(self.parser.parse_result_count(html), 4218)
+        self.assertIsNone(self.parser.parse_result_count('<div>Invalid HTML</div>'))
@@ -0,0 +1,70 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from src.enums import SearchType
+from src.parser import ResultParser
+from src.parser_backends import available_backends, create_backend
+from benchmarks.parser_backends import FIXTURES_DIR, load_corpus
+
+class TestParserBackends(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.search_pages, cls.repository_pages = load_corpus()
+        with open(os.path.join(FIXTURES_DIR, 'expected.json')) as f:
+            cls.expected = json.load(f)
+    
+    def test_fixture_corpus(self):
+        """Test every installed backend gives the expected output on the fixture corpus"""
+        for name in available_backends():
+            with self.subTest(backend=name):
+                parser = ResultParser(backend=name)
+                search_results = [parser.parse_search_results(html, SearchType.REPOSITORIES) for html in self.search_pages]
+                repositories = {url: parser.parse_repository_info(html, url) for url, html in self.repository_pages}
+                
+                # Verify the results
+                self.assertEqual(search_results, self.expected['search_results'])
+                self.assertEqual(repositories, self.expected['repositories'])
+    
+    def test_edge_cases(self):
+        """Test every installed backend handles missing elements the same way"""
+        documents = [
+            '',
+            '<div>Invalid HTML</div>',
+            '<div class="search-title"><span>No link</span></div>',
+            '<div class="search-title"><a>No href</a></div>',
+            '<div class="Layout-sidebar"><ul><li class="d-inline"><span>Python</span></li></ul></div>',
+            '<div class="Layout-sidebar"></div><div class="Layout-sidebar"><li class="d-inline"><span>C</span><span>1%</span></li></div>',
+            '<div class="x Layout-sidebar y"><li class="a d-inline"><b><span>Go</span></b> <span>5.5%</span></li></div>',
+            '<html><head><title> Bug &amp; fix · Issue #1 · user/repo · GitHub </title></head></html>',
+        ]
+        reference = create_backend('bs4')
+        for name in available_backends():
+            backend = create_backend(name)
+            for html in documents:
+                with self.subTest(backend=name, html=html):
+                    # Verify the raw values match the reference backend
+                    self.assertEqual(backend.search_result_links(html), reference.search_result_links(html))
+                    self.assertEqual(backend.language_items(html), reference.language_items(html))
+                    self.assertEqual(backend.page_title(html), reference.page_title(html))
+    
+    def test_auto_picks_fastest_available(self):
+        """Test auto selects the first installed backend in order of speed"""
+        installed = object()
+        cases = [
+            ((installed, installed), 'selectolax'),
+            ((None, installed), 'lxml'),
+            ((None, None), 'bs4-strainer'),
+        ]
+        for (selectolax, lxml), expected in cases:
+            with self.subTest(expected=expected):
+                with patch('src.parser_backends.LexborHTMLParser', selectolax), patch('src.parser_backends.lxml', lxml):
+                    backend = create_backend('auto')
+                
+                # Verify the backend
+                self.assertEqual(backend.name, expected)
+    
+    def test_invalid_backend(self):
+        """Test an unknown backend name is rejected"""
+        with self.assertRaises(ValueError):
+            create_backend('regex')
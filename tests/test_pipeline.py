@@ -0,0 +1,98 @@
+import threading
+import time
+import unittest
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.pipeline import Pipeline, Reorderer, Stage
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubGitHubServer
+
+class TestPipeline(unittest.TestCase):
+    def test_stages(self):
+        """Test items run through every stage, including stages emitting several items"""
+        pipeline = Pipeline([
+            Stage('double', lambda item: [item * 2], workers=3),
+            Stage('split', lambda item: [item, item + 1], workers=2),
+        ], queue_size=2)
+        
+        outputs = list(pipeline.run(range(5)))
+        
+        # Verify the outputs
+        self.assertEqual(sorted(outputs), [0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+    
+    def test_backpressure(self):
+        """Test a slow stage keeps the stages before it from running ahead"""
+        fed = []
+        def source():
+            for item in range(100):
+                fed.append(item)
+                yield item
+        pipeline = Pipeline([
+            Stage('fast', lambda item: [item], workers=2),
+            Stage('slow', lambda item: time.sleep(0.01) or [item]),
+        ], queue_size=2, poll_interval=0.01)
+        
+        outputs = pipeline.run(source())
+        next(outputs)
+        time.sleep(0.1)
+        
+        # Verify the source was throttled
+        self.assertLess(len(fed), 20)
+        self.assertEqual(len(list(outputs)), 99)
+    
+    def test_error_stops_pipeline(self):
+        """Test the first exception of a stage is raised to the consumer"""
+        def fail(item):
+            if item == 3:
+                raise ValueError('bad item')
+            return [item]
+        pipeline = Pipeline([Stage('fail', fail, workers=2)], poll_interval=0.01)
+        
+        # Verify the error
+        with self.assertRaises(ValueError):
+            list(pipeline.run(range(1000)))
+    
+    def test_close_stops_workers(self):
+        """Test closing the consumer early stops every thread"""
+        pipeline = Pipeline([Stage('identity', lambda item: [item], workers=4)], poll_interval=0.01)
+        
+        outputs = pipeline.run(iter(int, 1))
+        next(outputs)
+        outputs.close()
+        
+        # Verify the threads are gone
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith('pipeline-')])
+    
+    def test_reorderer(self):
+        """Test values are released in index order"""
+        reorderer = Reorderer(start=1)
+        
+        # Verify the order
+        self.assertEqual(reorderer.push(2, 'b'), [])
+        self.assertEqual(reorderer.push(3, 'c'), [])
+        self.assertEqual(reorderer.push(1, 'a'), ['a', 'b', 'c'])
+        self.assertEqual(reorderer.pending, {})
+    
+    def test_crawl_issues(self):
+        """Test an issue crawl fetches and parses every issue page"""
+        pages = {1: ['/user1/repo/issues/1'], 2: ['/user2/repo/issues/7']}
+        titles = {
+            '/user1/repo/issues/1': 'Crash on start · Issue #1 · user1/repo · GitHub',
+            '/user2/repo/issues/7': 'Docs · typo · Issue #7 · user2/repo · GitHub',
+        }
+        with StubGitHubServer(pages, {}, titles) as server:
+            results = GitHubCrawler(
+                proxies=[],
+                keywords=['crash'],
+                search_type=SearchType.ISSUES.value,
+                include_extra_info=True,
+                max_pages=3,
+                scheduler=RequestScheduler(rate=1000),
+                base_url=server.base_url
+            ).execute_search()
+        
+        # Verify the results
+        self.assertEqual([result['extra'] for result in results], [
+            {'owner': 'user1', 'repository': 'repo', 'number': 1, 'title': 'Crash on start'},
+            {'owner': 'user2', 'repository': 'repo', 'number': 7, 'title': 'Docs · typo'},
+        ])
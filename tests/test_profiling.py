@@ -0,0 +1,81 @@
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from src import profiling
+from src.pipeline import Pipeline, Stage
+
+def busy(item):
+    """Stage body spending a little CPU time so every profiler sees it"""
+    deadline = time.monotonic() + 0.02
+    while time.monotonic() < deadline:
+        pass
+    return [bytes(1024) * item]
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(profiling.stop)
+
+    def run_pipeline(self):
+        pipeline = Pipeline([Stage('busy', busy, workers=2), Stage('size', lambda item: [len(item)])])
+        return sorted(pipeline.run(range(1, 9)))
+
+    def test_cpu(self):
+        """Test the CPU profile covers the pipeline worker threads"""
+        output = os.path.join(self.directory.name, 'profile.pstats')
+        profiling.start('cpu', output=output, top=5)
+        self.run_pipeline()
+        summary = profiling.stop()
+
+        # Verify the summary and the functions run by worker threads in the saved stats
+        self.assertIn(f'saved to {output}', summary)
+        self.assertIn('cumulative', summary)
+        functions = {function for _, _, function in pstats.Stats(output).stats}
+        self.assertIn('busy', functions)
+        self.assertIsNone(profiling.stop())
+
+    def test_cpu_unsupported(self):
+        """Test the CPU profile fails with a clear error on Python versions it cannot run on"""
+        with patch.object(profiling, 'CPU_PROFILE_SUPPORTED', False):
+            with self.assertRaisesRegex(ValueError, 'Python 3.11 or earlier'):
+                profiling.start('cpu', output=os.path.join(self.directory.name, 'profile.pstats'))
+        
+        # Verify nothing was left running
+        self.assertIsNone(profiling.stop())
+    
+    def test_memory(self):
+        """Test the memory profile has a snapshot at every stage boundary"""
+        output = os.path.join(self.directory.name, 'profile.txt')
+        profiling.start('memory', output=output, top=5)
+        self.run_pipeline()
+        summary = profiling.stop()
+
+        # Verify the report sections
+        with open(output) as f:
+            report = f.read()
+        self.assertIn('Memory profile of 4 snapshots', summary)
+        for label in ('start', 'busy finished', 'size finished', 'end'):
+            self.assertIn(f'== {label}:', report)
+        self.assertIn('peak', report)
+
+    def test_sampling(self):
+        """Test the sampling profile writes collapsed stacks of every thread"""
+        output = os.path.join(self.directory.name, 'profile.collapsed')
+        profiling.start('sampling', output=output, top=5, interval=0.005)
+        self.run_pipeline()
+        summary = profiling.stop()
+
+        # Verify the stacks name their thread and end with a count
+        with open(output) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(any(line.startswith('pipeline-busy-') and 'test_profiling.py:busy' in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+        self.assertIn('samples of every thread', summary)
+
+        with self.assertRaises(ValueError):
+            profiling.start('gpu')
+        profiling.mark('ignored')
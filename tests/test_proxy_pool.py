@@ -0,0 +1,84 @@
+import threading
+import time
+import unittest
+from src.exceptions import GitHubCrawlerException
+from src.proxy_pool import ProxyPool
+
+class TestProxyPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ProxyPool(['127.0.0.1:8080', '127.0.0.1:8020'], max_in_flight=2, failure_threshold=2, cooldown=0.2)
+    
+    def test_direct_route_without_proxies(self):
+        """Test a pool without proxies uses a single direct route"""
+        pool = ProxyPool([])
+        
+        proxy = pool.acquire()
+        
+        # Verify the route
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(proxy.proxies, {})
+        self.assertIsNone(proxy.max_in_flight)
+    
+    def test_spreads_load(self):
+        """Test concurrent leases are spread across proxies"""
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        
+        # Verify different proxies were leased
+        self.assertNotEqual(first.address, second.address)
+    
+    def test_caps_in_flight_requests(self):
+        """Test a proxy never exceeds its in-flight cap"""
+        leased = [self.pool.acquire() for _ in range(4)]
+        
+        # Verify the pool is exhausted
+        self.assertIsNone(self.pool.try_acquire())
+        with self.assertRaises(GitHubCrawlerException):
+            self.pool.acquire(timeout=0.05)
+        
+        # Releasing a proxy wakes up a waiting caller
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(self.pool.acquire(timeout=1)))
+        waiter.start()
+        self.pool.release(leased[0], 0.1, failed=False)
+        waiter.join()
+        self.assertEqual(acquired[0].address, leased[0].address)
+    
+    def test_prefers_faster_proxy(self):
+        """Test the proxy with lower latency is preferred"""
+        slow, fast = self.pool.proxies
+        slow.latency, fast.latency = 2.0, 0.1
+        
+        # Verify the fast proxy is chosen
+        self.assertIs(self.pool.acquire(), fast)
+    
+    def test_cooldown_and_recovery(self):
+        """Test a failing proxy cools down and comes back later"""
+        bad, good = self.pool.proxies
+        for _ in range(2):
+            bad.in_flight += 1
+            self.pool.release(bad, 0.1, failed=True)
+        
+        # Verify only the healthy proxy is leased while cooling down
+        self.assertGreater(bad.cooldown_until, time.monotonic())
+        self.assertEqual({self.pool.acquire().address for _ in range(2)}, {good.address})
+        self.assertIsNone(self.pool.try_acquire())
+        
+        # Verify the proxy returns after its cooldown
+        time.sleep(0.25)
+        self.assertIs(self.pool.try_acquire(), bad)
+    
+    def test_wait_ends_with_cooldown(self):
+        """Test a caller waiting on a busy proxy gets the other one when its cooldown ends"""
+        bad, good = self.pool.proxies
+        for _ in range(2):
+            bad.in_flight += 1
+            self.pool.release(bad, 0.1, failed=True)
+        leased = [self.pool.acquire() for _ in range(2)]
+        
+        # Verify the wait ends without any proxy being released
+        started = time.monotonic()
+        self.assertIs(self.pool.acquire(timeout=2), bad)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual({proxy.address for proxy in leased}, {good.address})
+
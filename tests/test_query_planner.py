@@ -0,0 +1,89 @@
+import datetime
+import unittest
+from unittest.mock import patch
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.query_planner import QueryPlanner
+from src.rate_limiter import RequestScheduler
+from tests.stub_server import StubSearchIndexServer
+
+class TestQueryPlanner(unittest.TestCase):
+    def setUp(self):
+        # 30 repositories created over January 2020 and 30 more on a single day
+        self.repositories = {f'/user/repo{day}': (f'2020-01-{day:02d}', day) for day in range(1, 31)}
+        self.repositories.update({f'/user/popular{stars}': ('2020-02-01', stars) for stars in range(30)})
+        self.counted = []
+    
+    def count(self, keywords):
+        query = ' '.join(keywords)
+        self.counted.append(query)
+        return sum(StubSearchIndexServer.matches(query, created, stars) for created, stars in self.repositories.values())
+    
+    def test_fits_unsplit(self):
+        """Test a search under the cap is not split"""
+        planner = QueryPlanner(self.count, SearchType.REPOSITORIES, cap=100)
+        
+        # Verify the plan
+        self.assertEqual(planner.plan(['python']), [''])
+        self.assertEqual(self.counted, ['python'])
+    
+    def test_split_by_date_then_stars(self):
+        """Test dates are halved until shards fit and a crowded day is split on stars"""
+        planner = QueryPlanner(
+            self.count, SearchType.REPOSITORIES, cap=10,
+            first_day=datetime.date(2020, 1, 1), last_day=datetime.date(2020, 2, 29)
+        )
+        
+        shards = planner.plan(['python'])
+        
+        # Verify every repository is in exactly one shard under the cap
+        counts = [self.count(['python', shard]) for shard in shards]
+        self.assertTrue(all(0 < count <= 10 for count in counts))
+        self.assertEqual(sum(counts), 60)
+        self.assertEqual(shards[0], 'created:2020-01-01..2020-01-08')
+        self.assertIn('created:2020-02-01..2020-02-01 stars:0..1', shards)
+        self.assertEqual(shards[-1], 'created:2020-02-01..2020-02-01 stars:22..29')
+    
+    def test_unsplittable_shard(self):
+        """Test a shard that cannot be split further is kept with a warning"""
+        self.repositories = {f'/user/repo{i}': ('2020-01-01', 5) for i in range(20)}
+        planner = QueryPlanner(
+            self.count, SearchType.REPOSITORIES, cap=10,
+            first_day=datetime.date(2020, 1, 1), last_day=datetime.date(2020, 1, 1)
+        )
+        
+        with self.assertLogs('src.query_planner', level='WARNING') as logs:
+            shards = planner.plan(['python'])
+        
+        # Verify the plan
+        self.assertEqual(shards, ['created:2020-01-01..2020-01-01 stars:5..5'])
+        self.assertIn('only the first 10 can be crawled', logs.output[0])
+    
+    def test_sharded_crawl(self):
+        """Test a sharded crawl lists every repository once, beyond the cap of a single search"""
+        with StubSearchIndexServer(self.repositories, cap=10, per_page=4) as server, \
+                patch.object(QueryPlanner, 'CAP', 10), \
+                patch.object(QueryPlanner, 'FIRST_DAY', datetime.date(2019, 6, 1)):
+            results = GitHubCrawler(
+                proxies=[],
+                keywords=['python'],
+                search_type=SearchType.REPOSITORIES.value,
+                max_pages=5,
+                scheduler=RequestScheduler(rate=1000),
+                base_url=server.base_url,
+                shard=True
+            ).execute_search()
+            unsharded = GitHubCrawler(
+                proxies=[],
+                keywords=['python'],
+                search_type=SearchType.REPOSITORIES.value,
+                max_pages=5,
+                scheduler=RequestScheduler(rate=1000),
+                base_url=server.base_url
+            ).execute_search()
+        
+        # Verify the results
+        urls = [result['url'] for result in results]
+        self.assertEqual(len(unsharded), 10)
+        self.assertEqual(len(urls), 60)
+        self.assertEqual(set(urls), {f'{server.base_url}{path}' for path in self.repositories})
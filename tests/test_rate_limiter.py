@@ -0,0 +1,137 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import requests
+from src.exceptions import GitHubCrawlerException
+from src.rate_limiter import RequestScheduler, TokenBucket, parse_rate_limit, parse_retry_after
+
+class TestTokenBucket(unittest.TestCase):
+    def test_reserve(self):
+        """Test tokens are handed out at the configured rate after the burst"""
+        bucket = TokenBucket(rate=2.0, capacity=2)
+        now = bucket.updated
+        
+        # Verify the burst and the pacing afterwards
+        self.assertEqual(bucket.reserve(now), 0.0)
+        self.assertEqual(bucket.reserve(now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(now), 0.5)
+        self.assertAlmostEqual(bucket.reserve(now), 1.0)
+    
+    def test_pause_until(self):
+        """Test a paused bucket delays requests until the pause ends"""
+        bucket = TokenBucket(rate=10.0, capacity=10)
+        now = bucket.updated
+        bucket.pause_until(now + 5)
+        
+        # Verify the delay
+        self.assertAlmostEqual(bucket.reserve(now), 5.0)
+
+class TestRequestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RequestScheduler(rate=100, burst=100, backoff_base=0.01, max_retries=3, deadline=5)
+        self.url = 'https://github.com/search'
+    
+    def test_parse_headers(self):
+        """Test parsing Retry-After and X-RateLimit-* headers"""
+        reset = str(int(time.time()) + 60)
+        
+        # Verify the parsed values
+        self.assertEqual(parse_retry_after({'Retry-After': '7'}), 7.0)
+        self.assertIsNone(parse_retry_after({}))
+        for value in ('-5', 'inf', 'nan'):
+            self.assertIsNone(parse_retry_after({'Retry-After': value}))
+        self.assertEqual(parse_rate_limit({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': 'inf'}), (None, None))
+        remaining, reset_in = parse_rate_limit({'X-RateLimit-Remaining': '30', 'X-RateLimit-Reset': reset})
+        self.assertEqual(remaining, 30)
+        self.assertAlmostEqual(reset_in, 60, delta=2)
+    
+    def test_observe_rate_limit_headers(self):
+        """Test the host's rate follows the remaining budget"""
+        headers = {'X-RateLimit-Remaining': '30', 'X-RateLimit-Reset': str(time.time() + 60)}
+        self.scheduler.observe(self.url, 200, headers)
+        
+        # Verify the rate
+        self.assertAlmostEqual(self.scheduler._bucket(self.url).rate, 0.5, delta=0.05)
+    
+    def test_observe_429_halves_rate(self):
+        """Test a 429 without headers halves the host's rate"""
+        self.scheduler.observe(self.url, 429, {})
+        
+        # Verify the rate
+        self.assertEqual(self.scheduler._bucket(self.url).rate, 50)
+    
+    def test_retry_delay(self):
+        """Test which responses are retried and how long to wait"""
+        # Verify retryable and non-retryable responses
+        self.assertIsNone(self.scheduler.retry_delay(0, 404, {}, 0))
+        self.assertIsNotNone(self.scheduler.retry_delay(0, 503, {}, 0))
+        self.assertIsNone(self.scheduler.retry_delay(3, 503, {}, 0))
+        self.assertEqual(self.scheduler.retry_delay(0, 429, {'Retry-After': '2'}, 0), 2)
+        self.assertIsNone(self.scheduler.retry_delay(0, 429, {'Retry-After': '10'}, 0))
+        self.assertIsNotNone(self.scheduler.retry_delay(0, 403, {'X-RateLimit-Remaining': '0'}, 0))
+    
+    def test_run_retries_until_success(self):
+        """Test run retries failed requests, closes the responses it drops and returns the first success"""
+        failed = MagicMock(status_code=502, headers={})
+        send = MagicMock(side_effect=[
+            requests.ConnectionError('Connection reset'),
+            failed,
+            MagicMock(status_code=200, headers={}),
+        ])
+        
+        response = self.scheduler.run(self.url, send)
+        
+        # Verify the result
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(self.scheduler.retries, 2)
+        failed.close.assert_called_once_with()
+        response.close.assert_not_called()
+    
+    def test_run_gives_up(self):
+        """Test run returns the last error response once retries are exhausted"""
+        send = MagicMock(return_value=MagicMock(status_code=503, headers={}))
+        
+        response = self.scheduler.run(self.url, send)
+        
+        # Verify the result
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(send.call_count, 4)
+    
+    @patch('src.rate_limiter.time.sleep')
+    def test_run_honours_retry_after(self, mock_sleep):
+        """Test run waits for Retry-After before the next attempt"""
+        send = MagicMock(side_effect=[
+            MagicMock(status_code=429, headers={'Retry-After': '3'}),
+            MagicMock(status_code=200, headers={}),
+        ])
+        
+        self.scheduler.run(self.url, send)
+        
+        # Verify the waits
+        self.assertGreaterEqual(sum(call.args[0] for call in mock_sleep.call_args_list), 3)
+    
+    @patch('src.rate_limiter.time.sleep')
+    def test_run_fails_fast_past_deadline(self, mock_sleep):
+        """Test run raises at once instead of sleeping through a pause longer than the deadline"""
+        self.scheduler.observe(self.url, 429, {'Retry-After': '3600'})
+        send = MagicMock()
+        
+        # Verify the request is neither slept for nor sent
+        with self.assertRaises(GitHubCrawlerException):
+            self.scheduler.run(self.url, send)
+        mock_sleep.assert_not_called()
+        send.assert_not_called()
+    
+    def test_run_async_fails_fast_past_deadline(self):
+        """Test run_async raises at once instead of sleeping through a pause longer than the deadline"""
+        self.scheduler.observe(self.url, 403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(time.time() + 3600)})
+        send = AsyncMock()
+        
+        # Verify the request is not sent
+        started = time.monotonic()
+        with self.assertRaises(GitHubCrawlerException):
+            asyncio.run(self.scheduler.run_async(self.url, send, retry_on=(ConnectionError,)))
+        self.assertLess(time.monotonic() - started, 1.0)
+        send.assert_not_called()
@@ -0,0 +1,40 @@
+import unittest
+from src.records import RepoInfo, SearchHit, ThreadInfo, compact, expand
+
+class TestRecords(unittest.TestCase):
+    def test_round_trip(self):
+        """Test records give back the result dicts they were made from"""
+        results = [
+            {'url': 'https://github.com/user/repo1'},
+            {'url': 'https://github.com/user/repo2', 'extra': {'owner': 'user', 'language_stats': {'Python': 80.4, 'HTML': 19.6}}},
+            {'url': 'https://github.com/user/repo2/issues/1', 'extra': {'owner': 'user', 'repository': 'repo2', 'number': 1, 'title': None}},
+        ]
+        records = [compact(dict(result)) for result in results]
+        
+        # Verify the record types and the dicts they expand to
+        self.assertIsNone(records[0].extra)
+        self.assertIsInstance(records[1].extra, RepoInfo)
+        self.assertIsInstance(records[2].extra, ThreadInfo)
+        self.assertEqual([expand(record) for record in records], results)
+        self.assertEqual(list(expand(records[1])['extra']['language_stats']), ['Python', 'HTML'])
+    
+    def test_interned_strings(self):
+        """Test owners and language names are shared between records"""
+        first = SearchHit.from_dict({'url': 'a', 'extra': {'owner': ''.join(['us', 'er']), 'language_stats': {''.join(['Py', 'thon']): 100.0}}})
+        second = SearchHit.from_dict({'url': 'b', 'extra': {'owner': ''.join(['use', 'r']), 'language_stats': {''.join(['Pyt', 'hon']): 50.0}}})
+        
+        # Verify the same objects are referenced
+        self.assertIs(first.extra.owner, second.extra.owner)
+        self.assertIs(first.extra.languages[0], second.extra.languages[0])
+        self.assertFalse(hasattr(first, '__dict__'))
+    
+    def test_unexpected_fields(self):
+        """Test results records cannot hold exactly are kept as they are"""
+        for result in ({'url': 'a', 'score': 1}, {'url': 'a', 'extra': None}, {'name': 'a'}):
+            with self.subTest(result=result):
+                self.assertIs(compact(result), result)
+        
+        # Verify integer percentages and unknown extra info are not converted
+        result = {'url': 'a', 'extra': {'owner': 'user', 'language_stats': {'Python': 100}}}
+        self.assertEqual(compact(result).extra, result['extra'])
+        self.assertEqual(expand(compact(result)), result)
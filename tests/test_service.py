@@ -0,0 +1,99 @@
+import json
+import threading
+import unittest
+import requests
+from src.exceptions import GitHubCrawlerException
+from src.github_client import GitHubClient
+from src.github_crawler import GitHubCrawler
+from src.lru_cache import LruCache
+from src.rate_limiter import RequestScheduler
+from src.service import CrawlServer, CrawlService
+from tests.stub_server import StubGitHubServer
+
+PAGES = {1: ['/user1/repo1', '/user2/repo2']}
+LANGUAGES = {'/user1/repo1': {'Python': 100.0}, '/user2/repo2': {'Go': 100.0}}
+JOB = {'keywords': ['python'], 'proxies': [], 'type': 'repositories', 'extra_info': True}
+
+class TestCrawlService(unittest.TestCase):
+    def _service(self, server, clients, **kwargs):
+        """A service whose jobs share one client and result cache, like ``main.py serve``"""
+        result_cache = LruCache()
+        client = GitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000))
+        
+        def create_crawler(input_data, options):
+            clients.append(client)
+            return GitHubCrawler(
+                proxies=input_data['proxies'],
+                keywords=input_data['keywords'],
+                search_type=input_data['type'],
+                include_extra_info=options['extra_info'],
+                max_pages=options['max_pages'],
+                result_cache=result_cache,
+                client=client,
+                base_url=server.base_url
+            )
+        
+        return CrawlService(create_crawler, **kwargs)
+    
+    def test_jobs_over_http(self):
+        """Test jobs submitted over HTTP are crawled with warm clients and their results streamed"""
+        clients = []
+        with StubGitHubServer(PAGES, LANGUAGES) as server:
+            service = self._service(server, clients)
+            api = CrawlServer(service, port=0)
+            api.start()
+            try:
+                first = requests.post(f'{api.base_url}/jobs', json=JOB).json()
+                streamed = requests.get(f'{api.base_url}/jobs/{first["id"]}/results', stream=True)
+                results = [json.loads(line) for line in streamed.iter_lines() if line]
+                second = requests.post(f'{api.base_url}/jobs', json={**JOB, 'max_pages': 2}).json()
+                second_results = requests.get(f'{api.base_url}/jobs/{second["id"]}/results').text.splitlines()
+                status = requests.get(f'{api.base_url}/jobs/{first["id"]}').json()
+                listed = requests.get(f'{api.base_url}/jobs').json()
+                invalid = requests.post(f'{api.base_url}/jobs', json={**JOB, 'type': 'users'})
+                unknown = requests.post(f'{api.base_url}/jobs', json={**JOB, 'max_page': 2})
+                missing = requests.get(f'{api.base_url}/jobs/nope')
+            finally:
+                api.close()
+                service.close()
+        
+        # Verify the results and statuses
+        self.assertEqual(results, [
+            {'url': f'{server.base_url}/user1/repo1', 'extra': {'owner': 'user1', 'language_stats': {'Python': 100.0}}},
+            {'url': f'{server.base_url}/user2/repo2', 'extra': {'owner': 'user2', 'language_stats': {'Go': 100.0}}},
+        ])
+        self.assertEqual(len(second_results), 2)
+        self.assertEqual((status['status'], status['results'], status['complete']), ('done', 2, True))
+        self.assertEqual([job['id'] for job in listed], [first['id'], second['id']])
+        self.assertEqual((invalid.status_code, unknown.status_code, missing.status_code), (400, 400, 404))
+        self.assertIn('Unknown field(s): max_page', unknown.json()['error'])
+        
+        # Verify the second job reused the client and the parsed pages of the first
+        self.assertIs(clients[0], clients[1])
+        self.assertEqual(server.requests.count('/search?q=python&type=repositories'), 1)
+        self.assertEqual(sum(request.startswith('/user') for request in server.requests), 2)
+    
+    def test_job_limits(self):
+        """Test only max_jobs jobs run at a time, extra ones queue up to max_queued and failures are reported per job"""
+        release = threading.Event()
+        running = []
+        
+        def create_crawler(input_data, options):
+            running.append(input_data['keywords'])
+            release.wait(5)
+            raise ValueError('No such backend')
+        
+        service = CrawlService(create_crawler, max_jobs=1, max_queued=1)
+        first = service.submit(JOB)
+        while not running:
+            release.wait(0.01)
+        second = service.submit(JOB)
+        
+        # Verify the queue limit and that the second job waits for the first
+        with self.assertRaises(GitHubCrawlerException):
+            service.submit(JOB)
+        self.assertEqual((first.status, second.status, len(running)), ('running', 'queued', 1))
+        release.set()
+        list(second.iter_results())
+        service.close()
+        self.assertEqual((first.status, first.error, second.status), ('failed', 'No such backend', 'failed'))
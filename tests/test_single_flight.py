@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+import unittest
+from src.async_github_client import AsyncGitHubClient
+from src.github_client import GitHubClient
+from src.rate_limiter import RequestScheduler
+from src.single_flight import AsyncSingleFlight, SingleFlight
+from tests.stub_server import StubGitHubServer
+
+class TestSingleFlight(unittest.TestCase):
+    def test_threads(self):
+        """Test concurrent calls with the same key run once and share the result"""
+        flights = SingleFlight()
+        calls = []
+        release = threading.Event()
+        def fetch():
+            calls.append(1)
+            release.wait()
+            return 'page'
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do('url', fetch))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        # Verify the calls
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['page'] * 5)
+        self.assertEqual(flights.do('url', lambda: 'again'), 'again')
+    
+    def test_threads_exception(self):
+        """Test callers waiting on a failing call get its exception"""
+        flights = SingleFlight()
+        started = threading.Event()
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('boom')
+        errors = []
+        def call():
+            try:
+                flights.do('url', fail)
+            except ValueError as e:
+                errors.append(str(e))
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        call()
+        leader.join()
+        
+        # Verify both callers failed
+        self.assertEqual(errors, ['boom', 'boom'])
+    
+    def test_asyncio(self):
+        """Test coalesced coroutines run once and a cancelled caller does not cancel the call"""
+        calls = []
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'page'
+        async def main():
+            flights = AsyncSingleFlight()
+            cancelled = asyncio.ensure_future(flights.do('url', fetch))
+            others = [asyncio.ensure_future(flights.do('url', fetch)) for _ in range(3)]
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            return await asyncio.gather(*others)
+        
+        results = asyncio.run(main())
+        
+        # Verify the calls
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['page'] * 3)
+    
+    def test_clients(self):
+        """Test both clients send one request for identical requests made at the same time"""
+        with StubGitHubServer({}, {'/user/repo': {'Python': 100.0}}, latency=0.1) as server:
+            client = GitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000))
+            threads = [threading.Thread(target=client.get_repository, args=(f'{server.base_url}/user/repo',)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            async def fetch():
+                async with AsyncGitHubClient([], base_url=server.base_url, scheduler=RequestScheduler(rate=1000)) as client:
+                    return await asyncio.gather(*(client.get_repository(f'{server.base_url}/user/repo') for _ in range(4)))
+            responses = asyncio.run(fetch())
+        
+        # Verify the requests
+        self.assertEqual(server.requests, ['/user/repo', '/user/repo'])
+        self.assertTrue(all(response is responses[0] for response in responses))
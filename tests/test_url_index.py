@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import unittest
+from src.enums import SearchType
+from src.github_crawler import GitHubCrawler
+from src.rate_limiter import RequestScheduler
+from src.url_index import UrlIndex
+from tests.stub_server import StubGitHubServer
+
+class TestUrlIndex(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'index.sqlite')
+        self.index = UrlIndex(self.path, max_age=60)
+        self.addCleanup(self.index.close)
+    
+    def test_mark_seen_per_run(self):
+        """Test URLs are deduplicated within a run but not across runs"""
+        first_run = self.index.start_run()
+        second_run = self.index.start_run()
+        
+        # Verify the dedup
+        self.assertTrue(self.index.mark_seen(first_run, 'https://github.com/user/repo'))
+        self.assertFalse(self.index.mark_seen(first_run, 'https://github.com/user/repo'))
+        self.assertTrue(self.index.mark_seen(second_run, 'https://github.com/user/repo'))
+    
+    def test_upsert_and_get(self):
+        """Test stored extra info is returned while fresh and persists across instances"""
+        extra = {'owner': 'user', 'language_stats': {'Python': 100.0}}
+        self.index.upsert('https://github.com/user/repo', extra)
+        self.index.close()
+        
+        index = UrlIndex(self.path, max_age=60)
+        self.addCleanup(index.close)
+        
+        # Verify the stored info
+        self.assertEqual(index.get('https://github.com/user/repo'), extra)
+        self.assertIsNone(index.get('https://github.com/user/other'))
+        self.assertEqual(index.stats(), {'hits': 1, 'misses': 1, 'repositories': 1})
+    
+    def test_stale_entries(self):
+        """Test entries older than max_age are treated as missing"""
+        self.index.upsert('https://github.com/user/repo', {'owner': 'user', 'language_stats': {}})
+        time.sleep(0.02)
+        
+        # Verify the staleness
+        self.assertIsNone(self.index.get('https://github.com/user/repo', max_age=0.01))
+    
+    def test_incremental_crawl(self):
+        """Test an incremental crawl only fetches repositories missing from the index"""
+        pages = {1: ['/user1/repo1', '/user2/repo2']}
+        languages = {'/user1/repo1': {'Python': 100.0}, '/user2/repo2': {'Go': 100.0}}
+        with StubGitHubServer(pages, languages) as server:
+            def crawl():
+                return GitHubCrawler(
+                    proxies=[],
+                    keywords=['python'],
+                    search_type=SearchType.REPOSITORIES.value,
+                    include_extra_info=True,
+                    max_pages=2,
+                    scheduler=RequestScheduler(rate=1000),
+                    index=self.index,
+                    incremental=True,
+                    base_url=server.base_url
+                ).execute_search()
+            
+            first = crawl()
+            server.pages[1].append('/user3/repo3')
+            server.languages['/user3/repo3'] = {'Rust': 100.0}
+            server.requests.clear()
+            second = crawl()
+        
+        # Verify only the new repository was enriched
+        self.assertEqual([path for path in server.requests if not path.startswith('/search')], ['/user3/repo3'])
+        self.assertEqual(second[:2], first)
+        self.assertEqual(second[2]['extra'], {'owner': 'user3', 'language_stats': {'Rust': 100.0}})
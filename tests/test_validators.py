@@ -1,5 +1,5 @@
 import unittest
-from src.validators import validate_input_data
+from src.validators import validate_batch_input, validate_input_data
 from src.enums import SearchType
 
 class TestValidators(unittest.TestCase):
@@ -72,4 +72,17 @@ class TestValidators(unittest.TestCase):
             validate_input_data(input_data)
         
         valid_types = [t.value for t in SearchType]
-        self.assertIn(f'Invalid search type: invalid_type. Must be one of: {", ".join(valid_types)}', str(context.exception)) 
\ No newline at end of file
+        self.assertIn(f'Invalid search type: invalid_type. Must be one of: {", ".join(valid_types)}', str(context.exception))
+        
+    def test_validate_batch_input(self):
+        """Test validation of a batch input file"""
+        input_data = {
+            'proxies': [],
+            'jobs': [{'keywords': ['python'], 'type': 'repositories'}, {'keywords': ['go'], 'type': 'issues'}]
+        }
+        
+        # Verify the outline is validated, the jobs are left to the runner
+        self.assertTrue(validate_batch_input(input_data))
+        with self.assertRaises(ValueError) as context:
+            validate_batch_input({'jobs': []})
+        self.assertEqual(str(context.exception), 'Jobs must be a non-empty list')
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+import unittest
+from src.work_queue import WorkQueue
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'queue.sqlite')
+        self.queue = WorkQueue(self.path, lease_seconds=60)
+        self.addCleanup(self.queue.close)
+    
+    def test_lease_and_ack(self):
+        """Test items are leased once, in order, and acked with their results"""
+        added = self.queue.put('job', 'page', [('1', 1, {'page': 1}), ('2', 2, {'page': 2}), ('1', 1, {'page': 1})])
+        other = WorkQueue(self.path)
+        self.addCleanup(other.close)
+        
+        first = self.queue.lease('worker1', limit=1)
+        second = other.lease('worker2', limit=5)
+        
+        # Verify the leases
+        self.assertEqual(added, 2)
+        self.assertEqual([item.payload for item in first], [{'page': 1}])
+        self.assertEqual([item.key for item in second], ['2'])
+        self.assertEqual(self.queue.lease('worker1'), [])
+        
+        # Verify the acks
+        self.assertFalse(self.queue.ack(first[0], 'worker2', ['url']))
+        self.assertTrue(self.queue.ack(first[0], 'worker1', ['url']))
+        self.assertTrue(other.ack(second[0], 'worker2', []))
+        self.assertEqual(self.queue.results('job', 'page'), [('1', ['url']), ('2', [])])
+        self.assertEqual(self.queue.stats(), {'pending': 0, 'leased': 0, 'done': 2, 'failed': 0})
+    
+    def test_expired_lease(self):
+        """Test the item of a crashed worker is leased again once its lease expires"""
+        queue = WorkQueue(self.path, lease_seconds=0.05)
+        self.addCleanup(queue.close)
+        queue.put('job', 'page', [('1', 1, {'page': 1})])
+        
+        crashed = queue.lease('crashed')
+        self.assertEqual(queue.lease('worker'), [])
+        time.sleep(0.1)
+        retried = queue.lease('worker')
+        
+        # Verify the item was handed over
+        self.assertEqual(retried[0].id, crashed[0].id)
+        self.assertEqual(retried[0].attempts, 2)
+        self.assertFalse(queue.ack(crashed[0], 'crashed', []))
+        self.assertTrue(queue.ack(retried[0], 'worker', []))
+    
+    def test_max_attempts(self):
+        """Test failed items are retried until they run out of attempts"""
+        queue = WorkQueue(self.path, max_attempts=2)
+        self.addCleanup(queue.close)
+        queue.put('job', 'page', [('1', 1, {'page': 1})])
+        
+        self.assertTrue(queue.fail(queue.lease('worker')[0], 'worker', 'timeout'))
+        self.assertTrue(queue.fail(queue.lease('worker')[0], 'worker', 'timeout'))
+        
+        # Verify the item failed for good
+        self.assertEqual(queue.lease('worker'), [])
+        self.assertEqual(queue.stats('job'), {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1})